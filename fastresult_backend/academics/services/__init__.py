@@ -11,6 +11,7 @@ from django.core.exceptions import PermissionDenied
 from django.db.models import Count, Q, F, Avg
 from django.utils import timezone
 from systemadmin.services import AuditLogService
+from approvals.workflow import REJECT, ResultWorkflowService, get_workflow
 from results.models import Result, Grade, ResultComponent
 from academics.models import Department, Course, CourseAllocation
 from lecturers.models import Lecturer
@@ -45,38 +46,16 @@ class HODResultApprovalService(HODAuthorizationMixin):
     """Result review and approval workflow for HOD"""
 
     @staticmethod
-    def get_department_submitted_results(user):
-        """Get results submitted by lecturers in department"""
+    def get_department_submitted_results(user, cursor=None, limit=None):
+        """Get a page of results submitted by lecturers in department"""
         HODAuthorizationMixin.check_hod_access(user)
-        department = HODAuthorizationMixin.get_hod_department(user)
         
-        # Get courses in department
-        course_ids = Course.objects.filter(
-            program__department=department
-        ).values_list('id', flat=True)
+        from approvals.services import ApproverInboxService
         
-        results = Result.objects.filter(
-            course_id__in=course_ids,
-            status='submitted'
-        ).select_related(
-            'student',
-            'course',
-            'semester'
-        ).values(
-            'id',
-            'student__matric_number',
-            'student__user__first_name',
-            'student__user__last_name',
-            'course__code',
-            'course__name',
-            'semester__name',
-            'updated_at'
-        ).order_by('-updated_at')
-        
-        return list(results)
+        return ApproverInboxService.get_inbox(user, status='submitted', cursor=cursor, limit=limit)
 
     @staticmethod
-    def review_result(user, result_id, review_data):
+    def review_result(user, result_id, review_data, expected_version=None):
         """Review lecturer's submitted result"""
         HODAuthorizationMixin.check_hod_access(user)
         department = HODAuthorizationMixin.get_hod_department(user)
@@ -89,32 +68,20 @@ class HODResultApprovalService(HODAuthorizationMixin):
         if result.course.program.department != department:
             raise PermissionDenied("Result is not in your department")
         
-        if result.status != 'submitted':
-            raise PermissionDenied("Result is not in submitted state")
+        workflow = get_workflow(user.university_id)
+        ResultWorkflowService.check(user, workflow, result.status, 'review')
         
         # Verify and validate
         if not HODResultApprovalService._validate_result_meets_standards(result):
             raise ValueError("Result does not meet quality standards")
         
-        result.status = 'under_review'
-        result.save()
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='review',
-            model_name='Result',
-            object_id=str(result.id),
-            new_values={
-                'status': 'under_review',
-                'hod_review_notes': review_data.get('notes', '')
-            },
-            status='success'
+        return ResultWorkflowService.apply_to_result(
+            user, result, 'review', workflow=workflow, expected_version=expected_version,
+            audit_values={'hod_review_notes': review_data.get('notes', '')}
         )
-        
-        return result
 
     @staticmethod
-    def approve_result(user, result_id, approval_notes=''):
+    def approve_result(user, result_id, approval_notes='', expected_version=None):
         """Approve result and forward to exam officer"""
         HODAuthorizationMixin.check_hod_access(user)
         department = HODAuthorizationMixin.get_hod_department(user)
@@ -126,28 +93,13 @@ class HODResultApprovalService(HODAuthorizationMixin):
         if result.course.program.department != department:
             raise PermissionDenied("Result is not in your department")
         
-        if result.status != 'under_review':
-            raise PermissionDenied("Result must be under review before approval")
-        
-        result.status = 'under_review'  # Can stay or move to ready for exam officer
-        result.save()
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='approve',
-            model_name='Result',
-            object_id=str(result.id),
-            new_values={
-                'status': 'under_review',
-                'hod_approval_notes': approval_notes
-            },
-            status='success'
+        return ResultWorkflowService.apply_to_result(
+            user, result, 'hod_approve', expected_version=expected_version, audit_action='approve',
+            audit_values={'hod_approval_notes': approval_notes}
         )
-        
-        return result
 
     @staticmethod
-    def return_for_correction(user, result_id, correction_reason):
+    def return_for_correction(user, result_id, correction_reason, expected_version=None):
         """Return result to lecturer for correction"""
         HODAuthorizationMixin.check_hod_access(user)
         department = HODAuthorizationMixin.get_hod_department(user)
@@ -159,25 +111,10 @@ class HODResultApprovalService(HODAuthorizationMixin):
         if result.course.program.department != department:
             raise PermissionDenied("Result is not in your department")
         
-        if result.status not in ['submitted', 'under_review']:
-            raise PermissionDenied("Cannot return this result for correction")
-        
-        result.status = 'draft'
-        result.save()
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='return_for_correction',
-            model_name='Result',
-            object_id=str(result.id),
-            new_values={
-                'status': 'draft',
-                'correction_reason': correction_reason
-            },
-            status='success'
+        return ResultWorkflowService.apply_to_result(
+            user, result, REJECT, expected_version=expected_version, audit_action='return_for_correction',
+            audit_values={'correction_reason': correction_reason}
         )
-        
-        return result
 
     @staticmethod
     def bulk_approve_results(user, result_ids):
@@ -185,32 +122,14 @@ class HODResultApprovalService(HODAuthorizationMixin):
         HODAuthorizationMixin.check_hod_access(user)
         department = HODAuthorizationMixin.get_hod_department(user)
         
-        # Verify all results belong to department
-        results = Result.objects.filter(
-            id__in=result_ids,
-            status='under_review',
-            course__program__department=department
-        )
-        
-        count = 0
-        for result in results:
-            result.status = 'under_review'
-            result.save()
-            count += 1
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='bulk_approve',
-            model_name='Result',
-            object_id='bulk_approval',
-            new_values={
-                'approved_count': count,
-                'result_ids': result_ids
-            },
-            status='success'
+        # Only results in the HOD's department are signed off
+        approved_ids = ResultWorkflowService.apply(
+            user, result_ids, 'hod_approve', audit_action='bulk_approve',
+            filters={'course__program__department': department},
+            audit_values={'hod_approved': True}
         )
         
-        return {'approved_count': count}
+        return {'approved_count': len(approved_ids), 'result_ids': approved_ids}
 
     @staticmethod
     def _validate_result_meets_standards(result):
@@ -5,12 +5,15 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.crypto import get_random_string
 from core.constants import ROLE_CHOICES
+from core.mixins.tracking import TrackedFieldsMixin
 
 
-class User(AbstractUser):
+class User(TrackedFieldsMixin, AbstractUser):
     """Extended User model with role-based access and preloading support"""
     
     ROLES = ROLE_CHOICES
+    # Audited on change by systemadmin.signals
+    tracked_fields = ('username', 'email', 'role', 'university', 'is_active', 'is_staff', 'is_superuser')
     
     email = models.EmailField(unique=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='student')
@@ -0,0 +1,135 @@
+"""Account services"""
+import codecs
+import csv
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+
+from accounts.models import User
+
+PRELOAD_CHUNK_SIZE = 1000
+
+
+class BulkPreloadService:
+    """Preload inactive user accounts from a CSV upload"""
+
+    @staticmethod
+    def preload_users(csv_file, university_id, role, performed_by='system', chunk_size=PRELOAD_CHUNK_SIZE):
+        """Stream the CSV and create missing users chunk by chunk.
+
+        Existing ``student_id``/``staff_id``, ``email`` and username values
+        are resolved with one ``IN`` query each per chunk and new users are
+        inserted with ``bulk_create``. Returns ``(created, skipped, errors)``
+        with the same per-row messages as the old row-by-row import.
+        """
+        id_column = 'student_id' if role == 'student' else 'staff_id'
+        reader = csv.DictReader(codecs.iterdecode(csv_file, 'utf-8'))
+        rows = enumerate(reader, start=2)  # Start at 2 (skip header)
+
+        totals = {'created': 0, 'skipped': 0, 'errors': []}
+        # Values claimed by earlier rows of this upload
+        seen = {'id': set(), 'email': set(), 'username': set()}
+
+        with transaction.atomic():
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                BulkPreloadService._preload_chunk(
+                    chunk, university_id, role, id_column, seen, totals, performed_by
+                )
+
+        return totals['created'], totals['skipped'], totals['errors']
+
+    @staticmethod
+    def _preload_chunk(chunk, university_id, role, id_column, seen, totals, performed_by):
+        from systemadmin.services import AuditLogService
+
+        candidates = []
+        for row_num, row in chunk:
+            email = (row.get('email') or '').strip()
+            first_name = (row.get('first_name') or '').strip()
+            last_name = (row.get('last_name') or '').strip()
+            id_field = (row.get(id_column) or '').strip()
+            dob = (row.get('date_of_birth') or '').strip()
+
+            # Validate required fields
+            if not all([email, first_name, last_name, id_field]):
+                totals['errors'].append(f'Row {row_num}: Missing required fields')
+                totals['skipped'] += 1
+                continue
+
+            date_of_birth = None
+            if dob:
+                try:
+                    date_of_birth = models.DateField().to_python(dob)
+                except ValidationError as e:
+                    totals['errors'].append(f'Row {row_num}: {str(e)}')
+                    totals['skipped'] += 1
+                    continue
+
+            candidates.append((row_num, email, first_name, last_name, id_field, date_of_birth))
+
+        existing_ids = set(User.objects.filter(
+            **{f'{id_column}__in': [candidate[4] for candidate in candidates]}
+        ).values_list(id_column, flat=True))
+        existing_emails = set(User.objects.filter(
+            email__in=[candidate[1] for candidate in candidates]
+        ).values_list('email', flat=True))
+        existing_usernames = set(User.objects.filter(
+            username__in=[candidate[4].lower() for candidate in candidates]
+        ).values_list('username', flat=True))
+
+        users = []
+        for row_num, email, first_name, last_name, id_field, date_of_birth in candidates:
+            # Already registered - skip quietly, as before
+            if id_field in existing_ids or id_field in seen['id']:
+                totals['skipped'] += 1
+                continue
+            if email in existing_emails or email in seen['email']:
+                totals['skipped'] += 1
+                continue
+
+            username = f"{id_field.lower()}"
+            if username in existing_usernames or username in seen['username']:
+                totals['errors'].append(f'Row {row_num}: Username {username} already exists')
+                totals['skipped'] += 1
+                continue
+
+            seen['id'].add(id_field)
+            seen['email'].add(email)
+            seen['username'].add(username)
+            users.append(User(
+                username=username,
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+                role=role,
+                university_id=university_id,
+                is_preloaded=True,
+                is_active=False,
+                date_of_birth=date_of_birth,
+                **{id_column: id_field},
+            ))
+
+        if not users:
+            return
+
+        User.objects.bulk_create(users)
+        totals['created'] += len(users)
+
+        AuditLogService.log_action(
+            user=performed_by,
+            action='import',
+            model_name='User',
+            object_id=None,
+            new_values={
+                'role': role,
+                'university_id': university_id,
+                'created': len(users),
+                'rows': [chunk[0][0], chunk[-1][0]],
+                id_column: [getattr(user, id_column) for user in users],
+            },
+            status='success'
+        )
@@ -1,6 +1,3 @@
-import csv
-import io
-from django.db import transaction
 from django.contrib.auth import authenticate
 from django.utils import timezone
 from rest_framework.views import APIView
@@ -11,6 +8,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.authtoken.models import Token
 from django_filters.rest_framework import DjangoFilterBackend
 from accounts.models import User
+from accounts.services import BulkPreloadService
 from accounts.serializers import (
     UserSerializer, 
     UserDetailSerializer,
@@ -91,7 +89,7 @@ class AuthLoginView(APIView):
             # Generate token
             token, _ = Token.objects.get_or_create(user=user)
             user.last_login = timezone.now()
-            user.save()
+            user.save(update_fields=['last_login'])
             
             # Return with dashboard route based on role
             dashboard_routes = {
@@ -134,72 +132,9 @@ class BulkPreloadView(APIView):
         role = serializer.validated_data['role']
         
         try:
-            # Parse CSV
-            decoded_file = csv_file.read().decode('utf-8')
-            reader = csv.DictReader(io.StringIO(decoded_file))
-            
-            created = 0
-            skipped = 0
-            errors = []
-            
-            with transaction.atomic():
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 (skip header)
-                    try:
-                        email = row.get('email', '').strip()
-                        first_name = row.get('first_name', '').strip()
-                        last_name = row.get('last_name', '').strip()
-                        id_field = row.get('student_id' if role == 'student' else 'staff_id', '').strip()
-                        dob = row.get('date_of_birth', '').strip()
-                        
-                        # Validate required fields
-                        if not all([email, first_name, last_name, id_field]):
-                            errors.append(f'Row {row_num}: Missing required fields')
-                            skipped += 1
-                            continue
-                        
-                        # Check if user already exists
-                        if role == 'student' and User.objects.filter(student_id=id_field).exists():
-                            skipped += 1
-                            continue
-                        elif role == 'lecturer' and User.objects.filter(staff_id=id_field).exists():
-                            skipped += 1
-                            continue
-                        
-                        # Check if email already exists
-                        if User.objects.filter(email=email).exists():
-                            skipped += 1
-                            continue
-                        
-                        # Create user
-                        username = f"{id_field.lower()}"
-                        kwargs = {
-                            'username': username,
-                            'email': email,
-                            'first_name': first_name,
-                            'last_name': last_name,
-                            'role': role,
-                            'university_id': university_id,
-                            'is_preloaded': True,
-                            'is_active': False,
-                        }
-                        
-                        if role == 'student':
-                            kwargs['student_id'] = id_field
-                        else:
-                            kwargs['staff_id'] = id_field
-                        
-                        if dob:
-                            try:
-                                kwargs['date_of_birth'] = dob
-                            except:
-                                pass
-                        
-                        user = User.objects.create(**kwargs)
-                        created += 1
-                    
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: {str(e)}')
-                        skipped += 1
+            created, skipped, errors = BulkPreloadService.preload_users(
+                csv_file, university_id, role, performed_by=request.user.username
+            )
             
             return Response({
                 'message': f'Bulk preload completed',
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from approvals.services.escalation import ESCALATION_BATCH_SIZE, run_escalations
+
+
+class Command(BaseCommand):
+    help = 'Escalate or send reminders for approval stages past their deadline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=ESCALATION_BATCH_SIZE)
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, checking every N seconds (default: run once, e.g. from cron)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            totals = run_escalations(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Escalated {totals['escalated']:,}, reminded {totals['reminded']:,}, "
+                f"notified {totals['notified']:,} user(s)"
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
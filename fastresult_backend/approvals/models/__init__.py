@@ -20,9 +20,18 @@ class ApprovalStage(models.Model):
     approver_role = models.CharField(max_length=50)  # hod, dean, admin
     status = models.CharField(max_length=20, choices=APPROVAL_STATUS_CHOICES, default='pending')
     assigned_to = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+    due_at = models.DateTimeField(null=True, blank=True)  # None when the stage has no deadline
+    escalation_role = models.CharField(max_length=50, blank=True)  # role taking over once overdue
+    escalated_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['stage_number']
+        indexes = [
+            models.Index(fields=['assigned_to', 'status']),
+            models.Index(fields=['approver_role', 'status']),
+            models.Index(fields=['status', 'due_at']),
+        ]
     
     def __str__(self):
         return f"Stage {self.stage_number} - {self.approver_role}"
@@ -0,0 +1,105 @@
+"""Approval services"""
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count
+
+from approvals.models import ApprovalStage
+from approvals.workflow import get_workflow
+from core.pagination import keyset_page
+from results.models import Result
+
+INBOX_PAGE_SIZE = 50
+MAX_INBOX_PAGE_SIZE = 200
+INBOX_FIELDS = (
+    'status',
+    'student__matric_number',
+    'student__user__first_name',
+    'student__user__last_name',
+    'course__code',
+    'course__name',
+    'semester__number',
+    'semester__academic_year__year',
+)
+
+
+class ApproverInboxService:
+    """Results waiting on an approver, one keyset page at a time"""
+
+    @staticmethod
+    def queue_statuses(user, workflow=None):
+        """Statuses the user's role moves results out of"""
+        workflow = workflow or get_workflow(user.university_id)
+        return sorted({
+            stage.from_status for stage in workflow.stages.values()
+            if user.role in stage.roles and stage.to_status != stage.from_status
+        })
+
+    @staticmethod
+    def scope_course_ids(user):
+        """Subquery of the course ids whose results the user may approve, or None for no restriction"""
+        from academics.models import Course, Department
+
+        if user.role == 'hod':
+            department = Department.objects.filter(head=user).first()
+            if not department:
+                raise PermissionDenied("User is not assigned as HOD of any department")
+            return Course.objects.filter(program__department=department).values('id')
+        if user.university_id:
+            return Course.objects.filter(
+                program__department__faculty__university_id=user.university_id
+            ).values('id')
+        return None
+
+    @staticmethod
+    def role_queue(user, statuses=None):
+        """Results in the user's scope waiting in one of ``statuses``"""
+        statuses = statuses or ApproverInboxService.queue_statuses(user)
+        if not statuses:
+            raise PermissionDenied("Your role does not approve results")
+        queryset = Result.objects.filter(status__in=statuses)
+        course_ids = ApproverInboxService.scope_course_ids(user)
+        if course_ids is not None:
+            queryset = queryset.filter(course_id__in=course_ids)
+        return queryset
+
+    @staticmethod
+    def assigned_queue(user):
+        """Results whose pending approval stage is assigned to the user"""
+        return Result.objects.filter(id__in=ApprovalStage.objects.filter(
+            assigned_to=user, status='pending'
+        ).values('submission__result_id'))
+
+    @staticmethod
+    def counts(user, statuses=None):
+        """Queue sizes per status plus the assigned total, two grouped queries"""
+        by_status = dict(
+            ApproverInboxService.role_queue(user, statuses)
+            .order_by().values_list('status').annotate(total=Count('id'))
+        )
+        return {
+            'by_status': by_status,
+            'total': sum(by_status.values()),
+            'assigned': ApprovalStage.objects.filter(assigned_to=user, status='pending').count(),
+        }
+
+    @staticmethod
+    def get_inbox(user, status=None, cursor=None, limit=INBOX_PAGE_SIZE, assigned=False, with_counts=None):
+        """One page of the inbox, newest first.
+
+        Pass the returned ``next_cursor`` back to get the following page.
+        Counts are included on the first page unless ``with_counts`` says
+        otherwise.
+        """
+        limit = max(1, min(int(limit or INBOX_PAGE_SIZE), MAX_INBOX_PAGE_SIZE))
+        statuses = [status] if status else None
+        if assigned:
+            queryset = ApproverInboxService.assigned_queue(user)
+            if status:
+                queryset = queryset.filter(status=status)
+        else:
+            queryset = ApproverInboxService.role_queue(user, statuses)
+
+        rows, next_cursor = keyset_page(queryset, INBOX_FIELDS, cursor=cursor, limit=limit)
+        page = {'results': rows, 'next_cursor': next_cursor}
+        if with_counts if with_counts is not None else not cursor:
+            page['counts'] = ApproverInboxService.counts(user, statuses)
+        return page
@@ -0,0 +1,134 @@
+"""Approval stage deadlines
+
+A pending ApprovalStage gets a ``due_at`` from its workflow's timeout when it
+is opened. run_escalations() walks only the overdue stages, with a range
+query on the ``(status, due_at)`` index, in batches:
+
+- stages with an ``escalation_role`` (template has ``auto_escalate`` on) are
+  handed to that role, assigned to the department head, faculty dean or
+  first active user of the role in the university;
+- the rest are marked as reminded and their assignee is notified.
+
+Either way the stage's ``due_at`` is cleared, so each stage is handled once
+and every run costs in proportion to the number of overdue stages. Each
+affected user gets one notification per run, however many stages moved.
+
+Runs come from ``manage.py escalate_approvals``, once from cron or as a
+single long-running process with ``--interval``.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from approvals.models import ApprovalStage
+
+ESCALATION_BATCH_SIZE = 500
+RESULT_PATH = 'submission__result__course__program__department'
+
+
+def overdue_stages(now=None):
+    """Pending stages past their deadline"""
+    return ApprovalStage.objects.filter(status='pending', due_at__lte=now or timezone.now())
+
+
+def run_escalations(now=None, batch_size=ESCALATION_BATCH_SIZE):
+    """Escalate or remind every overdue stage; returns the counts"""
+    from systemadmin.services import AuditLogService
+
+    now = now or timezone.now()
+    totals = {'escalated': 0, 'reminded': 0, 'notified': 0}
+    notify = Counter()
+    while True:
+        with transaction.atomic():
+            rows = list(
+                overdue_stages(now)
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('due_at')
+                .values_list(
+                    'id', 'escalation_role', 'assigned_to_id', f'{RESULT_PATH}_id',
+                    f'{RESULT_PATH}__faculty_id', f'{RESULT_PATH}__faculty__university_id',
+                )[:batch_size]
+            )
+            if not rows:
+                break
+            _escalate(rows, now, totals, notify)
+        if len(rows) < batch_size:
+            break
+
+    _notify(notify)
+    totals['notified'] = len({user_id for user_id, _ in notify})
+
+    if totals['escalated'] or totals['reminded']:
+        AuditLogService.log_action(
+            user='system',
+            action='escalate',
+            model_name='ApprovalStage',
+            object_id=None,
+            new_values=totals,
+            status='success'
+        )
+    return totals
+
+
+def _escalate(rows, now, totals, notify):
+    assignees = {}
+    escalate = defaultdict(list)
+    remind = []
+    for stage_id, role, assigned_to_id, department_id, faculty_id, university_id in rows:
+        if not role:
+            remind.append(stage_id)
+            if assigned_to_id:
+                notify[assigned_to_id, 'reminder'] += 1
+            continue
+        key = (role, department_id, faculty_id, university_id)
+        if key not in assignees:
+            assignees[key] = _find_assignee(*key)
+        escalate[role, assignees[key]].append(stage_id)
+        if assignees[key]:
+            notify[assignees[key], 'escalation'] += 1
+
+    for (role, assignee_id), stage_ids in escalate.items():
+        ApprovalStage.objects.filter(id__in=stage_ids).update(
+            approver_role=role,
+            assigned_to_id=assignee_id,
+            escalation_role='',
+            escalated_at=now,
+            due_at=None,
+        )
+        totals['escalated'] += len(stage_ids)
+    if remind:
+        ApprovalStage.objects.filter(id__in=remind).update(escalated_at=now, due_at=None)
+        totals['reminded'] += len(remind)
+
+
+def _find_assignee(role, department_id, faculty_id, university_id):
+    """User who takes over stages escalated to ``role``, or None"""
+    from academics.models import Department, Faculty
+    from accounts.models import User
+
+    if role == 'hod' and department_id:
+        return Department.objects.filter(id=department_id).values_list('head_id', flat=True).first()
+    if role == 'dean' and faculty_id:
+        return Faculty.objects.filter(id=faculty_id).values_list('head_id', flat=True).first()
+    return User.objects.filter(
+        role=role, university_id=university_id, is_active=True
+    ).order_by('id').values_list('id', flat=True).first()
+
+
+def _notify(counts):
+    from notifications.models import Notification
+
+    messages = {
+        'escalation': ("Approvals escalated to you", "{count} overdue result approval(s) were escalated to you."),
+        'reminder': ("Approvals overdue", "{count} result approval(s) assigned to you are past their deadline."),
+    }
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            title=messages[kind][0],
+            message=messages[kind][1].format(count=count),
+            notification_type=f'approval_{kind}',
+        )
+        for (user_id, kind), count in counts.items()
+    ])
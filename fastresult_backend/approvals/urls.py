@@ -6,6 +6,7 @@ from approvals.views import (
     ApprovalActionViewSet,
     ApprovalHistoryViewSet,
     CorrectionRequestViewSet,
+    ApproverInboxViewSet,
 )
 
 router = DefaultRouter()
@@ -14,6 +15,7 @@ router.register(r'stages', ApprovalStageViewSet, basename='approval-stage')
 router.register(r'actions', ApprovalActionViewSet, basename='approval-action')
 router.register(r'histories', ApprovalHistoryViewSet, basename='approval-history')
 router.register(r'corrections', CorrectionRequestViewSet, basename='correction-request')
+router.register(r'inbox', ApproverInboxViewSet, basename='approver-inbox')
 
 urlpatterns = [
     path('', include(router.urls)),
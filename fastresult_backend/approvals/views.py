@@ -104,3 +104,32 @@ class CorrectionRequestViewSet(viewsets.ModelViewSet):
     filterset_fields = ['submission', 'requested_by']
     ordering_fields = ['requested_at']
     ordering = ['-requested_at']
+
+
+class ApproverInboxViewSet(viewsets.ViewSet):
+    """Results waiting on the current approver, paged by cursor"""
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request):
+        """Role queue; ``?assigned=true`` lists stages assigned to the user"""
+        from approvals.services import ApproverInboxService
+        
+        params = request.query_params
+        try:
+            page = ApproverInboxService.get_inbox(
+                request.user,
+                status=params.get('status') or None,
+                cursor=params.get('cursor') or None,
+                limit=params.get('limit') or None,
+                assigned=params.get('assigned') in ('1', 'true'),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page)
+    
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """Queue sizes without any rows"""
+        from approvals.services import ApproverInboxService
+        
+        return Response(ApproverInboxService.counts(request.user))
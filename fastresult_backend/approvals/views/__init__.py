@@ -4,6 +4,7 @@ from approvals.views import (
     ApprovalActionViewSet,
     ApprovalHistoryViewSet,
     CorrectionRequestViewSet,
+    ApproverInboxViewSet,
 )
 
 __all__ = [
@@ -12,4 +13,5 @@ __all__ = [
     'ApprovalActionViewSet',
     'ApprovalHistoryViewSet',
     'CorrectionRequestViewSet',
+    'ApproverInboxViewSet',
 ]
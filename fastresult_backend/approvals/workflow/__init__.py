@@ -0,0 +1,386 @@
+"""Result approval workflow engine
+
+A university's approval chain is a ``WorkflowTemplate`` of type
+``result_approval`` whose ``stages`` list the steps in order, e.g.::
+
+    {"name": "review", "roles": ["hod"], "from": "submitted",
+     "to": "under_review", "reject_to": "draft"}
+
+compile_stages() turns the list into a read-only transition table keyed by
+``(status, action)``, so checking a move is a single dict lookup. Compiled
+workflows are cached per template version, and a template applies to the
+university named in its ``metadata['university_id']`` (or to every
+university when it names none). Without a template the default
+lecturer -> HOD -> exam officer chain is used.
+
+A stage may set ``timeout_days`` (overriding the template's) and
+``escalate_to``, the role that takes over an overdue stage when the
+template has ``auto_escalate`` on.
+"""
+from datetime import timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+from core.constants import RESULT_STATUS_CHOICES, ROLE_CHOICES
+
+WORKFLOW_TYPE = 'result_approval'
+REJECT = 'reject'
+APPROVED_STATUS = 'approved'
+RESULT_STATUSES = frozenset(value for value, _ in RESULT_STATUS_CHOICES)
+ROLES = frozenset(value for value, _ in ROLE_CHOICES)
+DEFAULT_WORKFLOW_KEY = ('default',)
+
+DEFAULT_STAGES = (
+    {'name': 'submit', 'roles': ['lecturer'], 'from': 'draft', 'to': 'submitted'},
+    {'name': 'review', 'roles': ['hod', 'exam_officer'], 'from': 'submitted', 'to': 'under_review',
+     'reject_to': 'draft', 'escalate_to': 'dean'},
+    # HOD sign-off keeps the result under review for the exam officer
+    {'name': 'hod_approve', 'roles': ['hod'], 'from': 'under_review', 'to': 'under_review',
+     'reject_to': 'draft', 'escalate_to': 'dean'},
+    {'name': 'approve', 'roles': ['exam_officer'], 'from': 'under_review', 'to': 'approved',
+     'reject_to': 'draft', 'escalate_to': 'university_admin'},
+    {'name': 'publish', 'roles': ['exam_officer', 'university_admin'], 'from': 'approved', 'to': 'published'},
+)
+
+
+class WorkflowError(ValueError):
+    """Workflow template stages cannot be compiled"""
+
+
+class Transition(NamedTuple):
+    """One allowed move of a result"""
+    action: str
+    stage_number: int
+    from_status: str
+    to_status: str
+    roles: Tuple[str, ...]
+    timeout_days: Optional[int] = None
+    escalate_to: str = ''
+    next_stage: Optional['Transition'] = None  # stage that picks the result up afterwards
+
+
+class CompiledWorkflow(NamedTuple):
+    """Transition table of one workflow template version"""
+    key: tuple
+    initial_status: str
+    stages: Mapping  # action -> Transition, in stage order
+    transitions: Mapping  # (status, action) -> Transition, including rejections
+    allowed: Mapping  # status -> frozenset of reachable statuses
+    timeout_days: Optional[int] = None
+    auto_escalate: bool = False
+
+    def get(self, from_status, action):
+        """Transition for ``action`` on a result in ``from_status``"""
+        transition = self.transitions.get((from_status, action))
+        if transition is None:
+            from results.services.transitions import InvalidTransition
+
+            raise InvalidTransition(f"'{action}' is not allowed for results that are '{from_status}'")
+        return transition
+
+    def stage(self, action):
+        """Forward stage named ``action``"""
+        if action not in self.stages:
+            raise WorkflowError(f"Workflow has no '{action}' stage")
+        return self.stages[action]
+
+    def due_at(self, stage, now):
+        """Deadline for a stage opened at ``now``, or None without a timeout"""
+        days = stage.timeout_days if stage.timeout_days is not None else self.timeout_days
+        return now + timedelta(days=days) if days else None
+
+    def escalation_role(self, stage):
+        return stage.escalate_to if self.auto_escalate else ''
+
+    def actions_for(self, status):
+        """Actions available to a result in ``status``"""
+        return [action for (from_status, action) in self.transitions if from_status == status]
+
+
+def compile_stages(stages, key=DEFAULT_WORKFLOW_KEY, timeout_days=None, auto_escalate=False):
+    """Compile a template's ``stages`` list into a CompiledWorkflow"""
+    if not isinstance(stages, (list, tuple)) or not stages:
+        raise WorkflowError("Workflow needs at least one stage")
+
+    parsed = []
+    for stage_number, stage in enumerate(stages, start=1):
+        if not isinstance(stage, dict):
+            raise WorkflowError(f"Stage {stage_number} must be an object")
+        name = str(stage.get('name') or '').strip()
+        roles = stage.get('roles') or ([stage['role']] if stage.get('role') else [])
+        if isinstance(roles, str):
+            roles = [roles]
+        from_status, to_status, reject_to = stage.get('from'), stage.get('to'), stage.get('reject_to')
+
+        if not name or name == REJECT:
+            raise WorkflowError(f"Stage {stage_number} needs a name other than '{REJECT}'")
+        if any(name == other.action for other, _ in parsed):
+            raise WorkflowError(f"Stage name '{name}' is used twice")
+        if not roles:
+            raise WorkflowError(f"Stage '{name}' has no approver roles")
+        for field, status in (('from', from_status), ('to', to_status), ('reject_to', reject_to)):
+            if status is None and field == 'reject_to':
+                continue
+            if status not in RESULT_STATUSES:
+                raise WorkflowError(f"Stage '{name}' has an invalid '{field}' status: {status!r}")
+        escalate_to = stage.get('escalate_to') or ''
+        if escalate_to and escalate_to not in ROLES:
+            raise WorkflowError(f"Stage '{name}' escalates to an unknown role: {escalate_to!r}")
+        stage_timeout = stage.get('timeout_days')
+        if stage_timeout is not None and (not isinstance(stage_timeout, int) or stage_timeout < 0):
+            raise WorkflowError(f"Stage '{name}' timeout_days must be a whole number of days")
+        parsed.append((
+            Transition(name, stage_number, from_status, to_status, tuple(roles), stage_timeout, escalate_to),
+            reject_to,
+        ))
+
+    stages = {}
+    transitions = {}
+    rejects = {}
+    for index, (transition, reject_to) in enumerate(parsed):
+        # The stage that picks the result up is the next one starting where this one ends
+        next_stage = next(
+            (later for later, _ in parsed[index + 1:] if later.from_status == transition.to_status), None
+        )
+        stages[transition.action] = transition._replace(next_stage=next_stage)
+        transitions[(transition.from_status, transition.action)] = stages[transition.action]
+        if reject_to is None:
+            continue
+        rejected = rejects.get(transition.from_status)
+        if rejected and rejected.to_status != reject_to:
+            raise WorkflowError(f"Stages leaving '{transition.from_status}' reject to different statuses")
+        roles = tuple(dict.fromkeys((rejected.roles if rejected else ()) + transition.roles))
+        rejects[transition.from_status] = Transition(
+            REJECT, rejected.stage_number if rejected else transition.stage_number,
+            transition.from_status, reject_to, roles,
+        )
+    for from_status, transition in rejects.items():
+        transitions[(from_status, REJECT)] = transition
+
+    allowed = {}
+    for transition in transitions.values():
+        allowed.setdefault(transition.from_status, set()).add(transition.to_status)
+    return CompiledWorkflow(
+        key=tuple(key),
+        initial_status=parsed[0][0].from_status,
+        stages=MappingProxyType(stages),
+        transitions=MappingProxyType(transitions),
+        allowed=MappingProxyType({status: frozenset(targets) for status, targets in allowed.items()}),
+        timeout_days=timeout_days,
+        auto_escalate=bool(auto_escalate),
+    )
+
+
+@lru_cache(maxsize=1)
+def default_workflow():
+    from django.conf import settings
+
+    return compile_stages(
+        list(DEFAULT_STAGES),
+        timeout_days=getattr(settings, 'APPROVAL_TIMEOUT_DAYS', 7),
+        auto_escalate=getattr(settings, 'APPROVAL_AUTO_ESCALATE', False),
+    )
+
+
+@lru_cache(maxsize=64)
+def _compiled_template(template_id, version, updated_at):
+    from systemadmin.models import WorkflowTemplate
+
+    stages, timeout_days, auto_escalate = WorkflowTemplate.objects.filter(id=template_id).values_list(
+        'stages', 'timeout_days', 'auto_escalate'
+    ).get()
+    return compile_stages(
+        stages, key=(template_id, version, updated_at), timeout_days=timeout_days, auto_escalate=auto_escalate
+    )
+
+
+def get_workflow(university_id=None):
+    """Compiled result approval workflow for a university.
+
+    Only the active templates' ids, versions and timestamps are read; the
+    stages are loaded and compiled once per template version.
+    """
+    from systemadmin.models import WorkflowTemplate
+
+    candidates = WorkflowTemplate.objects.filter(
+        workflow_type=WORKFLOW_TYPE, is_active=True
+    ).order_by('-version', '-updated_at').values_list('id', 'version', 'updated_at', 'metadata')
+
+    fallback = None
+    for template_id, version, updated_at, metadata in candidates:
+        scope = (metadata or {}).get('university_id')
+        if scope is None:
+            fallback = fallback or (template_id, version, updated_at)
+        elif university_id is not None and str(scope) == str(university_id):
+            return _compiled_template(template_id, version, updated_at)
+    if fallback:
+        return _compiled_template(*fallback)
+    return default_workflow()
+
+
+class ResultWorkflowService:
+    """Apply workflow transitions to results and record the approval trail"""
+
+    @staticmethod
+    def check(user, workflow, from_status, action, result_ids=None):
+        """Transition for ``action``; raises if the move or the user's role is not allowed.
+
+        Users outside the stage's roles may still act on ``result_ids`` when
+        every one of them waits on a stage escalated to the user.
+        """
+        from django.core.exceptions import PermissionDenied
+
+        transition = workflow.get(from_status, action)
+        if getattr(user, 'role', None) in transition.roles:
+            return transition
+        if result_ids:
+            result_ids = set(result_ids)
+            if ResultWorkflowService.escalated_to(user, transition, result_ids) == result_ids:
+                return transition
+        raise PermissionDenied(f"Only {', '.join(transition.roles)} can {action} these results")
+
+    @staticmethod
+    def escalated_to(user, transition, result_ids):
+        """Ids of ``result_ids`` whose pending stage was escalated to ``user``'s role and to them"""
+        from django.db.models import Q
+        from approvals.models import ApprovalStage
+
+        role = getattr(user, 'role', None)
+        if not role:
+            return set()
+        stages = ApprovalStage.objects.filter(
+            submission__result_id__in=result_ids,
+            status='pending',
+            escalated_at__isnull=False,
+            approver_role=role,
+        ).filter(Q(assigned_to=user) | Q(assigned_to__isnull=True))
+        if transition.action != REJECT:
+            stages = stages.filter(stage_number=transition.stage_number)
+        return set(stages.values_list('submission__result_id', flat=True))
+
+    @staticmethod
+    def apply(user, result_ids, action, from_status=None, workflow=None, filters=None,
+              audit_action=None, audit_values=None):
+        """Move the results still in ``from_status`` through ``action``; returns the changed ids.
+
+        ``from_status`` defaults to the status the ``action`` stage starts from.
+        """
+        from django.db import transaction
+        from results.services.transitions import ResultTransitionService
+
+        workflow = workflow or get_workflow(getattr(user, 'university_id', None))
+        if from_status is None:
+            from_status = workflow.stage(action).from_status
+        transition = ResultWorkflowService.check(user, workflow, from_status, action, result_ids)
+
+        with transaction.atomic():
+            changed = ResultTransitionService.transition(
+                user, result_ids, from_status, transition.to_status,
+                action=audit_action or action,
+                filters=filters,
+                audit_values={'workflow_stage': transition.stage_number, **(audit_values or {})},
+                allowed=workflow.allowed,
+            )
+            ResultWorkflowService.record_stages(user, workflow, transition, changed)
+        return changed
+
+    @staticmethod
+    def apply_to_result(user, result, action, expected_version=None, **kwargs):
+        """Apply ``action`` to one result and update it in place.
+
+        The change only applies while the result is still at
+        ``expected_version`` (by default the version ``result`` was read at);
+        otherwise ResultConflictError is raised.
+        """
+        from results.services.concurrency import ResultConflictError, current_version
+
+        workflow = kwargs.pop('workflow', None) or get_workflow(getattr(user, 'university_id', None))
+        if expected_version is None:
+            expected_version = result.version
+        filters = {**(kwargs.pop('filters', None) or {}), 'version': expected_version}
+        changed = ResultWorkflowService.apply(
+            user, [result.id], action, result.status, workflow=workflow, filters=filters, **kwargs
+        )
+        if not changed:
+            raise ResultConflictError(result.id, expected_version, current_version(result.id))
+        result.status = workflow.get(result.status, action).to_status
+        result.version = expected_version + 1
+        return result
+
+    @staticmethod
+    def record_stages(user, workflow, transition, result_ids):
+        """Create the submission, stage and history rows for changed results in bulk"""
+        from django.utils import timezone
+        from approvals.models import ApprovalHistory, ApprovalStage, ResultSubmission
+        from results.services.transitions import CHUNK_SIZE
+
+        rejected = transition.action == REJECT
+        outcome = 'rejected' if rejected else 'approved'
+        next_stage = None if rejected else transition.next_stage
+        if next_stage:
+            due_at = workflow.due_at(next_stage, timezone.now())
+            escalation_role = workflow.escalation_role(next_stage)
+        for start in range(0, len(result_ids), CHUNK_SIZE):
+            chunk = result_ids[start:start + CHUNK_SIZE]
+
+            # Latest submission per result; entering the workflow always opens a new one
+            submissions = {}
+            if transition.from_status != workflow.initial_status:
+                for submission_id, result_id in ResultSubmission.objects.filter(
+                    result_id__in=chunk
+                ).order_by('result_id', '-id').values_list('id', 'result_id'):
+                    submissions.setdefault(result_id, submission_id)
+            created = ResultSubmission.objects.bulk_create([
+                ResultSubmission(result_id=result_id, submitted_by=user)
+                for result_id in chunk if result_id not in submissions
+            ])
+            submissions.update((submission.result_id, submission.id) for submission in created)
+            submission_ids = list(submissions.values())
+
+            # Close the stage that was waiting on this action, or record it when none was
+            pending = set(ApprovalStage.objects.filter(
+                submission_id__in=submission_ids, status='pending'
+            ).values_list('submission_id', flat=True))
+            ApprovalStage.objects.filter(submission_id__in=pending, status='pending').update(status=outcome)
+            stages = [
+                ApprovalStage(
+                    submission_id=submission_id,
+                    stage_number=transition.stage_number,
+                    approver_role=transition.roles[0],
+                    status=outcome,
+                    assigned_to=user,
+                )
+                for submission_id in submission_ids if submission_id not in pending
+            ]
+            if next_stage:
+                stages.extend(
+                    ApprovalStage(
+                        submission_id=submission_id,
+                        stage_number=next_stage.stage_number,
+                        approver_role=next_stage.roles[0],
+                        due_at=due_at,
+                        escalation_role=escalation_role,
+                    )
+                    for submission_id in submission_ids
+                )
+            ApprovalStage.objects.bulk_create(stages)
+
+            if rejected or transition.to_status == APPROVED_STATUS:
+                ResultSubmission.objects.filter(id__in=submission_ids).update(status=outcome)
+
+            ApprovalHistory.objects.bulk_create([
+                ApprovalHistory(
+                    submission_id=submissions[result_id],
+                    action_type=transition.action,
+                    performed_by=user,
+                    details={
+                        'result_id': result_id,
+                        'from': transition.from_status,
+                        'to': transition.to_status,
+                        'stage': transition.stage_number,
+                        'workflow': list(workflow.key[:2]),
+                    },
+                )
+                for result_id in chunk
+            ])
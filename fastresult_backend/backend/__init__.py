@@ -1,2 +1,7 @@
 """FastResult Backend Project"""
 __version__ = '1.0.0'
+
+try:
+    from backend.celery import app as celery_app
+except ImportError:  # Celery is only needed when BACKGROUND_JOB_BACKEND=celery
+    celery_app = None
@@ -54,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'systemadmin.middleware.AuditBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -164,6 +165,25 @@ SPECTACULAR_SETTINGS = {
     'SERVE_PERMISSIONS': ['rest_framework.permissions.IsAuthenticated'],
 }
 
+# Cache - shared across workers when CACHE_URL points at Redis.
+# Grading scale versions (results.services.grading_registry) are published
+# through this cache, so any deployment with more than one worker process
+# must set CACHE_URL; the LocMemCache fallback is for a single process only
+# and `manage.py check --deploy` reports it as results.E001.
+if os.environ.get('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -175,6 +195,49 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Background jobs run on Celery when 'celery', otherwise in a thread pool
+# inside the web process (no Redis needed)
+BACKGROUND_JOB_BACKEND = os.environ.get('BACKGROUND_JOB_BACKEND', 'thread')
+BACKGROUND_JOB_THREADS = int(os.environ.get('BACKGROUND_JOB_THREADS', '2'))
+
+# Approval deadlines for the default workflow (templates set their own).
+# Overdue stages are escalated by `manage.py escalate_approvals`, run from
+# cron or as one process with --interval N.
+APPROVAL_TIMEOUT_DAYS = int(os.environ.get('APPROVAL_TIMEOUT_DAYS', '7'))
+APPROVAL_AUTO_ESCALATE = os.environ.get('APPROVAL_AUTO_ESCALATE', 'False') == 'True'
+
+# Seconds a process trusts its copy of the result lock state before checking
+# the cache for a newer stamp
+RESULT_LOCK_REFRESH_SECONDS = 2
+
+# Seconds a process reuses its compiled grading scale when the cache is
+# process-local and version stamps cannot reach other workers
+GRADING_SCALE_REFRESH_SECONDS = 5
+
+# Seconds a student's precomputed my_results/my_gpa/my_cgpa blob stays cached;
+# released results are rendered ahead of time, anything evicted is rebuilt on
+# the next request
+STUDENT_BLOB_TIMEOUT = int(os.environ.get('STUDENT_BLOB_TIMEOUT', str(7 * 24 * 60 * 60)))
+
+# Audit log writes are gathered per request (and per AuditLogService.buffered()
+# block) and inserted together. 'request' writes when the scope closes,
+# 'background' hands the batch to a writer thread that flushes every
+# AUDIT_LOG_BUFFER_SIZE entries or AUDIT_LOG_FLUSH_INTERVAL seconds, 'off'
+# inserts each entry immediately. A scope closing inside a transaction writes
+# in that transaction unless AUDIT_LOG_FLUSH_IN_TRANSACTION is False, in which
+# case it waits for the commit.
+AUDIT_LOG_BUFFER = os.environ.get('AUDIT_LOG_BUFFER', 'request')
+AUDIT_LOG_BUFFER_SIZE = int(os.environ.get('AUDIT_LOG_BUFFER_SIZE', '500'))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL', '2'))
+AUDIT_LOG_FLUSH_IN_TRANSACTION = os.environ.get('AUDIT_LOG_FLUSH_IN_TRANSACTION', 'True') == 'True'
+
+# Audit log storage. On PostgreSQL the table is partitioned by month; run
+# `manage.py archive_audit_logs` monthly to create upcoming partitions and move
+# months older than AUDIT_LOG_HOT_MONTHS to gzipped JSONL files.
+AUDIT_LOG_ARCHIVE_DIR = os.environ.get('AUDIT_LOG_ARCHIVE_DIR', str(BASE_DIR / 'audit_archive'))
+AUDIT_LOG_HOT_MONTHS = int(os.environ.get('AUDIT_LOG_HOT_MONTHS', '12'))
+AUDIT_LOG_PARTITION_MONTHS_AHEAD = int(os.environ.get('AUDIT_LOG_PARTITION_MONTHS_AHEAD', '3'))
+
 # Logging
 LOGGING = {
     'version': 1,
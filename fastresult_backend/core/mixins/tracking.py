@@ -0,0 +1,65 @@
+"""Change tracking without a query
+
+A model listing ``tracked_fields`` remembers those fields' values as they
+were loaded (``from_db``) and as they were last saved. post_save receivers
+can then ask tracked_changes() what a save changed instead of reading the
+old row back in ``pre_save``. Values are stored by ``attname``, so foreign
+keys are compared by id and never fetched.
+"""
+
+
+class TrackedFieldsMixin:
+    """Snapshot ``tracked_fields`` on load and after every save.
+
+    Put it before ``models.Model`` in the bases. Deferred fields are left out
+    of the snapshot; loaded_value() returns None for them.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_fields()
+        return instance
+
+    @classmethod
+    def _tracked_attnames(cls):
+        attnames = cls.__dict__.get('_tracked_attnames_cache')
+        if attnames is None:
+            attnames = tuple((name, cls._meta.get_field(name).attname) for name in cls.tracked_fields)
+            cls._tracked_attnames_cache = attnames
+        return attnames
+
+    def snapshot_fields(self, fields=None):
+        """Record the current values of the tracked fields (or just ``fields``) as persisted"""
+        snapshot = getattr(self, '_field_snapshot', None)
+        if snapshot is None or fields is None:
+            snapshot = self._field_snapshot = {}
+        for name, attname in self._tracked_attnames():
+            if (fields is None or name in fields or attname in fields) and attname in self.__dict__:
+                snapshot[name] = self.__dict__[attname]
+
+    def loaded_value(self, name):
+        """Value of a tracked field when the instance was loaded or last saved"""
+        return (getattr(self, '_field_snapshot', None) or {}).get(name)
+
+    def tracked_changes(self):
+        """``{field: (old, new)}`` for tracked fields changed since the snapshot"""
+        snapshot = getattr(self, '_field_snapshot', None) or {}
+        changes = {}
+        for name, attname in self._tracked_attnames():
+            if name in snapshot and attname in self.__dict__ and snapshot[name] != self.__dict__[attname]:
+                changes[name] = (snapshot[name], self.__dict__[attname])
+        return changes
+
+    def save(self, *args, **kwargs):
+        if getattr(self, '_field_snapshot', None) is None and self.pk is not None:
+            # Built by hand with a primary key rather than loaded: read the stored values once
+            stored = type(self)._base_manager.using(kwargs.get('using') or self._state.db or 'default').filter(
+                pk=self.pk
+            ).values(*(attname for _, attname in self._tracked_attnames())).first() or {}
+            self._field_snapshot = {
+                name: stored[attname] for name, attname in self._tracked_attnames() if attname in stored
+            }
+        super().save(*args, **kwargs)
+        self.snapshot_fields(kwargs.get('update_fields'))
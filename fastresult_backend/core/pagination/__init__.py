@@ -1,3 +1,9 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 from rest_framework.pagination import PageNumberPagination
 
 
@@ -5,3 +11,41 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+
+def encode_cursor(updated_at, pk):
+    """Opaque cursor for the row after which the next page starts"""
+    raw = json.dumps([updated_at.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """``(updated_at, pk)`` from a cursor; raises ValueError when it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        updated_at, pk = json.loads(raw)
+        updated_at = parse_datetime(updated_at)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if updated_at is None or not isinstance(pk, int):
+        raise ValueError("Invalid cursor")
+    return updated_at, pk
+
+
+def keyset_page(queryset, fields, cursor=None, limit=50):
+    """One page of ``queryset`` newest first, keyed on ``(updated_at, id)``.
+
+    Unlike OFFSET paging the cost does not grow with the page number: each
+    page is an index range scan starting after the cursor row. Returns
+    ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    queryset = queryset.order_by('-updated_at', '-id')
+    if cursor:
+        updated_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=pk))
+    fields = list(dict.fromkeys(['id', 'updated_at', *fields]))
+    rows = list(queryset.values(*fields)[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last['updated_at'], last['id'])
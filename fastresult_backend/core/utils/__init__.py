@@ -0,0 +1,15 @@
+"""Small helpers shared across apps"""
+
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_process_local_cache(alias='default'):
+    """True when the ``alias`` cache is not shared between worker processes"""
+    from django.core.cache import caches
+
+    backend = type(caches[alias])
+    backend = f'{backend.__module__}.{backend.__qualname__}'
+    return backend in PROCESS_LOCAL_CACHE_BACKENDS
@@ -12,6 +12,7 @@ from django.core.exceptions import PermissionDenied
 from django.db.models import Count, Q, F
 from django.utils import timezone
 from systemadmin.services import AuditLogService
+from approvals.workflow import REJECT, ResultWorkflowService, get_workflow
 from results.models import Result, Grade
 from exams.models import Exam, ExamPeriod, ExamCalendar, ExamTimetable
 from students.models import StudentEnrollment, StudentProfile
@@ -36,31 +37,16 @@ class ExamOfficerResultVerificationService(ExamOfficerAuthorizationMixin):
     """Result verification and approval workflow"""
 
     @staticmethod
-    def get_pending_results(user, university_id=None):
-        """Get results pending verification"""
+    def get_pending_results(user, status='submitted', cursor=None, limit=None):
+        """Get a page of results pending verification"""
         ExamOfficerAuthorizationMixin.check_exam_officer_access(user)
         
-        results = Result.objects.filter(
-            status='submitted'
-        ).select_related(
-            'student',
-            'course',
-            'semester'
-        ).values(
-            'id',
-            'student__matric_number',
-            'student__user__first_name',
-            'student__user__last_name',
-            'course__code',
-            'course__title',
-            'semester__name',
-            'updated_at'
-        ).order_by('-updated_at')
+        from approvals.services import ApproverInboxService
         
-        return list(results)
+        return ApproverInboxService.get_inbox(user, status=status, cursor=cursor, limit=limit)
 
     @staticmethod
-    def verify_result(user, result_id, verification_data):
+    def verify_result(user, result_id, verification_data, expected_version=None):
         """Verify and approve individual result"""
         ExamOfficerAuthorizationMixin.check_exam_officer_access(user)
         
@@ -68,35 +54,20 @@ class ExamOfficerResultVerificationService(ExamOfficerAuthorizationMixin):
         if not result:
             raise PermissionDenied("Result not found")
         
-        if result.status != 'submitted':
-            raise PermissionDenied("Result has already been processed")
+        workflow = get_workflow(user.university_id)
+        ResultWorkflowService.check(user, workflow, result.status, 'review')
         
         # Verify components and calculate grade
         if not ExamOfficerResultVerificationService._validate_result_components(result):
             raise ValueError("Result is missing required components")
         
-        # Update result status
-        result.status = 'under_review'
-        result.updated_by = user.username
-        result.save()
-        
-        # Log verification
-        AuditLogService.log_action(
-            user=user.username,
-            action='approve',
-            model_name='Result',
-            object_id=str(result.id),
-            new_values={
-                'status': 'under_review',
-                'verification_notes': verification_data.get('notes', '')
-            },
-            status='success'
+        return ResultWorkflowService.apply_to_result(
+            user, result, 'review', workflow=workflow, expected_version=expected_version, audit_action='approve',
+            audit_values={'verification_notes': verification_data.get('notes', '')}
         )
-        
-        return result
 
     @staticmethod
-    def approve_result(user, result_id):
+    def approve_result(user, result_id, expected_version=None):
         """Approve verified result for publication"""
         ExamOfficerAuthorizationMixin.check_exam_officer_access(user)
         
@@ -104,25 +75,10 @@ class ExamOfficerResultVerificationService(ExamOfficerAuthorizationMixin):
         if not result:
             raise PermissionDenied("Result not found")
         
-        if result.status != 'under_review':
-            raise PermissionDenied("Result must be under review before approval")
-        
-        result.status = 'approved'
-        result.save()
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='approve',
-            model_name='Result',
-            object_id=str(result.id),
-            new_values={'status': 'approved'},
-            status='success'
-        )
-        
-        return result
+        return ResultWorkflowService.apply_to_result(user, result, 'approve', expected_version=expected_version)
 
     @staticmethod
-    def reject_result(user, result_id, reason):
+    def reject_result(user, result_id, reason, expected_version=None):
         """Reject result and return to lecturer"""
         ExamOfficerAuthorizationMixin.check_exam_officer_access(user)
         
@@ -130,52 +86,22 @@ class ExamOfficerResultVerificationService(ExamOfficerAuthorizationMixin):
         if not result:
             raise PermissionDenied("Result not found")
         
-        result.status = 'draft'
-        result.save()
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='reject',
-            model_name='Result',
-            object_id=str(result.id),
-            new_values={
-                'status': 'draft',
-                'rejection_reason': reason
-            },
-            status='success'
+        return ResultWorkflowService.apply_to_result(
+            user, result, REJECT, expected_version=expected_version,
+            audit_values={'rejection_reason': reason}
         )
-        
-        return result
 
     @staticmethod
     def bulk_approve_results(user, result_ids):
         """Approve multiple results at once"""
         ExamOfficerAuthorizationMixin.check_exam_officer_access(user)
         
-        results = Result.objects.filter(
-            id__in=result_ids,
-            status='under_review'
-        )
-        
-        count = 0
-        for result in results:
-            result.status = 'approved'
-            result.save()
-            count += 1
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='approve',
-            model_name='Result',
-            object_id='bulk_approval',
-            new_values={
-                'approved_count': count,
-                'result_ids': result_ids
-            },
-            status='success'
+        approved_ids = ResultWorkflowService.apply(
+            user, result_ids, 'approve',
+            audit_values={'bulk_approval': True}
         )
         
-        return {'approved_count': count}
+        return {'approved_count': len(approved_ids), 'result_ids': approved_ids}
 
     @staticmethod
     def _validate_result_components(result):
@@ -0,0 +1,55 @@
+"""Transcript file storage
+
+Generated transcript PDFs live under ``MEDIA_ROOT/transcripts``. Batch jobs
+write them from worker processes, so every write goes through a temporary
+file and an atomic rename: a file that exists is always complete.
+"""
+import os
+import re
+import tempfile
+
+from django.conf import settings
+
+TRANSCRIPT_DIR = 'transcripts'
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def safe_name(value):
+    """Make a matric number or batch label safe to use in a path"""
+    return _UNSAFE.sub('-', str(value)).strip('-') or 'unnamed'
+
+
+def transcript_name(matric_number, batch=None):
+    """Storage name (relative to MEDIA_ROOT) for a student's transcript"""
+    parts = [TRANSCRIPT_DIR]
+    if batch:
+        parts.append(safe_name(batch))
+    parts.append(f"{safe_name(matric_number)}.pdf")
+    return '/'.join(parts)
+
+
+def absolute_path(name):
+    """Filesystem path for a storage name"""
+    return os.path.join(str(settings.MEDIA_ROOT), *name.split('/'))
+
+
+def exists(name):
+    """Check whether a transcript file has been written"""
+    return os.path.exists(absolute_path(name))
+
+
+def write_atomic(path, render):
+    """Call ``render(file)`` on a temp file and move it into place at ``path``"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            result = render(output)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return result
@@ -13,6 +13,7 @@ from django.utils import timezone
 from decimal import Decimal
 from lecturers.models import Lecturer
 from results.models import Result, ResultComponent, Grade
+from results.services import lock_state
 from students.models import StudentEnrollment
 from systemadmin.services import AuditLogService
 from core.constants import RESULT_STATUS_CHOICES
@@ -141,6 +142,8 @@ class LecturerResultEntryService(LecturerAuthorizationMixin):
         if not enrollment:
             raise PermissionDenied("Student not enrolled in this course")
         
+        lock_state.ensure_unlocked(course_id, semester_id)
+        
         # Check for existing result
         existing = Result.objects.filter(
             student_id=student_id,
@@ -191,6 +194,8 @@ class LecturerResultEntryService(LecturerAuthorizationMixin):
         if result.status != 'draft':
             raise PermissionDenied("Cannot edit submitted or approved results")
         
+        lock_state.ensure_unlocked(result.course_id, result.semester_id)
+        
         component = ResultComponent.objects.create(
             result=result,
             component_name=component_name,
@@ -229,6 +234,8 @@ class LecturerResultEntryService(LecturerAuthorizationMixin):
         if result.status != 'draft':
             raise PermissionDenied("Cannot edit submitted or approved results")
         
+        lock_state.ensure_unlocked(result.course_id, result.semester_id)
+        
         old_value = float(component.marks_obtained)
         component.marks_obtained = Decimal(str(marks_obtained))
         component.save()
@@ -256,20 +263,93 @@ class LecturerResultEntryService(LecturerAuthorizationMixin):
         
         LecturerAuthorizationMixin.check_course_access(lecturer, result.course_id)
         
-        components = ResultComponent.objects.filter(result=result)
+        from results.services.score_engine import result_total_score
         
-        total_weight = sum(c.weight for c in components)
-        if total_weight == 0:
+        total_score = result_total_score(result.id)
+        if total_score is None:
             raise ValueError("No components with weight > 0")
         
-        weighted_sum = sum(
-            (c.marks_obtained / c.marks_total * 100) * c.weight
-            for c in components
+        return {"total_score": float(total_score)}
+
+    @staticmethod
+    def grade_course_results(user, course_id, semester_id):
+        """Compute total scores and grades for every draft result in a course"""
+        lecturer = LecturerAuthorizationMixin.check_lecturer_access(user)
+        LecturerAuthorizationMixin.check_course_access(lecturer, course_id)
+        
+        from results.services.score_engine import grade_course
+        
+        lock_state.ensure_unlocked(course_id, semester_id)
+        summary = grade_course(course_id, semester_id, statuses=['draft'])
+        
+        AuditLogService.log_action(
+            user=user.username,
+            action='update',
+            model_name='Grade',
+            object_id=f"{course_id}_{semester_id}",
+            new_values=summary,
+            status='success'
         )
         
-        total_score = weighted_sum / total_weight
+        return summary
+
+    @staticmethod
+    def upload_score_sheet(user, course_id, semester_id, file, filename=None, components=None):
+        """Load a CSV/XLSX score sheet into draft results for a course"""
+        lecturer = LecturerAuthorizationMixin.check_lecturer_access(user)
+        LecturerAuthorizationMixin.check_course_access(lecturer, course_id)
         
-        return {"total_score": float(total_score)}
+        from django.db import transaction
+        from results.bulk_upload import load_score_sheet
+        from results.validators import build_context
+        
+        context = build_context(course_id, semester_id)
+        if context.locked:
+            raise PermissionDenied("Results for this course are locked")
+        
+        with transaction.atomic():
+            summary = load_score_sheet(
+                file, course_id, semester_id, filename=filename, components=components,
+                context=context
+            )
+        
+        AuditLogService.log_action(
+            user=user.username,
+            action='import',
+            model_name='ResultComponent',
+            object_id=f"{course_id}_{semester_id}",
+            new_values={
+                key: value for key, value in summary.items() if key != 'errors'
+            } | {'failed_rows': len(summary['errors'])},
+            status='success' if not summary['errors'] else 'partial'
+        )
+        
+        return summary
+
+    @staticmethod
+    def start_score_upload(user, course_id, semester_id, file, components=None):
+        """Queue a score sheet for background import and return the job"""
+        lecturer = LecturerAuthorizationMixin.check_lecturer_access(user)
+        LecturerAuthorizationMixin.check_course_access(lecturer, course_id)
+        
+        from django.db import transaction
+        from results.services.upload_jobs import create_job
+        
+        lock_state.ensure_unlocked(course_id, semester_id)
+        
+        with transaction.atomic():
+            job = create_job(user, course_id, semester_id, file, components=components)
+        
+        AuditLogService.log_action(
+            user=user.username,
+            action='import',
+            model_name='ScoreUploadJob',
+            object_id=str(job.id),
+            new_values={'course_id': course_id, 'semester_id': semester_id, 'file': job.file.name},
+            status='success'
+        )
+        
+        return job
 
     @staticmethod
     def submit_results(user, course_id, semester_id):
@@ -277,34 +357,28 @@ class LecturerResultEntryService(LecturerAuthorizationMixin):
         lecturer = LecturerAuthorizationMixin.check_lecturer_access(user)
         LecturerAuthorizationMixin.check_course_access(lecturer, course_id)
         
-        from academics.models import Course
+        from approvals.workflow import ResultWorkflowService, get_workflow
+        
+        lock_state.ensure_unlocked(course_id, semester_id)
+        
+        workflow = get_workflow(user.university_id)
+        submit = workflow.stage('submit')
         
         # Get all draft results for this course/semester
-        results = Result.objects.filter(
+        draft_ids = list(Result.objects.filter(
             course_id=course_id,
             semester_id=semester_id,
-            status='draft'
-        )
+            status=submit.from_status
+        ).values_list('id', flat=True))
         
-        if not results.exists():
+        if not draft_ids:
             raise ValueError("No draft results to submit")
         
-        count = 0
-        for result in results:
-            result.status = 'submitted'
-            result.save()
-            count += 1
-        
-        AuditLogService.log_action(
-            user=user.username,
-            action='approve',
-            model_name='Result',
-            object_id=f"{course_id}_{semester_id}",
-            new_values={'submitted_count': count, 'status': 'submitted'},
-            status='success'
+        submitted_ids = ResultWorkflowService.apply(
+            user, draft_ids, 'submit', workflow=workflow, audit_action='approve'
         )
         
-        return {'submitted_count': count}
+        return {'submitted_count': len(submitted_ids)}
 
     @staticmethod
     def get_submission_status(user, course_id, semester_id):
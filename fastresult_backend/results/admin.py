@@ -1,2 +1,56 @@
 from django.contrib import admin
-from results.models import Result, Grade, GPARecord
+from results.models import Result, ResultComponent, ResultLock, Grade, GPARecord
+from results.services import lock_state
+
+
+class LockedResultAdminMixin:
+    """Show rows of locked results read-only and refuse to delete them"""
+    
+    def get_result(self, obj):
+        return obj
+    
+    def is_locked(self, obj):
+        result = self.get_result(obj) if obj is not None else None
+        return result is not None and lock_state.is_locked(result.course_id, result.semester_id)
+    
+    def has_change_permission(self, request, obj=None):
+        return super().has_change_permission(request, obj) and not self.is_locked(obj)
+    
+    def has_delete_permission(self, request, obj=None):
+        return super().has_delete_permission(request, obj) and not self.is_locked(obj)
+    
+    def save_model(self, request, obj, form, change):
+        # Also covers adding a row under a result that is locked
+        lock_state.ensure_result_unlocked(self.get_result(obj))
+        super().save_model(request, obj, form, change)
+    
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            lock_state.ensure_result_unlocked(self.get_result(obj))
+        super().delete_queryset(request, queryset)
+
+
+@admin.register(Result)
+class ResultAdmin(LockedResultAdminMixin, admin.ModelAdmin):
+    list_display = ('student', 'course', 'semester', 'status', 'version', 'updated_at')
+    list_filter = ('status', 'semester')
+    search_fields = ('student__matric_number', 'course__code')
+    readonly_fields = ('version', 'created_at', 'updated_at')
+    raw_id_fields = ('student', 'course', 'semester')
+
+
+@admin.register(ResultComponent)
+class ResultComponentAdmin(LockedResultAdminMixin, admin.ModelAdmin):
+    list_display = ('result', 'component_name', 'marks_obtained', 'marks_total', 'weight')
+    search_fields = ('result__student__matric_number', 'component_name')
+    raw_id_fields = ('result',)
+    
+    def get_result(self, obj):
+        return obj.result
+
+
+@admin.register(ResultLock)
+class ResultLockAdmin(admin.ModelAdmin):
+    list_display = ('course', 'semester', 'locked_by', 'locked_at')
+    list_filter = ('semester',)
+    raw_id_fields = ('course', 'semester', 'locked_by')
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class ResultsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'results'
+
+    def ready(self):
+        import results.checks  # noqa
+        import results.signals  # noqa
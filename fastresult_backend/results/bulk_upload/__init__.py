@@ -0,0 +1,28 @@
+"""Bulk score sheet upload
+
+Streams CSV/XLSX score sheets into draft results for one course offering.
+"""
+from results.bulk_upload.parsers import (
+    ScoreRow, ScoreSheetError, detect_format, iter_rows, iter_score_rows
+)
+from results.bulk_upload.loader import load_score_rows
+
+
+def load_score_sheet(file, course_id, semester_id, filename=None, file_format=None,
+                     components=None, chunk_size=None, context=None):
+    """Parse and load a score sheet; returns the load summary"""
+    file_format = file_format or detect_format(filename or getattr(file, 'name', ''))
+    score_rows = iter_score_rows(iter_rows(file, file_format), components)
+    kwargs = {'chunk_size': chunk_size} if chunk_size else {}
+    return load_score_rows(score_rows, course_id, semester_id, context=context, **kwargs)
+
+
+__all__ = [
+    'ScoreRow',
+    'ScoreSheetError',
+    'detect_format',
+    'iter_rows',
+    'iter_score_rows',
+    'load_score_rows',
+    'load_score_sheet',
+]
@@ -0,0 +1,117 @@
+"""Score sheet loader
+
+Writes parsed ScoreRow marks for one course offering. The offering's
+ValidationContext (enrolled students, lock, existing results and
+components) is loaded once up front; rows are then validated in memory and
+written per chunk with bulk_create and bulk_update.
+"""
+from itertools import islice
+
+from django.db import transaction
+
+from results.models import Result, ResultComponent
+from results.services import lock_state
+from results.validators import build_context, validate_marks
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def load_score_rows(score_rows, course_id, semester_id, chunk_size=DEFAULT_CHUNK_SIZE, context=None,
+                    on_chunk=None):
+    """Load marks into draft results and return a summary with per-row errors.
+
+    Each chunk is written in its own transaction; ``on_chunk`` is called
+    with that chunk's summary inside the transaction, so a caller can
+    checkpoint its progress atomically with the writes. A lock placed on the
+    course mid-load stops it before the next chunk with ResultLockedError.
+    """
+    context = context or build_context(course_id, semester_id)
+    enrolled = context.enrolled
+    # Working copies, extended as this load creates rows
+    results = dict(context.results)
+    components = {key: value[0] for key, value in context.components.items()}
+
+    summary = new_summary()
+    score_rows = iter(score_rows)
+    while True:
+        chunk = list(islice(score_rows, chunk_size))
+        if not chunk:
+            break
+        chunk_summary = new_summary()
+        chunk_summary['rows'] = len(chunk)
+        lock_state.ensure_unlocked(course_id, semester_id)
+        valid, errors = validate_marks(chunk, context)
+        chunk_summary['errors'] = [error.as_dict() for error in errors]
+        with transaction.atomic():
+            _write_chunk(valid, course_id, semester_id, enrolled, results, components, chunk_summary)
+            if on_chunk:
+                on_chunk(chunk_summary)
+        merge_summary(summary, chunk_summary)
+    return summary
+
+
+def new_summary():
+    return {
+        'rows': 0,
+        'results_created': 0,
+        'components_created': 0,
+        'components_updated': 0,
+        'errors': [],
+    }
+
+
+def merge_summary(total, chunk):
+    """Add a chunk's counts and errors into a running summary"""
+    for key, value in chunk.items():
+        if key == 'errors':
+            total['errors'].extend(value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def _write_chunk(rows, course_id, semester_id, enrolled, results, components, summary):
+    if not rows:
+        return
+
+    new_students = {enrolled[row.matric_number] for row in rows} - results.keys()
+    if new_students:
+        created = Result.objects.bulk_create([
+            Result(student_id=student_id, course_id=course_id, semester_id=semester_id, status='draft')
+            for student_id in new_students
+        ])
+        if any(result.pk is None for result in created):
+            # Backend cannot return ids from bulk inserts
+            created = Result.objects.filter(
+                course_id=course_id, semester_id=semester_id, student_id__in=new_students
+            )
+        for result in created:
+            results[result.student_id] = (result.pk, 'draft')
+        summary['results_created'] += len(new_students)
+
+    # Later rows for the same student and component win
+    marks = {}
+    for row in rows:
+        result_id = results[enrolled[row.matric_number]][0]
+        marks[(result_id, row.component_name)] = row
+
+    to_create = []
+    to_update = []
+    for (result_id, name), row in marks.items():
+        component = ResultComponent(
+            id=components.get((result_id, name)),
+            result_id=result_id,
+            component_name=name,
+            marks_obtained=row.marks_obtained,
+            marks_total=row.marks_total,
+            weight=row.weight,
+        )
+        (to_update if component.id else to_create).append(component)
+
+    if to_create:
+        for component in ResultComponent.objects.bulk_create(to_create):
+            components[(component.result_id, component.component_name)] = component.pk
+    if to_update:
+        ResultComponent.objects.bulk_update(to_update, ['marks_obtained', 'marks_total', 'weight'])
+    summary['components_created'] += len(to_create)
+    summary['components_updated'] += len(to_update)
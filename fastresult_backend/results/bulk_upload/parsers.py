@@ -0,0 +1,140 @@
+"""Score sheet parsers
+
+CSV and XLSX sheets are read lazily, one row at a time. Two layouts are
+accepted:
+
+- long: ``matric_number, component_name, marks_obtained, marks_total, weight``
+  with one row per assessment component;
+- wide: ``matric_number`` plus one column per component, with the
+  components' totals and weights passed in as ``components``.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple, Optional
+
+SUPPORTED_FORMATS = ('csv', 'xlsx')
+LONG_FORMAT_COLUMNS = ('component_name', 'marks_obtained', 'marks_total')
+
+
+class ScoreSheetError(ValueError):
+    """Sheet cannot be read at all (format, missing columns)"""
+
+
+class ScoreRow(NamedTuple):
+    """One component mark for one student; marks are None when unparseable"""
+    row_number: int
+    matric_number: str
+    component_name: str
+    marks_obtained: Optional[Decimal]
+    marks_total: Optional[Decimal]
+    weight: Optional[Decimal]
+
+
+def detect_format(filename):
+    """Sheet format from a file name"""
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension not in SUPPORTED_FORMATS:
+        raise ScoreSheetError(f"Unsupported file type '.{extension}', use CSV or XLSX")
+    return extension
+
+
+def normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def parse_decimal(value):
+    """Decimal from a cell, or None when it is not a number"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def iter_rows(file, file_format):
+    """Yield ``(row_number, {header: value})`` for each non-empty row"""
+    if file_format == 'csv':
+        return iter_csv_rows(file)
+    if file_format == 'xlsx':
+        return iter_xlsx_rows(file)
+    raise ScoreSheetError(f"Unsupported format '{file_format}'")
+
+
+def iter_csv_rows(file):
+    if isinstance(file.read(0), bytes):
+        file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(file)
+    header = [normalize_header(value) for value in next(reader, [])]
+    for row_number, values in enumerate(reader, start=2):
+        if any(value.strip() for value in values):
+            yield row_number, dict(zip(header, values))
+
+
+def iter_xlsx_rows(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [normalize_header(value) for value in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            if any(value not in (None, '') for value in values):
+                yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_score_rows(rows, components=None):
+    """Turn sheet rows into ScoreRow marks.
+
+    ``components`` maps a component name to ``{'marks_total': ..., 'weight': ...}``
+    for wide sheets; without it the sheet must use the long layout.
+    """
+    columns = None
+    for row_number, row in rows:
+        if columns is None:
+            columns = _resolve_columns(row, components)
+
+        matric_number = str(row.get('matric_number') or '').strip()
+        if columns is LONG_FORMAT_COLUMNS:
+            weight = row.get('weight')
+            yield ScoreRow(
+                row_number,
+                matric_number,
+                str(row.get('component_name') or '').strip(),
+                parse_decimal(row.get('marks_obtained')),
+                parse_decimal(row.get('marks_total')),
+                parse_decimal(weight) if weight not in (None, '') else Decimal('1.0'),
+            )
+            continue
+
+        for column, (name, marks_total, weight) in columns.items():
+            value = row.get(column)
+            if value in (None, ''):
+                continue
+            yield ScoreRow(row_number, matric_number, name, parse_decimal(value), marks_total, weight)
+
+
+def _resolve_columns(row, components):
+    if 'matric_number' not in row:
+        raise ScoreSheetError("Sheet has no 'matric_number' column")
+    if not components:
+        missing = [column for column in LONG_FORMAT_COLUMNS if column not in row]
+        if missing:
+            raise ScoreSheetError(f"Sheet is missing columns: {', '.join(missing)}")
+        return LONG_FORMAT_COLUMNS
+
+    columns = {}
+    for name, spec in components.items():
+        column = normalize_header(name)
+        if column not in row:
+            raise ScoreSheetError(f"Sheet has no '{name}' column")
+        columns[column] = (
+            name,
+            parse_decimal(spec.get('marks_total')),
+            parse_decimal(spec.get('weight', 1)),
+        )
+    return columns
@@ -0,0 +1,21 @@
+"""Deployment checks for the results app"""
+
+from django.core import checks
+
+from core.utils import is_process_local_cache
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Grading scale stamps must reach every worker"""
+    if not is_process_local_cache():
+        return []
+    return [
+        checks.Error(
+            "The default cache is process-local, so a grading scale change is only seen by the worker "
+            "that made it.",
+            hint="Set CACHE_URL to a shared cache (Redis), or add 'results.E001' to "
+                 "SILENCED_SYSTEM_CHECKS when only one process serves requests.",
+            id='results.E001',
+        )
+    ]
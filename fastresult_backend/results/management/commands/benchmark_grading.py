@@ -0,0 +1,50 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from results.services import grading_engine
+from results.services.grading_engine import get_grade, grade_many, compile_scale
+
+
+class Command(BaseCommand):
+    help = 'Benchmark batch grading (grade_many) against the per-row get_grade loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help='Number of scores to grade')
+        parser.add_argument('--repeat', type=int, default=3, help='Timing runs per strategy (best is reported)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        rng = random.Random(options['seed'])
+        scores = [round(rng.uniform(0, 100), 2) for _ in range(rows)]
+        table = compile_scale()
+
+        strategies = [
+            ('per-row get_grade', lambda: [get_grade(score) for score in scores]),
+            ('grade_many (bisect)', lambda: grading_engine._grade_many_bisect(scores, table)),
+        ]
+        if grading_engine.np is not None:
+            strategies.append(('grade_many (numpy)', lambda: grade_many(scores, table)))
+        else:
+            self.stdout.write(self.style.WARNING('numpy not installed - skipping vectorised run'))
+
+        self.stdout.write(f'Grading {rows:,} scores, best of {repeat} runs\n')
+        baseline = None
+        for label, run in strategies:
+            best = min(self._time(run) for _ in range(repeat))
+            baseline = baseline or best
+            self.stdout.write(
+                f'{label:<22} {best * 1000:10.1f} ms  '
+                f'{rows / best:14,.0f} rows/s  x{baseline / best:6.1f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    @staticmethod
+    def _time(run):
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
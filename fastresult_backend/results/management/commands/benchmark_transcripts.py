@@ -0,0 +1,68 @@
+import random
+import time
+from tempfile import TemporaryFile
+
+from django.core.management.base import BaseCommand
+
+from results.services.grading_engine import grade_many
+from results.services.transcript_builder import get_template, render_transcript
+
+
+class Command(BaseCommand):
+    help = 'Benchmark transcript PDF rendering in pages per second'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transcripts', type=int, default=50, help='Transcripts to render')
+        parser.add_argument('--semesters', type=int, default=10, help='Semesters per transcript')
+        parser.add_argument('--courses', type=int, default=12, help='Courses per semester')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        template = get_template()
+
+        # Warm-up render so font and template setup is not part of the timing
+        with TemporaryFile() as output:
+            render_transcript(self._sample(rng, 1, 1, 0), output, template)
+
+        pages = 0
+        size = 0
+        started = time.perf_counter()
+        for index in range(options['transcripts']):
+            data = self._sample(rng, options['semesters'], options['courses'], index)
+            with TemporaryFile() as output:
+                pages += render_transcript(data, output, template)
+                size += output.tell()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Rendered {options['transcripts']:,} transcripts / {pages:,} pages "
+            f"in {elapsed:.2f}s ({size / 1024:,.0f} KB)"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{pages / elapsed:,.1f} pages/s, {options["transcripts"] / elapsed:,.1f} transcripts/s'
+        ))
+
+    @staticmethod
+    def _sample(rng, semesters, courses, index):
+        def semester_rows(number):
+            scores = [rng.uniform(30, 100) for _ in range(courses)]
+            letters, points = grade_many(scores)
+            for course, (letter, point) in enumerate(zip(letters, points)):
+                yield {
+                    'course_code': f'CSC{number}{course:02d}',
+                    'course_title': f'Benchmark Course {number}.{course}',
+                    'credits': rng.choice((2, 3, 4)),
+                    'grade': letter,
+                    'points': point,
+                }
+
+        return {
+            'student': {
+                'name': f'Student {index}',
+                'matric_number': f'BENCH/{index:05d}',
+                'program': 'BSc Computer Science',
+            },
+            'university': 'Benchmark University',
+            'semesters': ((f'Semester {number}', semester_rows(number)) for number in range(1, semesters + 1)),
+        }
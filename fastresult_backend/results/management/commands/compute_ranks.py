@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from results.services.rank_engine import METHODS, SCOPES, compute_ranks
+
+
+class Command(BaseCommand):
+    help = 'Compute course, program and level positions for a semester'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, required=True, help='Semester id to rank')
+        parser.add_argument('--method', choices=sorted(METHODS), default='competition')
+        parser.add_argument(
+            '--scope',
+            action='append',
+            dest='scopes',
+            choices=SCOPES,
+            help='Scope to rank (repeatable, default: all)',
+        )
+
+    def handle(self, *args, **options):
+        from universities.models import Semester
+
+        semester_id = options['semester']
+        if not Semester.objects.filter(id=semester_id).exists():
+            raise CommandError(f'Semester {semester_id} not found')
+
+        started = time.perf_counter()
+        summary = compute_ranks(
+            semester_id,
+            scopes=tuple(options['scopes'] or SCOPES),
+            method=options['method'],
+        )
+        elapsed = time.perf_counter() - started
+
+        for scope, written in summary.items():
+            self.stdout.write(f'{scope:<8} {written:,} positions')
+        self.stdout.write(self.style.SUCCESS(f'Ranks computed in {elapsed:.2f}s'))
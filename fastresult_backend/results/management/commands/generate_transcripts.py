@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from results.services.transcript_batch import (
+    DEFAULT_CHUNK_SIZE, cohort_student_ids, generate_cohort_transcripts
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate transcripts for a program, department or graduation list in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', type=int, help='Program id')
+        parser.add_argument('--department', type=int, help='Department id')
+        parser.add_argument('--students-file', help='File with one matric number per line')
+        parser.add_argument('--workers', type=int, help='Render processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            '--batch',
+            help='Batch label; rerun with the same label to resume (default: cohort-YYYYMMDD)',
+        )
+        parser.add_argument(
+            '--no-resume',
+            action='store_true',
+            help='Re-render transcripts that already exist for this batch',
+        )
+
+    def handle(self, *args, **options):
+        if not any([options['program'], options['department'], options['students_file']]):
+            raise CommandError('Give --program, --department or --students-file')
+
+        matric_numbers = None
+        if options['students_file']:
+            try:
+                with open(options['students_file'], encoding='utf-8') as handle:
+                    matric_numbers = [line.strip() for line in handle if line.strip()]
+            except OSError as exc:
+                raise CommandError(f'Cannot read students file: {exc}')
+
+        student_ids = cohort_student_ids(
+            program_id=options['program'],
+            department_id=options['department'],
+            matric_numbers=matric_numbers,
+        )
+        if not student_ids:
+            raise CommandError('No students match the given cohort')
+
+        batch = options['batch'] or f"cohort-{timezone.now():%Y%m%d}"
+        total = len(student_ids)
+        self.stdout.write(f'Generating transcripts for {total:,} students (batch {batch})')
+
+        def progress(summary):
+            rate = summary['pages'] / summary['elapsed'] if summary['elapsed'] else 0
+            self.stdout.write(
+                f"  {summary['students']:,}/{total:,} students, {summary['rendered']:,} rendered, "
+                f"{summary['skipped']:,} skipped, {summary['unchanged']:,} unchanged, {rate:,.1f} pages/s"
+            )
+
+        summary = generate_cohort_transcripts(
+            student_ids,
+            batch,
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            resume=not options['no_resume'],
+            progress=progress,
+        )
+
+        elapsed = summary['elapsed'] or 1e-9
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {summary['rendered']:,} transcripts ({summary['pages']:,} pages), "
+            f"skipped {summary['skipped']:,}, unchanged {summary['unchanged']:,} "
+            f"in {summary['elapsed']:.1f}s - "
+            f"{summary['rendered'] / elapsed:,.1f} transcripts/s, {summary['pages'] / elapsed:,.1f} pages/s"
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from results.services.gpa_pipeline import (
+    COUNTED_STATUSES, DEFAULT_CHUNK_SIZE, materialize_semester_gpa
+)
+
+
+class Command(BaseCommand):
+    help = 'Recompute semester GPA records for every student in a semester'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, required=True, help='Semester id to close')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            '--status',
+            action='append',
+            dest='statuses',
+            help='Result status to count (repeatable, default: approved and published)',
+        )
+
+    def handle(self, *args, **options):
+        from universities.models import Semester
+
+        semester_id = options['semester']
+        if not Semester.objects.filter(id=semester_id).exists():
+            raise CommandError(f'Semester {semester_id} not found')
+
+        started = time.perf_counter()
+        summary = materialize_semester_gpa(
+            semester_id,
+            statuses=tuple(options['statuses'] or COUNTED_STATUSES),
+            chunk_size=options['chunk_size'],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Materialized GPA for {summary['students']:,} students "
+            f"in {summary['chunks']} chunks, removed {summary['removed']:,} stale record(s) ({elapsed:.2f}s)"
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from results.services import student_blobs
+
+
+class Command(BaseCommand):
+    help = "Render and cache students' released result, GPA and CGPA responses ahead of release day"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, required=True, help='Semester id whose students to precompute')
+        parser.add_argument('--course', type=int, help='Only students taking this course')
+        parser.add_argument('--chunk-size', type=int, default=student_blobs.PRECOMPUTE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        from universities.models import Semester
+
+        semester_id = options['semester']
+        if not Semester.objects.filter(id=semester_id).exists():
+            raise CommandError(f'Semester {semester_id} not found')
+
+        started = time.perf_counter()
+        stored = student_blobs.precompute(
+            student_blobs.release_student_ids(semester_id, options['course']).iterator(),
+            chunk_size=options['chunk_size'],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Precomputed result blobs for {stored:,} students ({elapsed:.2f}s)"
+        ))
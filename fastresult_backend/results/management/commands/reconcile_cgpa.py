@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from results.services.cgpa_ledger import DEFAULT_CHUNK_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Verify CGPA running totals against GPA records and optionally repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rebuild drifted CGPA records')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        summary = reconcile(fix=options['fix'], chunk_size=options['chunk_size'])
+
+        self.stdout.write(f"Checked {summary['checked']:,} students")
+        if not summary['drifted']:
+            self.stdout.write(self.style.SUCCESS('CGPA records are consistent'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {summary['fixed']:,} drifted CGPA records"))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{summary['drifted']:,} CGPA records have drifted - rerun with --fix to repair"
+            ))
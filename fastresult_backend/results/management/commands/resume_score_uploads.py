@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from results.models import ScoreUploadJob
+from results.services.upload_jobs import STALE_AFTER, resumable_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Resume score upload jobs interrupted by a crash, from their last checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, action='append', dest='jobs', help='Job id (repeatable)')
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=int(STALE_AFTER.total_seconds() // 60),
+            help='Treat pending/running jobs idle this long as interrupted',
+        )
+        parser.add_argument('--include-failed', action='store_true', help='Retry failed jobs too')
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options['stale_minutes'])
+        # Jobs named explicitly may be retried after a failure
+        include_failed = options['include_failed'] or bool(options['jobs'])
+        if options['jobs']:
+            jobs = ScoreUploadJob.objects.filter(id__in=options['jobs']).order_by('created_at')
+        else:
+            jobs = resumable_jobs(stale_after=stale_after, include_failed=include_failed)
+
+        resumed = 0
+        for job_id, checkpoint in jobs.values_list('id', 'checkpoint'):
+            # The claim re-checks status and idleness, so a job a live worker
+            # is still processing is skipped rather than run twice
+            job = run_job(job_id, stale_after=stale_after, include_failed=include_failed)
+            if job is None:
+                self.stdout.write(self.style.WARNING(f'Job {job_id}: skipped, not idle or already finished'))
+                continue
+            self.stdout.write(f'Job {job_id}: resumed after {checkpoint:,} marks')
+            resumed += 1
+            style = self.style.SUCCESS if job.status == 'completed' else self.style.ERROR
+            self.stdout.write(style(
+                f'Job {job_id}: {job.status}, {job.rows_done:,} done, {job.rows_failed:,} failed'
+            ))
+
+        self.stdout.write(self.style.SUCCESS(f'Resumed {resumed} job(s)'))
@@ -1,18 +1,45 @@
-from django.db import models
+from django.db import models, transaction
 from core.constants import RESULT_STATUS_CHOICES
+from core.mixins.tracking import TrackedFieldsMixin
 
 
-class Result(models.Model):
+class Result(TrackedFieldsMixin, models.Model):
     """Main result model"""
+    tracked_fields = ('status',)
     student = models.ForeignKey('students.StudentProfile', on_delete=models.CASCADE, related_name='results')
     course = models.ForeignKey('academics.Course', on_delete=models.CASCADE, related_name='results')
     semester = models.ForeignKey('universities.Semester', on_delete=models.CASCADE)
     status = models.CharField(max_length=20, choices=RESULT_STATUS_CHOICES, default='draft')
+    version = models.PositiveIntegerField(default=1)  # bumped by every write, see services.concurrency
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['student', 'course', 'semester']
+        indexes = [
+            # Approver queues: filter by status and course, page on (updated_at, id)
+            models.Index(fields=['status', 'course']),
+            models.Index(fields=['status', 'updated_at', 'id']),
+        ]
+    
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """Save only over the version this instance was read at"""
+        from results.services.concurrency import ResultConflictError, current_version
+        
+        read_version = self.version
+        version_field = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, read_version + 1))
+        updated = super()._do_update(
+            base_qs.filter(version=read_version), using, pk_val, values, update_fields, forced_update
+        )
+        if not updated:
+            latest = current_version(pk_val)
+            if latest is not None:
+                raise ResultConflictError(pk_val, read_version, latest)
+            return False
+        self.version = read_version + 1
+        return True
     
     def __str__(self):
         return f"{self.student.matric_number} - {self.course.code}"
@@ -43,8 +70,10 @@ class Grade(models.Model):
         return f"{self.result} - {self.letter_grade}"
 
 
-class GPARecord(models.Model):
+class GPARecord(TrackedFieldsMixin, models.Model):
     """Student GPA per semester"""
+    # CGPA is adjusted by the change in these (see results.signals)
+    tracked_fields = ('quality_points', 'total_credits')
     student = models.ForeignKey('students.StudentProfile', on_delete=models.CASCADE, related_name='gpa_records')
     semester = models.ForeignKey('universities.Semester', on_delete=models.CASCADE)
     gpa = models.DecimalField(max_digits=3, decimal_places=2)
@@ -55,6 +84,18 @@ class GPARecord(models.Model):
     class Meta:
         unique_together = ['student', 'semester']
     
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self.pk is not None and not self._state.adding:
+                # Take the CGPA delta from the locked row, not the snapshot read without a lock,
+                # so two concurrent saves of this record cannot both apply the same change
+                stored = GPARecord.objects.select_for_update().filter(pk=self.pk).values(
+                    *self.tracked_fields
+                ).first()
+                if stored:
+                    self._field_snapshot = stored
+            super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.student.matric_number} - {self.semester}: {self.gpa}"
 
@@ -67,6 +108,11 @@ class CGPARecord(models.Model):
     quality_points = models.DecimalField(max_digits=8, decimal_places=2)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student'], name='unique_cgpa_record_per_student'),
+        ]
+    
     def __str__(self):
         return f"{self.student.matric_number} - CGPA: {self.cgpa}"
 
@@ -76,13 +122,22 @@ class Transcript(models.Model):
     student = models.ForeignKey('students.StudentProfile', on_delete=models.CASCADE, related_name='transcripts')
     generated_date = models.DateTimeField(auto_now_add=True)
     file = models.FileField(upload_to='transcripts/', blank=True, null=True)
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    template_version = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'content_hash']),
+        ]
     
     def __str__(self):
         return f"{self.student.matric_number} - {self.generated_date.date()}"
 
 
-class ResultLock(models.Model):
+class ResultLock(TrackedFieldsMixin, models.Model):
     """Lock results from editing"""
+    # Moving a lock to another semester must refresh both semesters' lock state
+    tracked_fields = ('semester',)
     semester = models.ForeignKey('universities.Semester', on_delete=models.CASCADE)
     course = models.ForeignKey('academics.Course', on_delete=models.CASCADE)
     locked_by = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True)
@@ -104,3 +159,72 @@ class ResultRelease(models.Model):
     
     def __str__(self):
         return f"Results Released - {self.semester}"
+
+
+class ResultRank(models.Model):
+    """Precomputed class position of a student for a semester"""
+    SCOPE_CHOICES = [
+        ('course', 'Course'),
+        ('program', 'Program'),
+        ('level', 'Level'),
+    ]
+    METHOD_CHOICES = [
+        ('competition', 'Competition (1, 2, 2, 4)'),
+        ('dense', 'Dense (1, 2, 2, 3)'),
+    ]
+    
+    semester = models.ForeignKey('universities.Semester', on_delete=models.CASCADE, related_name='ranks')
+    student = models.ForeignKey('students.StudentProfile', on_delete=models.CASCADE, related_name='ranks')
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    scope_id = models.IntegerField()  # course id, program id or level (100, 200, ...)
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES, default='competition')
+    value = models.DecimalField(max_digits=6, decimal_places=2)  # total score or GPA ranked on
+    position = models.PositiveIntegerField()
+    cohort_size = models.PositiveIntegerField()
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['semester', 'scope', 'scope_id', 'method', 'student']
+        indexes = [
+            models.Index(fields=['semester', 'scope', 'scope_id', 'method', 'position']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.matric_number} - {self.scope} {self.scope_id}: {self.position}/{self.cohort_size}"
+
+
+class ScoreUploadJob(models.Model):
+    """Background import of a score sheet, checkpointed per chunk"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    uploaded_by = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True, related_name='score_uploads')
+    course = models.ForeignKey('academics.Course', on_delete=models.CASCADE, related_name='score_uploads')
+    semester = models.ForeignKey('universities.Semester', on_delete=models.CASCADE)
+    file = models.FileField(upload_to='score_uploads/')
+    file_format = models.CharField(max_length=10)
+    components = models.JSONField(default=dict, blank=True)  # wide-sheet component spec
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    rows_done = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    checkpoint = models.PositiveIntegerField(default=0)  # marks consumed by committed chunks
+    summary = models.JSONField(default=dict, blank=True)
+    errors = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"Upload {self.id} - {self.course.code} ({self.status})"
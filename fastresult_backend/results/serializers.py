@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from results.models import Result, ResultComponent, Grade, GPARecord, CGPARecord, Transcript, ResultLock, ResultRelease
+from results.models import Result, ResultComponent, Grade, GPARecord, CGPARecord, Transcript, ResultLock, ResultRelease, ScoreUploadJob
 
 
 class ResultComponentSerializer(serializers.ModelSerializer):
@@ -23,8 +23,8 @@ class ResultSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Result
-        fields = ['id', 'student', 'student_matric', 'course', 'course_name', 'course_code', 'semester', 'semester_display', 'status', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'student', 'student_matric', 'course', 'course_name', 'course_code', 'semester', 'semester_display', 'status', 'version', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'version', 'created_at', 'updated_at']
     
     def get_semester_display(self, obj):
         return f"{obj.semester.academic_year.year} - Semester {obj.semester.number}"
@@ -41,8 +41,8 @@ class ResultDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Result
-        fields = ['id', 'student', 'student_matric', 'student_name', 'course', 'course_name', 'course_code', 'semester', 'semester_display', 'status', 'components', 'grade', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'student', 'student_matric', 'student_name', 'course', 'course_name', 'course_code', 'semester', 'semester_display', 'status', 'version', 'components', 'grade', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'version', 'created_at', 'updated_at']
     
     def get_semester_display(self, obj):
         return f"{obj.semester.academic_year.year} - Semester {obj.semester.number}"
@@ -115,3 +115,19 @@ class ResultReleaseSerializer(serializers.ModelSerializer):
     
     def get_semester_display(self, obj):
         return f"{obj.semester.academic_year.year} - Semester {obj.semester.number}"
+
+
+class ScoreUploadJobSerializer(serializers.ModelSerializer):
+    course_code = serializers.CharField(source='course.code', read_only=True)
+    
+    class Meta:
+        model = ScoreUploadJob
+        fields = [
+            'id', 'course', 'course_code', 'semester', 'file', 'file_format', 'components', 'status',
+            'rows_done', 'rows_failed', 'summary', 'errors', 'error_message',
+            'created_at', 'started_at', 'finished_at', 'updated_at',
+        ]
+        read_only_fields = [
+            'id', 'file_format', 'status', 'rows_done', 'rows_failed', 'summary', 'errors',
+            'error_message', 'created_at', 'started_at', 'finished_at', 'updated_at',
+        ]
@@ -8,6 +8,7 @@ from results.serializers import (
     TranscriptSerializer,
     ResultLockSerializer,
     ResultReleaseSerializer,
+    ScoreUploadJobSerializer,
 )
 
 __all__ = [
@@ -20,4 +21,5 @@ __all__ = [
     'TranscriptSerializer',
     'ResultLockSerializer',
     'ResultReleaseSerializer',
+    'ScoreUploadJobSerializer',
 ]
@@ -0,0 +1,181 @@
+"""Incremental CGPA maintenance
+
+CGPARecord.quality_points and total_credits are kept as running totals of a
+student's GPARecord rows. Every GPARecord create, change or delete applies
+only its delta to the student's CGPA row inside the same transaction, so a
+CGPA read is a single-row lookup instead of a sum over every semester.
+
+A deleted record is only ever subtracted from a CGPA row that exists: the
+student may be being deleted too. Deletes inside a ``batched()`` block are
+gathered and applied with one bulk update when the block exits.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Sum
+
+from results.models import CGPARecord, GPARecord
+
+TWO_PLACES = Decimal('0.01')
+DEFAULT_CHUNK_SIZE = 2000
+
+_local = threading.local()
+
+
+def compute_cgpa(quality_points, total_credits):
+    """CGPA from running totals, rounded like the stored column"""
+    if not total_credits or total_credits <= 0:
+        return Decimal('0.00')
+    return (Decimal(quality_points) / total_credits).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def apply_delta(student_id, quality_points_delta, credits_delta):
+    """Apply one GPARecord change to the student's CGPA row"""
+    quality_points_delta = Decimal(quality_points_delta or 0)
+    credits_delta = int(credits_delta or 0)
+    if not quality_points_delta and not credits_delta:
+        return
+
+    with transaction.atomic():
+        # The CGPA is worked out in Python: SQLite would divide the totals as integers
+        record = CGPARecord.objects.select_for_update().filter(student_id=student_id).first()
+        if record is None:
+            rebuild_students([student_id])
+            return
+        record.quality_points += quality_points_delta
+        record.total_credits += credits_delta
+        record.cgpa = compute_cgpa(record.quality_points, record.total_credits)
+        record.save(update_fields=['quality_points', 'total_credits', 'cgpa', 'updated_at'])
+
+
+def subtract(student_id, quality_points, total_credits):
+    """Take a deleted GPARecord's totals out of the student's existing CGPA row"""
+    pending = getattr(_local, 'pending', None)
+    if pending is not None:
+        pending[student_id][0] -= Decimal(quality_points or 0)
+        pending[student_id][1] -= int(total_credits or 0)
+        return
+    apply_bulk_deltas({student_id: (-Decimal(quality_points or 0), -int(total_credits or 0))}, rebuild_missing=False)
+
+
+@contextmanager
+def batched():
+    """Gather subtract() calls made inside the block and apply them together on exit"""
+    if getattr(_local, 'pending', None) is not None:
+        # Nested: the outermost block applies everything
+        yield
+        return
+    _local.pending = pending = defaultdict(lambda: [Decimal('0'), 0])
+    try:
+        yield
+    finally:
+        _local.pending = None
+    apply_bulk_deltas(pending, rebuild_missing=False)
+
+
+def apply_bulk_deltas(deltas, rebuild_missing=True):
+    """Apply many ``{student_id: (quality_points_delta, credits_delta)}`` changes.
+
+    Students without a CGPA row are rebuilt from their GPARecords, unless
+    ``rebuild_missing`` is off.
+    """
+    deltas = {
+        student_id: (Decimal(qp or 0), int(credits or 0))
+        for student_id, (qp, credits) in deltas.items()
+        if qp or credits
+    }
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        records = list(
+            CGPARecord.objects.select_for_update().filter(student_id__in=deltas.keys())
+        )
+        for record in records:
+            qp_delta, credits_delta = deltas[record.student_id]
+            record.quality_points += qp_delta
+            record.total_credits += credits_delta
+            record.cgpa = compute_cgpa(record.quality_points, record.total_credits)
+        CGPARecord.objects.bulk_update(
+            records, ['quality_points', 'total_credits', 'cgpa'], batch_size=DEFAULT_CHUNK_SIZE
+        )
+
+        missing = set(deltas) - {record.student_id for record in records}
+        if missing and rebuild_missing:
+            rebuild_students(missing)
+
+
+def gpa_totals(student_ids=None):
+    """Grouped GPARecord totals per student, straight from SQL"""
+    qs = GPARecord.objects.all()
+    if student_ids is not None:
+        qs = qs.filter(student_id__in=student_ids)
+    return (
+        qs.values('student_id')
+        .annotate(quality_points=Sum('quality_points'), total_credits=Sum('total_credits'))
+        .order_by('student_id')
+    )
+
+
+def rebuild_students(student_ids):
+    """Recompute CGPA rows from scratch for the given students"""
+    student_ids = list(student_ids)
+    totals = {
+        row['student_id']: (row['quality_points'] or Decimal('0'), row['total_credits'] or 0)
+        for row in gpa_totals(student_ids)
+    }
+    records = []
+    for student_id in student_ids:
+        quality_points, total_credits = totals.get(student_id, (Decimal('0'), 0))
+        records.append(CGPARecord(
+            student_id=student_id,
+            quality_points=quality_points,
+            total_credits=total_credits,
+            cgpa=compute_cgpa(quality_points, total_credits),
+        ))
+    CGPARecord.objects.bulk_create(
+        records,
+        batch_size=DEFAULT_CHUNK_SIZE,
+        update_conflicts=True,
+        unique_fields=['student'],
+        update_fields=['quality_points', 'total_credits', 'cgpa'],
+    )
+
+
+def reconcile(fix=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compare CGPA rows with GPARecord totals (and the stored cgpa with those totals); optionally repair drift"""
+    ledger = {
+        student_id: (quality_points, total_credits, cgpa)
+        for student_id, quality_points, total_credits, cgpa in CGPARecord.objects.values_list(
+            'student_id', 'quality_points', 'total_credits', 'cgpa'
+        ).iterator(chunk_size=chunk_size)
+    }
+
+    drifted = []
+    checked = 0
+    for row in gpa_totals().iterator(chunk_size=chunk_size):
+        checked += 1
+        student_id = row['student_id']
+        expected = (row['quality_points'] or Decimal('0'), row['total_credits'] or 0)
+        actual = ledger.pop(student_id, None)
+        if (
+            actual is None
+            or Decimal(actual[0]) != Decimal(expected[0])
+            or actual[1] != expected[1]
+            or Decimal(actual[2]) != compute_cgpa(*expected)
+        ):
+            drifted.append(student_id)
+
+    # CGPA rows left over have no GPARecord behind them any more
+    orphaned = [student_id for student_id, totals in ledger.items() if any(totals)]
+    drifted.extend(orphaned)
+
+    if fix:
+        for start in range(0, len(drifted), chunk_size):
+            with transaction.atomic():
+                rebuild_students(drifted[start:start + chunk_size])
+
+    return {'checked': checked, 'drifted': len(drifted), 'fixed': len(drifted) if fix else 0}
@@ -0,0 +1,72 @@
+"""Optimistic concurrency for results
+
+Every write to a Result bumps its ``version`` and only applies while the row
+is still at the version the writer read (``UPDATE ... WHERE id = %s AND
+version = %s``). Two approvers working from the same read cannot both
+succeed: the second gets a ResultConflictError and must reload. Nothing is
+locked between reading a result and writing it back.
+"""
+from collections.abc import Mapping
+
+from django.db.models import F
+from django.utils import timezone
+
+
+class ResultConflictError(Exception):
+    """Result was changed by someone else since it was read"""
+
+    def __init__(self, result_id, expected_version, current_version=None):
+        self.result_id = result_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        if current_version is None:
+            message = f"Result {result_id} no longer exists"
+        else:
+            message = (
+                f"Result {result_id} was changed by someone else "
+                f"(version {expected_version} was read, it is now {current_version}); reload and try again"
+            )
+        super().__init__(message)
+
+    def as_dict(self):
+        return {
+            'error': str(self),
+            'result_id': self.result_id,
+            'expected_version': self.expected_version,
+            'current_version': self.current_version,
+        }
+
+
+def current_version(result_id):
+    from results.models import Result
+
+    return Result.objects.filter(id=result_id).values_list('version', flat=True).first()
+
+
+def update_if_current(result_id, expected_version, **changes):
+    """Apply ``changes`` only if the result is still at ``expected_version``; returns the new version"""
+    from results.models import Result
+
+    updated = Result.objects.filter(id=result_id, version=expected_version).update(
+        version=F('version') + 1, updated_at=timezone.now(), **changes
+    )
+    if not updated:
+        raise ResultConflictError(result_id, expected_version, current_version(result_id))
+    return expected_version + 1
+
+
+def parse_expected_version(request):
+    """Version the client read, from ``If-Match`` or a ``version`` field; None when not sent"""
+    value = request.headers.get('If-Match')
+    # A JSON list body has no ``version`` field; only the header applies then
+    if not value and isinstance(request.data, Mapping):
+        value = request.data.get('version')
+    if value in (None, ''):
+        return None
+    value = str(value).strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise ValueError("version must be a whole number")
@@ -0,0 +1,252 @@
+"""Formula Engine
+
+Evaluates ``ResultEngineTemplate.formula`` expressions. A formula is parsed
+once, checked against a whitelist of AST nodes and helper functions, and
+compiled into a code object that is cached by formula text and parameter
+names - i.e. once per template version. Evaluation runs over whole columns
+of inputs: with numpy available the formula executes once on arrays,
+otherwise it is applied row by row with plain-Python helpers.
+
+Formulas may use numbers, the template's input parameters, arithmetic,
+single comparisons, ``and``/``or``/``not``, ``x if cond else y`` and the
+helpers ``min``, ``max``, ``abs``, ``round``, ``clip``, ``sqrt`` and
+``where``.
+"""
+import ast
+import math
+from functools import lru_cache, reduce
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+MAX_FORMULA_LENGTH = 2000
+MAX_EXPONENT = 10
+MAX_NESTING = 100
+
+
+class FormulaError(ValueError):
+    """Formula is not valid or uses something outside the whitelist"""
+
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name,
+    ast.Load, ast.Constant, ast.BoolOp, ast.IfExp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+
+FUNCTIONS = ('min', 'max', 'abs', 'round', 'clip', 'sqrt', 'where')
+
+
+def _variadic(pairwise):
+    return lambda *args: reduce(pairwise, args)
+
+
+def _scalar_where(condition, if_true, if_false):
+    return if_true if condition else if_false
+
+
+def _scalar_clip(value, low, high):
+    return min(max(value, low), high)
+
+
+_SCALAR_NAMESPACE = {
+    'min': min,
+    'max': max,
+    'abs': abs,
+    'round': round,
+    'clip': _scalar_clip,
+    'sqrt': math.sqrt,
+    'where': _scalar_where,
+    '_and': lambda left, right: bool(left and right),
+    '_or': lambda left, right: bool(left or right),
+    '_not': lambda value: not value,
+}
+
+if np is not None:
+    _ARRAY_NAMESPACE = {
+        'min': _variadic(np.minimum),
+        'max': _variadic(np.maximum),
+        'abs': np.abs,
+        'round': np.round,
+        'clip': np.clip,
+        'sqrt': np.sqrt,
+        'where': np.where,
+        '_and': np.logical_and,
+        '_or': np.logical_or,
+        '_not': np.logical_not,
+    }
+else:  # pragma: no cover - numpy is optional
+    _ARRAY_NAMESPACE = None
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Turn boolean operators and conditionals into element-wise calls"""
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        helper = '_and' if isinstance(node.op, ast.And) else '_or'
+        return reduce(
+            lambda left, right: ast.Call(ast.Name(helper, ast.Load()), [left, right], []),
+            node.values,
+        )
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.Call(ast.Name('_not', ast.Load()), [node.operand], [])
+        return node
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return ast.Call(ast.Name('where', ast.Load()), [node.test, node.body, node.orelse], [])
+
+
+class CompiledFormula:
+    """A checked, compiled formula over named input columns"""
+
+    def __init__(self, formula, parameters, code):
+        self.formula = formula
+        self.parameters = parameters
+        self._code = code
+
+    def __call__(self, inputs):
+        return self.evaluate(inputs)
+
+    def evaluate(self, inputs):
+        """Evaluate over ``{parameter: sequence}`` columns; returns one value per row"""
+        missing = [name for name in self.parameters if name not in inputs]
+        if missing:
+            raise FormulaError(f"Missing input parameters: {', '.join(missing)}")
+
+        if np is not None:
+            columns = {name: np.asarray(inputs[name], dtype=float) for name in self.parameters}
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = eval(self._code, {'__builtins__': {}, **_ARRAY_NAMESPACE}, columns)
+            rows = _row_count(columns.values())
+            return np.broadcast_to(np.asarray(result, dtype=float), (rows,)) if rows is not None else result
+
+        columns = [list(inputs[name]) for name in self.parameters]
+        return [
+            self.evaluate_row(dict(zip(self.parameters, values)))
+            for values in zip(*columns)
+        ]
+
+    def evaluate_row(self, values):
+        """Evaluate for a single row of scalar inputs"""
+        namespace = {name: float(values[name]) for name in self.parameters}
+        try:
+            return eval(self._code, {'__builtins__': {}, **_SCALAR_NAMESPACE}, namespace)
+        except ZeroDivisionError:
+            return math.nan
+
+
+def _row_count(columns):
+    for column in columns:
+        if column.ndim:
+            return len(column)
+    return None
+
+
+def parameter_names(input_parameters):
+    """Names from ``input_parameters`` - plain strings or ``{'name': ...}`` dicts"""
+    names = []
+    for parameter in input_parameters or ():
+        name = parameter.get('name') if isinstance(parameter, dict) else parameter
+        if name:
+            names.append(str(name))
+    return tuple(names)
+
+
+@lru_cache(maxsize=256)
+def compile_formula(formula, parameters=None):
+    """Parse, check and compile a formula.
+
+    ``parameters`` is the tuple of allowed input names; ``None`` accepts any
+    name that is not a helper function.
+    """
+    if not isinstance(formula, str) or not formula.strip():
+        raise FormulaError("Formula is empty")
+    if len(formula) > MAX_FORMULA_LENGTH:
+        raise FormulaError(f"Formula is longer than {MAX_FORMULA_LENGTH} characters")
+
+    try:
+        tree = ast.parse(formula.strip(), mode='eval')
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid syntax: {e.msg}") from e
+    except (RecursionError, MemoryError) as e:
+        raise FormulaError("Formula is nested too deeply") from e
+
+    names = _check(tree, parameters)
+    if parameters is None:
+        parameters = tuple(sorted(names))
+
+    try:
+        tree = ast.fix_missing_locations(_Rewriter().visit(tree))
+        code = compile(tree, '<formula>', 'eval')
+    except (RecursionError, MemoryError) as e:
+        raise FormulaError("Formula is nested too deeply") from e
+    return CompiledFormula(formula, tuple(parameters), code)
+
+
+def compile_template(template):
+    """Compiled formula for a ResultEngineTemplate"""
+    return compile_formula(template.formula, parameter_names(template.input_parameters))
+
+
+def evaluate_template(template, inputs):
+    """Evaluate a ResultEngineTemplate over input columns"""
+    return compile_template(template).evaluate(inputs)
+
+
+def _check(tree, parameters):
+    """Reject anything outside the whitelist; return the input names used"""
+    # Depth first, without recursion, before anything walks the tree recursively
+    pending = [(tree, 0)]
+    while pending:
+        node, depth = pending.pop()
+        if depth > MAX_NESTING:
+            raise FormulaError(f"Formula is nested more than {MAX_NESTING} levels deep")
+        pending.extend((child, depth + 1) for child in ast.iter_child_nodes(node))
+
+    used = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise FormulaError(f"'{type(node).__name__}' is not allowed in formulas")
+
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise FormulaError("Only numeric constants are allowed")
+        elif isinstance(node, ast.Compare):
+            if len(node.ops) != 1:
+                raise FormulaError("Chained comparisons are not allowed")
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            exponent = node.right
+            if isinstance(exponent, ast.UnaryOp) and isinstance(exponent.op, (ast.UAdd, ast.USub)):
+                exponent = exponent.operand
+            if not isinstance(exponent, ast.Constant) or abs(exponent.value) > MAX_EXPONENT:
+                raise FormulaError(f"Exponents must be constants up to {MAX_EXPONENT}")
+            # A tower such as (9 ** 10) ** 10 grows an exact integer without bound
+            if any(isinstance(inner, ast.BinOp) and isinstance(inner.op, ast.Pow) for inner in ast.walk(node.left)):
+                raise FormulaError("Powers cannot be raised to a power")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise FormulaError("Only min, max, abs, round, clip, sqrt and where can be called")
+            if node.keywords:
+                raise FormulaError("Keyword arguments are not allowed")
+        elif isinstance(node, ast.Name):
+            if node.id in FUNCTIONS:
+                continue
+            if node.id.startswith('_') or (parameters is not None and node.id not in parameters):
+                raise FormulaError(f"Unknown name '{node.id}'")
+            used.add(node.id)
+
+    # Helper names may only appear as the function being called
+    called = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in FUNCTIONS and id(node) not in called:
+            raise FormulaError(f"'{node.id}' can only be called")
+    return used
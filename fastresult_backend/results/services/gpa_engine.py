@@ -13,6 +13,16 @@ def calculate_gpa(grade_records):
 
 def calculate_cgpa(student):
     """Calculate cumulative GPA for a student"""
+    from results.models import CGPARecord
+    
+    # Running totals are kept up to date by results.services.cgpa_ledger
+    totals = CGPARecord.objects.filter(student_id=student.pk).values_list(
+        'quality_points', 'total_credits'
+    ).first()
+    if totals is not None:
+        quality_points, total_credits = totals
+        return quality_points / total_credits if total_credits > 0 else 0.0
+    
     gpa_records = student.gpa_records.all()
     if not gpa_records:
         return 0.0
@@ -0,0 +1,111 @@
+"""Semester GPA materialisation
+
+Computes every student's semester GPA with one grouped aggregation over
+Result -> Grade -> Course.credit_hours and upserts the GPARecord rows in
+chunks, instead of one ORM round trip per student. Records of students left
+with no counted results are deleted. Runs for the same semester are
+serialised on the semester row, so two of them never apply the same CGPA
+change twice.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+from results.models import GPARecord, Grade
+from universities.models import Semester
+from results.services import cgpa_ledger, student_blobs
+
+COUNTED_STATUSES = ('approved', 'published')
+DEFAULT_CHUNK_SIZE = 2000
+
+TWO_PLACES = Decimal('0.01')
+
+
+def semester_gpa_rows(semester_id, statuses=COUNTED_STATUSES):
+    """Per-student credits and quality points for a semester, grouped in SQL"""
+    credits = F('result__course__credit_hours')
+    return (
+        Grade.objects
+        .filter(result__semester_id=semester_id, result__status__in=statuses)
+        .values('result__student_id')
+        .annotate(
+            total_credits=Sum(credits),
+            quality_points=Sum(ExpressionWrapper(
+                F('grade_point') * credits,
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )),
+        )
+        .order_by('result__student_id')
+    )
+
+
+def materialize_semester_gpa(semester_id, statuses=COUNTED_STATUSES, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute and upsert GPARecord rows for every student in a semester"""
+    students = 0
+    chunks = 0
+
+    with transaction.atomic():
+        Semester.objects.select_for_update().filter(id=semester_id).first()
+        batch = []
+        for row in semester_gpa_rows(semester_id, statuses).iterator(chunk_size=chunk_size):
+            batch.append(_build_record(semester_id, row))
+            if len(batch) >= chunk_size:
+                _upsert(batch)
+                students += len(batch)
+                chunks += 1
+                batch = []
+        if batch:
+            _upsert(batch)
+            students += len(batch)
+            chunks += 1
+
+        # The post_delete signal takes each removed record out of the CGPA
+        counted = semester_gpa_rows(semester_id, statuses).values('result__student_id')
+        with cgpa_ledger.batched():
+            removed, _ = GPARecord.objects.filter(semester_id=semester_id).exclude(student_id__in=counted).delete()
+
+    return {'semester_id': semester_id, 'students': students, 'chunks': chunks, 'removed': removed}
+
+
+def _build_record(semester_id, row):
+    total_credits = row['total_credits'] or 0
+    quality_points = Decimal(row['quality_points'] or 0).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    gpa = (quality_points / total_credits) if total_credits else Decimal('0')
+    return GPARecord(
+        student_id=row['result__student_id'],
+        semester_id=semester_id,
+        gpa=gpa.quantize(TWO_PLACES, rounding=ROUND_HALF_UP),
+        total_credits=total_credits,
+        quality_points=quality_points,
+    )
+
+
+def _upsert(records):
+    # bulk_create skips the GPARecord signals, so move the CGPA totals and
+    # drop the students' blobs here
+    semester_id = records[0].semester_id
+    previous = {
+        student_id: (quality_points, total_credits)
+        for student_id, quality_points, total_credits in GPARecord.objects.select_for_update().filter(
+            semester_id=semester_id,
+            student_id__in=[record.student_id for record in records],
+        ).values_list('student_id', 'quality_points', 'total_credits')
+    }
+    deltas = {}
+    for record in records:
+        old_quality_points, old_credits = previous.get(record.student_id, (Decimal('0'), 0))
+        deltas[record.student_id] = (
+            record.quality_points - old_quality_points,
+            record.total_credits - old_credits,
+        )
+
+    GPARecord.objects.bulk_create(
+        records,
+        update_conflicts=True,
+        unique_fields=['student', 'semester'],
+        update_fields=['gpa', 'total_credits', 'quality_points'],
+    )
+    cgpa_ledger.apply_bulk_deltas(deltas)
+    student_ids = list(deltas)
+    transaction.on_commit(lambda: student_blobs.invalidate_students(student_ids))
@@ -1,4 +1,11 @@
 """Grading Engine"""
+from bisect import bisect_right
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
 
 GRADE_SCALE = {
     'A': {'min': 90, 'max': 100, 'points': 4.0},
@@ -9,9 +16,96 @@ GRADE_SCALE = {
 }
 
 
+class GradeTable(NamedTuple):
+    """Compiled grading scale, sorted ascending by lower bound"""
+    boundaries: tuple
+    letters: tuple
+    points: tuple
+    max_score: float
+    fail_letter: str
+    fail_points: float
+
+
 def get_grade(score):
     """Get letter grade from score"""
     for grade, scale in GRADE_SCALE.items():
         if scale['min'] <= score <= scale['max']:
             return grade, scale['points']
     return 'F', 0.0
+
+
+def compile_scale(scale=None):
+    """Compile a GRADE_SCALE-style dict into a GradeTable"""
+    scale = GRADE_SCALE if scale is None else scale
+    if isinstance(scale, GradeTable):
+        return scale
+    if not scale:
+        raise ValueError("Grading scale is empty")
+
+    bands = sorted(
+        (float(band['min']), letter, float(band['points']))
+        for letter, band in scale.items()
+    )
+    lowest = bands[0]
+    return GradeTable(
+        boundaries=tuple(band[0] for band in bands),
+        letters=tuple(band[1] for band in bands),
+        points=tuple(band[2] for band in bands),
+        max_score=max(float(band['max']) for band in scale.values()),
+        fail_letter=lowest[1],
+        fail_points=lowest[2],
+    )
+
+
+_DEFAULT_TABLE = compile_scale(GRADE_SCALE)
+
+
+def grade_many(scores, scale=None):
+    """Grade a batch of total scores in one pass.
+
+    Returns ``(letters, points)`` as two lists aligned with ``scores``.
+    Each score falls into the band with the greatest lower bound not above
+    it, so fractional scores between bands (e.g. 89.5) take the lower band
+    instead of dropping to the failing grade. Scores outside the scale's
+    range get the failing grade, as in ``get_grade``.
+    """
+    table = _DEFAULT_TABLE if scale is None else compile_scale(scale)
+    if np is not None:
+        return _grade_many_numpy(scores, table)
+    return _grade_many_bisect(scores, table)
+
+
+def _grade_many_numpy(scores, table):
+    """Vectorised lookup with numpy.searchsorted"""
+    values = np.asarray(scores, dtype=float)
+    if values.size == 0:
+        return [], []
+
+    letters = np.array(table.letters, dtype=object)
+    points = np.array(table.points, dtype=float)
+    index = np.searchsorted(np.array(table.boundaries), values, side='right') - 1
+    out_of_range = (index < 0) | (values > table.max_score) | np.isnan(values)
+    index = np.clip(index, 0, len(table.boundaries) - 1)
+
+    graded_letters = letters[index]
+    graded_points = points[index]
+    graded_letters[out_of_range] = table.fail_letter
+    graded_points[out_of_range] = table.fail_points
+    return graded_letters.tolist(), graded_points.tolist()
+
+
+def _grade_many_bisect(scores, table):
+    """Pure-Python fallback used when numpy is not installed"""
+    boundaries = table.boundaries
+    letters = []
+    points = []
+    for score in scores:
+        score = float(score)
+        index = bisect_right(boundaries, score) - 1
+        if index < 0 or score > table.max_score or score != score:
+            letters.append(table.fail_letter)
+            points.append(table.fail_points)
+        else:
+            letters.append(table.letters[index])
+            points.append(table.points[index])
+    return letters, points
@@ -0,0 +1,103 @@
+"""Per-university grading scale registry
+
+Each university's ``GradingScale`` rows are compiled once into an immutable
+``GradeTable`` and kept in a per-process dict. Every table is tagged with the
+university's version stamp, which lives in the shared cache; changing the
+scale replaces the stamp, so each worker reloads on its next lookup instead
+of querying the database for every grade. That needs a cache shared by all
+workers; see the deploy check in results.checks. With a process-local cache
+(LocMemCache, DummyCache) the stamp cannot be trusted, so each process
+reloads the scale from the database every ``GRADING_SCALE_REFRESH_SECONDS``
+instead.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils import is_process_local_cache
+from results.services.grading_engine import GRADE_SCALE, compile_scale, grade_many
+
+VERSION_KEY = 'grading_scale_version:{university_id}'
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_scale_version(university_id):
+    """Return the current version stamp for a university's grading scale"""
+    key = VERSION_KEY.format(university_id=university_id)
+    version = cache.get(key)
+    if version is None:
+        # A missing stamp (first use or cache eviction) gets a fresh token,
+        # so tables compiled against an evicted stamp can never match again
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_grading_scale(university_id):
+    """Bump the version stamp so every worker recompiles the scale"""
+    cache.set(VERSION_KEY.format(university_id=university_id), uuid.uuid4().hex, timeout=None)
+    with _tables_lock:
+        _tables.pop(university_id, None)
+
+
+def get_grade_table(university_id):
+    """Get the compiled grade table for a university"""
+    if university_id is None:
+        return compile_scale(GRADE_SCALE)
+
+    cached = _tables.get(university_id)
+    if is_process_local_cache():
+        # Another worker's invalidate_grading_scale() never reaches this cache
+        now = time.monotonic()
+        refresh = getattr(settings, 'GRADING_SCALE_REFRESH_SECONDS', 5)
+        if cached is not None and cached[0] is None and now - cached[2] < refresh:
+            return cached[1]
+        table = _load_table(university_id)
+        with _tables_lock:
+            _tables[university_id] = (None, table, now)
+        return table
+
+    version = get_scale_version(university_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    table = _load_table(university_id)
+    with _tables_lock:
+        _tables[university_id] = (version, table, None)
+    return table
+
+
+def grade_for_university(university_id, scores):
+    """Grade a batch of scores against a university's scale"""
+    return grade_many(scores, get_grade_table(university_id))
+
+
+def get_university_grade(university_id, score):
+    """Grade a single score against a university's scale"""
+    letters, points = grade_for_university(university_id, [score])
+    return letters[0], points[0]
+
+
+def clear_local_tables():
+    """Drop this process's compiled tables"""
+    with _tables_lock:
+        _tables.clear()
+
+
+def _load_table(university_id):
+    """Compile a university's GradingScale rows, or the default scale"""
+    from universities.models import GradingScale
+
+    rows = GradingScale.objects.filter(university_id=university_id).values_list(
+        'grade', 'min_score', 'max_score', 'grade_point'
+    )
+    scale = {
+        grade: {'min': min_score, 'max': max_score, 'points': grade_point}
+        for grade, min_score, max_score, grade_point in rows
+    }
+    return compile_scale(scale or GRADE_SCALE)
@@ -0,0 +1,106 @@
+"""Result lock state
+
+Which courses are locked in a semester is kept as a frozenset of course ids,
+shared through the cache and memoised in each process. Every lock change
+bumps the semester's version stamp in the cache (see results.signals), so a
+stale set is never served past the stamp check. Between checks a lookup is
+a dict access plus a set membership test, with no query and no cache call.
+
+Other processes see a change within ``RESULT_LOCK_REFRESH_SECONDS``; the
+process that made the change sees it at once. A process-local cache
+(LocMemCache, DummyCache) cannot carry the stamp to other workers, so with
+one the set is read from the database at every refresh instead.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+from core.utils import is_process_local_cache
+
+CACHE_PREFIX = 'result_locks'
+CACHE_TIMEOUT = 24 * 60 * 60
+
+# semester id -> (stamp, checked_at, frozenset of locked course ids)
+_local = {}
+
+
+class ResultLockedError(PermissionDenied):
+    """Results of the course are locked for the semester"""
+
+
+def _stamp_key(semester_id):
+    return f'{CACHE_PREFIX}:stamp:{semester_id}'
+
+
+def _set_key(semester_id, stamp):
+    return f'{CACHE_PREFIX}:{semester_id}:{stamp}'
+
+
+def _current_stamp(semester_id):
+    key = _stamp_key(semester_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, 1, timeout=None)
+        stamp = cache.get(key, 1)
+    return stamp
+
+
+def _query(semester_id):
+    from results.models import ResultLock
+
+    return frozenset(ResultLock.objects.filter(semester_id=semester_id).values_list('course_id', flat=True))
+
+
+def _load(semester_id, stamp):
+    key = _set_key(semester_id, stamp)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        course_ids = _query(semester_id)
+        cache.set(key, course_ids, timeout=CACHE_TIMEOUT)
+    return course_ids
+
+
+def locked_courses(semester_id):
+    """Course ids locked in the semester"""
+    now = time.monotonic()
+    entry = _local.get(semester_id)
+    if entry and now - entry[1] < getattr(settings, 'RESULT_LOCK_REFRESH_SECONDS', 2):
+        return entry[2]
+
+    if is_process_local_cache():
+        # invalidate() in another worker never reaches this cache
+        course_ids = _query(semester_id)
+        _local[semester_id] = (None, now, course_ids)
+        return course_ids
+
+    stamp = _current_stamp(semester_id)
+    course_ids = entry[2] if entry and entry[0] == stamp else _load(semester_id, stamp)
+    _local[semester_id] = (stamp, now, course_ids)
+    return course_ids
+
+
+def is_locked(course_id, semester_id):
+    return course_id in locked_courses(semester_id)
+
+
+def ensure_unlocked(course_id, semester_id):
+    """Raise ResultLockedError when the course's results are locked"""
+    if is_locked(course_id, semester_id):
+        raise ResultLockedError("Results for this course are locked")
+
+
+def ensure_result_unlocked(result):
+    ensure_unlocked(result.course_id, result.semester_id)
+
+
+def invalidate(semester_id):
+    """Move the semester to a new stamp after a lock is created or removed"""
+    key = _stamp_key(semester_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Stamp expired or was never set; start above any stamp still cached
+        cache.set(key, int(time.time()), timeout=None)
+    _local.pop(semester_id, None)
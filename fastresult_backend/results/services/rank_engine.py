@@ -0,0 +1,111 @@
+"""Rank calculator engine
+
+Computes class positions for a semester with SQL window functions:
+``RANK()`` (competition ranking, ties share a position and leave a gap) or
+``DENSE_RANK()`` (ties share a position, no gap), partitioned by course over
+``Grade.total_score`` and by program or level over ``GPARecord.gpa``. The
+ranked rows are stored in ResultRank so reading a position is a single
+indexed lookup.
+"""
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Window
+from django.db.models.functions import DenseRank, Rank
+
+from results.models import GPARecord, Grade, ResultRank
+
+COUNTED_STATUSES = ('approved', 'published')
+METHODS = {'competition': Rank, 'dense': DenseRank}
+SCOPES = ('course', 'program', 'level')
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def ranked_rows(semester_id, scope, method='competition', statuses=COUNTED_STATUSES):
+    """``(student_id, scope_id, value, position, cohort_size)`` rows ranked in SQL"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown ranking method '{method}'")
+
+    if scope == 'course':
+        qs = Grade.objects.filter(
+            result__semester_id=semester_id, result__status__in=statuses
+        )
+        student, partition, value = 'result__student_id', 'result__course_id', 'total_score'
+    elif scope in ('program', 'level'):
+        qs = GPARecord.objects.filter(semester_id=semester_id)
+        student, value = 'student_id', 'gpa'
+        partition = 'student__program_id' if scope == 'program' else 'student__current_level'
+    else:
+        raise ValueError(f"Unknown ranking scope '{scope}'")
+
+    # Ordering on a float-typed wrapper keeps SQLite from wrapping the
+    # ORDER BY list of a decimal column in CAST(), which is invalid SQL
+    ranked_on = ExpressionWrapper(F(value), output_field=FloatField())
+    return qs.annotate(
+        position=Window(
+            expression=METHODS[method](),
+            partition_by=[F(partition)],
+            order_by=ranked_on.desc(),
+        ),
+        cohort_size=Window(expression=Count('pk'), partition_by=[F(partition)]),
+    ).values_list(student, partition, value, 'position', 'cohort_size')
+
+
+def compute_ranks(semester_id, scopes=SCOPES, method='competition', statuses=COUNTED_STATUSES,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute and store the semester's ranks; returns rows written per scope"""
+    summary = {}
+    with transaction.atomic():
+        for scope in scopes:
+            ResultRank.objects.filter(semester_id=semester_id, scope=scope, method=method).delete()
+            rows = ranked_rows(semester_id, scope, method, statuses).iterator(chunk_size=chunk_size)
+            written = 0
+            batch = []
+            for student_id, scope_id, value, position, cohort_size in rows:
+                if scope_id is None:
+                    continue
+                batch.append(ResultRank(
+                    semester_id=semester_id,
+                    student_id=student_id,
+                    scope=scope,
+                    scope_id=scope_id,
+                    method=method,
+                    value=value,
+                    position=position,
+                    cohort_size=cohort_size,
+                ))
+                if len(batch) >= chunk_size:
+                    ResultRank.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                ResultRank.objects.bulk_create(batch)
+                written += len(batch)
+            summary[scope] = written
+    return summary
+
+
+def get_rank(student_id, semester_id, scope, scope_id, method='competition'):
+    """Stored ``(position, cohort_size)`` for a student, or None"""
+    return ResultRank.objects.filter(
+        semester_id=semester_id,
+        scope=scope,
+        scope_id=scope_id,
+        method=method,
+        student_id=student_id,
+    ).values_list('position', 'cohort_size').first()
+
+
+def get_student_ranks(student_id, semester_id, method='competition'):
+    """All stored positions of a student in a semester, keyed by scope"""
+    return {
+        (scope, scope_id): {'position': position, 'cohort_size': cohort_size, 'value': value}
+        for scope, scope_id, position, cohort_size, value in ResultRank.objects.filter(
+            student_id=student_id, semester_id=semester_id, method=method
+        ).values_list('scope', 'scope_id', 'position', 'cohort_size', 'value')
+    }
+
+
+def top_of_class(semester_id, scope, scope_id, method='competition', limit=10):
+    """Leading students of a course, program or level, from the stored ranks"""
+    return ResultRank.objects.filter(
+        semester_id=semester_id, scope=scope, scope_id=scope_id, method=method
+    ).order_by('position', 'student_id')[:limit]
@@ -0,0 +1,105 @@
+"""Course score computation
+
+Computes the weighted total score of every result in a course offering with
+one aggregate query over ResultComponent, grades the scores in a batch
+against the university's grading scale and upserts the Grade rows in bulk.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Sum, Value
+from django.db.models.functions import Cast, NullIf
+
+from results.models import Grade, Result, ResultComponent
+from results.services.grading_registry import grade_for_university
+
+TWO_PLACES = Decimal('0.01')
+DEFAULT_CHUNK_SIZE = 2000
+
+_SCORE_FIELD = FloatField()
+
+
+def weighted_score(prefix=''):
+    """``Sum(marks_obtained / marks_total * 100 * weight) / Sum(weight)`` over components.
+
+    ``prefix`` is the lookup path from the queried model to ResultComponent
+    (``'components__'`` from Result). Zero weights or totals give NULL.
+
+    Marks are cast to floating point first: SQLite stores whole-number
+    decimals as INTEGER and would otherwise truncate the division.
+    """
+    marks_obtained = Cast(f'{prefix}marks_obtained', _SCORE_FIELD)
+    marks_total = NullIf(F(f'{prefix}marks_total'), Value(0))
+    weight = F(f'{prefix}weight')
+    return ExpressionWrapper(
+        Sum(ExpressionWrapper(
+            marks_obtained * Value(100) * weight / marks_total, output_field=_SCORE_FIELD
+        )) / NullIf(Sum(weight), Value(0)),
+        output_field=_SCORE_FIELD,
+    )
+
+
+def result_total_score(result_id):
+    """Weighted total score of a single result, or None without weighted components"""
+    total = ResultComponent.objects.filter(result_id=result_id).aggregate(
+        total_score=weighted_score()
+    )['total_score']
+    return _quantize(total) if total is not None else None
+
+
+def course_scores(course_id, semester_id, statuses=None):
+    """``(result_id, total_score)`` for every result in a course offering, in one query"""
+    qs = Result.objects.filter(course_id=course_id, semester_id=semester_id)
+    if statuses:
+        qs = qs.filter(status__in=statuses)
+    return (
+        qs.annotate(total_score=weighted_score('components__'))
+        .order_by('id')
+        .values_list('id', 'total_score')
+    )
+
+
+def grade_course(course_id, semester_id, statuses=None, university_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compute, grade and upsert Grade rows for a whole course offering"""
+    if university_id is None:
+        from universities.models import Semester
+
+        university_id = Semester.objects.filter(id=semester_id).values_list(
+            'academic_year__university_id', flat=True
+        ).first()
+
+    scored = []
+    skipped = 0
+    for result_id, total_score in course_scores(course_id, semester_id, statuses):
+        if total_score is None:
+            skipped += 1
+            continue
+        scored.append((result_id, _quantize(total_score)))
+
+    with transaction.atomic():
+        for start in range(0, len(scored), chunk_size):
+            chunk = scored[start:start + chunk_size]
+            letters, points = grade_for_university(university_id, [score for _, score in chunk])
+            Grade.objects.bulk_create(
+                [
+                    Grade(
+                        result_id=result_id,
+                        total_score=score,
+                        letter_grade=letter,
+                        grade_point=Decimal(str(point)).quantize(TWO_PLACES),
+                    )
+                    for (result_id, score), letter, point in zip(chunk, letters, points)
+                ],
+                update_conflicts=True,
+                unique_fields=['result'],
+                update_fields=['total_score', 'letter_grade', 'grade_point', 'updated_at'],
+            )
+
+    return {'graded': len(scored), 'skipped': skipped}
+
+
+def _quantize(value):
+    if isinstance(value, float):
+        # Drop float noise (62.744999...) so half-up rounding sees the real value
+        value = str(round(value, 9))
+    return Decimal(value).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
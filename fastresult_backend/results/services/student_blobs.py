@@ -0,0 +1,201 @@
+"""Precomputed student result blobs
+
+When results are released, every affected student's ``my_results``,
+``my_gpa`` and ``my_cgpa`` responses are rendered once, gzipped and stored
+in the cache keyed by user id, together with an ETag. The student endpoints
+then answer from the cache: a conditional request gets a 304, and any other
+request gets the stored gzip bytes. Neither touches the result tables. A
+blob missing from the cache (evicted, expired or never released) is built
+for that one student on first request.
+
+The payloads come from the existing serializers, so the JSON is the same as
+before. Only released results (approved or published in a released
+semester/course) are listed in ``my_results``.
+
+Each student's transcript content hash (see transcript_builder) is cached
+alongside the blobs and dropped with them.
+"""
+import gzip
+import hashlib
+import json
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Exists, OuterRef, Q
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('results', 'gpa', 'cgpa')
+CACHE_PREFIX = 'student_blob'
+PRECOMPUTE_CHUNK_SIZE = 500
+RELEASED_STATUSES = ('approved', 'published')
+
+
+def blob_timeout():
+    return getattr(settings, 'STUDENT_BLOB_TIMEOUT', 7 * 24 * 60 * 60)
+
+
+def cache_key(kind, user_id):
+    return f'{CACHE_PREFIX}:{kind}:{user_id}'
+
+
+def transcript_hash_key(student_id):
+    return f'{CACHE_PREFIX}:transcript_hash:{student_id}'
+
+
+def encode(status_code, payload):
+    """``(status_code, etag, gzipped JSON)`` for a payload"""
+    raw = json.dumps(payload, cls=JSONEncoder, separators=(',', ':')).encode()
+    etag = '"%s"' % hashlib.blake2b(raw, digest_size=16).hexdigest()
+    return status_code, etag, gzip.compress(raw, compresslevel=6)
+
+
+def released_results():
+    """Results that a release has made visible to students"""
+    from results.models import Result, ResultRelease
+
+    release = ResultRelease.objects.filter(semester_id=OuterRef('semester_id')).filter(
+        Q(course__isnull=True) | Q(course_id=OuterRef('course_id'))
+    )
+    return Result.objects.filter(Exists(release), status__in=RELEASED_STATUSES)
+
+
+def render_students(student_ids):
+    """``{user_id: {kind: blob}}`` for the students, in four queries"""
+    from results.models import CGPARecord, GPARecord
+    from results.serializers import CGPARecordSerializer, GPARecordSerializer, ResultSerializer
+    from students.models import StudentProfile
+
+    users = dict(StudentProfile.objects.filter(id__in=student_ids).values_list('id', 'user_id'))
+    results = {student_id: [] for student_id in users}
+    for row in ResultSerializer(
+        released_results().filter(student_id__in=users)
+        .select_related('student', 'course', 'semester__academic_year')
+        .order_by('course__code'),
+        many=True,
+    ).data:
+        results[row['student']].append(row)
+    gpas = {student_id: [] for student_id in users}
+    for row in GPARecordSerializer(
+        GPARecord.objects.filter(student_id__in=users)
+        .select_related('student', 'semester__academic_year')
+        .order_by('id'),
+        many=True,
+    ).data:
+        gpas[row['student']].append(row)
+    cgpas = {
+        row['student']: row for row in CGPARecordSerializer(
+            CGPARecord.objects.filter(student_id__in=users).select_related('student'), many=True
+        ).data
+    }
+
+    rendered = {}
+    for student_id, user_id in users.items():
+        cgpa = cgpas.get(student_id)
+        rendered[user_id] = {
+            'results': encode(200, _page(results[student_id])),
+            'gpa': encode(200, _page(gpas[student_id])),
+            'cgpa': encode(200, cgpa) if cgpa else encode(404, {'error': 'CGPA record not found'}),
+        }
+    return rendered
+
+
+def _page(rows):
+    # Same shape as the paginated list responses
+    return {'count': len(rows), 'next': None, 'previous': None, 'results': rows}
+
+
+def store(rendered):
+    cache.set_many(
+        {cache_key(kind, user_id): blob for user_id, blobs in rendered.items() for kind, blob in blobs.items()},
+        timeout=blob_timeout(),
+    )
+
+
+def get_blob(user, kind):
+    """Cached blob for the user, built on a miss; None when the user is not a student"""
+    blob = cache.get(cache_key(kind, user.id))
+    if blob is not None:
+        return blob
+    from students.models import StudentProfile
+
+    student_id = StudentProfile.objects.filter(user_id=user.id).values_list('id', flat=True).first()
+    if student_id is None:
+        return None
+    rendered = render_students([student_id])
+    store(rendered)
+    return rendered[user.id][kind]
+
+
+def invalidate_students(student_ids):
+    """Drop the students' blobs after their results, GPA or CGPA change"""
+    from students.models import StudentProfile
+
+    keys = []
+    for student_id, user_id in StudentProfile.objects.filter(id__in=student_ids).values_list('id', 'user_id'):
+        keys.append(transcript_hash_key(student_id))
+        keys.extend(cache_key(kind, user_id) for kind in KINDS)
+    cache.delete_many(keys)
+
+
+def precompute(student_ids, chunk_size=PRECOMPUTE_CHUNK_SIZE):
+    """Render and cache blobs for the students; returns how many were stored"""
+    student_ids = iter(student_ids)
+    stored = 0
+    while True:
+        chunk = list(islice(student_ids, chunk_size))
+        if not chunk:
+            return stored
+        rendered = render_students(chunk)
+        store(rendered)
+        stored += len(rendered)
+
+
+def release_student_ids(semester_id, course_id=None):
+    from results.models import Result
+
+    results = Result.objects.filter(semester_id=semester_id)
+    if course_id:
+        results = results.filter(course_id=course_id)
+    return results.order_by('student_id').values_list('student_id', flat=True).distinct()
+
+
+def precompute_release(release_id):
+    """Refresh the blobs of every student a release affects"""
+    from results.models import ResultRelease
+
+    release = ResultRelease.objects.filter(id=release_id).values('semester_id', 'course_id').first()
+    if release is None:
+        return 0
+    stored = precompute(release_student_ids(release['semester_id'], release['course_id']).iterator())
+    logger.info("Precomputed result blobs for %s students of release %s", stored, release_id)
+    return stored
+
+
+def schedule_release(release_id):
+    """Precompute a release's blobs off the request thread"""
+    if getattr(settings, 'BACKGROUND_JOB_BACKEND', 'thread') == 'celery':
+        try:
+            from results.tasks import precompute_release_blobs
+
+            precompute_release_blobs.delay(release_id)
+            return
+        except Exception:
+            logger.exception("Could not queue blob precompute for release %s on Celery", release_id)
+    from results.services.upload_jobs import get_executor
+
+    get_executor().submit(_precompute_in_thread, release_id)
+
+
+def _precompute_in_thread(release_id):
+    close_old_connections()
+    try:
+        precompute_release(release_id)
+    except Exception:
+        logger.exception("Blob precompute for release %s failed", release_id)
+    finally:
+        close_old_connections()
@@ -0,0 +1,181 @@
+"""Bulk transcript generation
+
+Renders transcripts for a whole cohort. Each chunk of students is loaded
+with a handful of grouped queries (profiles, result rows, GPA totals), the
+PDFs are rendered in a process pool straight into ``files.transcript_files``
+and the ``Transcript`` rows are bulk-created once the chunk is done. Files
+are written atomically and only reused through their recorded content hash,
+so a rerun with the same batch label picks up after the last recorded chunk
+and re-renders anything whose results changed since. Students whose
+transcript content hash already has a file are not rendered at all.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+from django.utils import timezone
+
+from files import transcript_files
+from results.models import Result, Transcript
+from results.services.transcript_builder import (
+    COUNTED_STATUSES, RESULT_ROW_FIELDS, RESULT_ROW_ORDER, TEMPLATE_VERSION,
+    content_hash, get_template, group_result_rows, render_transcript, transcript_totals
+)
+from students.models import StudentProfile
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def cohort_student_ids(program_id=None, department_id=None, matric_numbers=None):
+    """Student ids for a program, a department or an explicit graduation list"""
+    qs = StudentProfile.objects.all()
+    if program_id:
+        qs = qs.filter(program_id=program_id)
+    if department_id:
+        qs = qs.filter(program__department_id=department_id)
+    if matric_numbers is not None:
+        qs = qs.filter(matric_number__in=list(matric_numbers))
+    return list(qs.order_by('id').values_list('id', flat=True))
+
+
+def load_cohort_data(student_ids, statuses=COUNTED_STATUSES, issuer=''):
+    """Build render input for many students with one query per table"""
+    profiles = {
+        row[0]: row
+        for row in StudentProfile.objects.filter(id__in=student_ids).values_list(
+            'id', 'matric_number', 'user__first_name', 'user__last_name', 'program__name'
+        )
+    }
+
+    rows_by_student = {student_id: [] for student_id in student_ids}
+    result_rows = Result.objects.filter(
+        student_id__in=student_ids,
+        status__in=statuses,
+    ).order_by('student_id', *RESULT_ROW_ORDER).values_list('student_id', *RESULT_ROW_FIELDS)
+    for row in result_rows.iterator(chunk_size=2000):
+        rows_by_student[row[0]].append(row[1:])
+
+    totals = transcript_totals(student_ids)
+
+    generated_at = timezone.now()
+    data = {}
+    for student_id in student_ids:
+        profile = profiles.get(student_id)
+        if profile is None:
+            continue
+        _, matric_number, first_name, last_name, program = profile
+        name = f"{first_name} {last_name}".strip()
+        rows = rows_by_student[student_id]
+        semesters = [
+            (label, list(semester_rows)) for label, semester_rows in group_result_rows(rows)
+        ]
+        cgpa, total_credits = totals[student_id]
+        data[student_id] = {
+            'student': {
+                'name': name,
+                'matric_number': matric_number,
+                'program': program,
+            },
+            'university': issuer,
+            'semesters': semesters,
+            'cgpa': cgpa,
+            'total_credits': total_credits,
+            'generated_at': generated_at,
+            'content_hash': content_hash((name, matric_number, program), rows, cgpa, total_credits, issuer),
+        }
+    return data
+
+
+def generate_cohort_transcripts(student_ids, batch, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                                resume=True, progress=None):
+    """Render and record transcripts for every student, chunk by chunk.
+
+    Students whose recorded transcript from an earlier batch has the same
+    content hash are counted as unchanged and not rendered. With ``resume``
+    set, a file already recorded for this batch under the current hash is
+    skipped as well; one whose recorded hash is stale, or that was written
+    but never recorded, is rendered again. ``progress`` is called with the
+    running summary after each chunk.
+    """
+    from django.conf import settings
+
+    issuer = getattr(settings, 'TRANSCRIPT_ISSUER', '')
+    workers = workers or os.cpu_count() or 1
+    summary = {
+        'students': 0, 'rendered': 0, 'skipped': 0, 'unchanged': 0,
+        'pages': 0, 'chunks': 0, 'elapsed': 0.0,
+    }
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for start in range(0, len(student_ids), chunk_size):
+            chunk = student_ids[start:start + chunk_size]
+            cohort = load_cohort_data(chunk, issuer=issuer)
+            names = {
+                student_id: transcript_files.transcript_name(data['student']['matric_number'], batch)
+                for student_id, data in cohort.items()
+            }
+
+            # A file is only reused when its recorded hash is the current one
+            current = {}
+            for student_id, file_name, recorded_hash in Transcript.objects.filter(
+                student_id__in=cohort.keys(),
+                content_hash__in=[data['content_hash'] for data in cohort.values()],
+            ).exclude(file='').values_list('student_id', 'file', 'content_hash'):
+                if recorded_hash == cohort[student_id]['content_hash'] and transcript_files.exists(file_name):
+                    if file_name != names[student_id] or resume:
+                        current.setdefault(student_id, file_name)
+
+            jobs = []
+            for student_id, data in cohort.items():
+                if student_id in current:
+                    summary['skipped' if current[student_id] == names[student_id] else 'unchanged'] += 1
+                    continue
+                jobs.append((student_id, transcript_files.absolute_path(names[student_id]), data))
+
+            rendered = []
+            for student_id, pages in pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))):
+                rendered.append(student_id)
+                summary['rendered'] += 1
+                summary['pages'] += pages
+
+            with transaction.atomic():
+                # Rows for an overwritten file describe its old content
+                stale = [
+                    transcript_id for transcript_id, student_id, file_name in Transcript.objects.filter(
+                        student_id__in=rendered, file__in=[names[student_id] for student_id in rendered]
+                    ).values_list('id', 'student_id', 'file')
+                    if file_name == names[student_id]
+                ]
+                Transcript.objects.filter(id__in=stale).delete()
+                Transcript.objects.bulk_create([
+                    Transcript(
+                        student_id=student_id,
+                        file=names[student_id],
+                        content_hash=cohort[student_id]['content_hash'],
+                        template_version=TEMPLATE_VERSION,
+                    )
+                    for student_id in rendered
+                ], batch_size=chunk_size)
+
+            summary['students'] += len(cohort)
+            summary['chunks'] += 1
+            summary['elapsed'] = time.perf_counter() - started
+            if progress:
+                progress(dict(summary))
+
+    summary['elapsed'] = time.perf_counter() - started
+    return summary
+
+
+def render_job(job):
+    """Process pool entry point: render one transcript to its final path"""
+    student_id, path, data = job
+    pages = transcript_files.write_atomic(path, lambda output: render_transcript(data, output))
+    return student_id, pages
+
+
+def _init_worker():
+    # Register fonts and build the page template before the first job
+    get_template()
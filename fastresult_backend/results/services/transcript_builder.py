@@ -1 +1,424 @@
-"""Transcript Builder"""
+"""Transcript Builder
+
+Renders student transcripts to PDF with reportlab. Result rows are consumed
+lazily and drawn page by page onto a canvas that writes straight to the
+caller's file-like object, so a long transcript never has to be assembled as
+a whole in Python first. Fonts, page templates and artwork are set up once
+per worker process and reused by every render.
+"""
+import hashlib
+import itertools
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+# Bump whenever the rendered layout changes
+TEMPLATE_VERSION = 1
+
+COUNTED_STATUSES = ('approved', 'published')
+TWO_PLACES = Decimal('0.01')
+
+RESULT_ROW_FIELDS = (
+    'semester__academic_year__year',
+    'semester__number',
+    'course__code',
+    'course__name',
+    'course__credit_hours',
+    'grade__letter_grade',
+    'grade__grade_point',
+)
+RESULT_ROW_ORDER = ('semester__academic_year__year', 'semester__number', 'course__code')
+
+_fonts_lock = threading.Lock()
+_registered_fonts = None
+
+
+class TranscriptTemplate(NamedTuple):
+    """Page geometry and assets shared by every transcript render"""
+    page_size: tuple
+    margin: float
+    font: str
+    bold_font: str
+    font_size: float
+    row_height: float
+    header_height: float
+    columns: tuple
+    logo_path: str
+
+
+def register_fonts():
+    """Register configured TTF fonts once per process.
+
+    ``TRANSCRIPT_FONTS = {'regular': path, 'bold': path}`` in settings swaps
+    the built-in Helvetica faces for custom ones.
+    """
+    global _registered_fonts
+    if _registered_fonts is not None:
+        return _registered_fonts
+
+    with _fonts_lock:
+        if _registered_fonts is None:
+            fonts = getattr(settings, 'TRANSCRIPT_FONTS', None) or {}
+            regular, bold = 'Helvetica', 'Helvetica-Bold'
+            if fonts.get('regular'):
+                pdfmetrics.registerFont(TTFont('Transcript', fonts['regular']))
+                regular = bold = 'Transcript'
+            if fonts.get('bold'):
+                pdfmetrics.registerFont(TTFont('Transcript-Bold', fonts['bold']))
+                bold = 'Transcript-Bold'
+            _registered_fonts = (regular, bold)
+    return _registered_fonts
+
+
+@lru_cache(maxsize=8)
+def get_template(logo_path=None):
+    """Build (once) the page template for a logo"""
+    regular, bold = register_fonts()
+    width, _ = A4
+    margin = 18 * mm
+    content_width = width - 2 * margin
+    columns = (
+        ('Code', margin, 'left'),
+        ('Course Title', margin + 0.16 * content_width, 'left'),
+        ('Credits', margin + 0.74 * content_width, 'right'),
+        ('Grade', margin + 0.86 * content_width, 'right'),
+        ('Points', width - margin, 'right'),
+    )
+    return TranscriptTemplate(
+        page_size=A4,
+        margin=margin,
+        font=regular,
+        bold_font=bold,
+        font_size=9,
+        row_height=5 * mm,
+        header_height=58 * mm,
+        columns=columns,
+        logo_path=logo_path or getattr(settings, 'TRANSCRIPT_LOGO_PATH', '') or '',
+    )
+
+
+@lru_cache(maxsize=8)
+def _load_artwork(path):
+    """Decode static artwork once per worker"""
+    return ImageReader(path)
+
+
+def render_transcript(data, output, template=None):
+    """Render a transcript to ``output`` and return the number of pages.
+
+    ``data`` holds ``student`` (name, matric_number, program), optional
+    ``university``, ``cgpa``, ``total_credits`` and ``generated_at``, and
+    ``semesters`` - either a dict of semester label to rows or an iterable
+    of ``(label, rows)`` pairs. Each row is a dict with ``course_code``,
+    ``course_title``, ``credits``, ``grade`` and ``points``, and may come
+    from a generator.
+    """
+    template = template or get_template()
+    pdf = canvas.Canvas(output, pagesize=template.page_size, pageCompression=1)
+    pdf.setTitle(f"Transcript - {data['student'].get('matric_number', '')}")
+
+    page = _TranscriptPage(pdf, template, data)
+    page.start()
+
+    total_credits = 0
+    total_points = Decimal('0')
+    for label, rows in _iter_semesters(data['semesters']):
+        page.semester_heading(label)
+        semester_credits = 0
+        semester_points = Decimal('0')
+        for row in rows:
+            page.course_row(row)
+            credits = int(row.get('credits') or 0)
+            semester_credits += credits
+            semester_points += Decimal(str(row.get('points') or 0)) * credits
+        page.summary_line(
+            f"Semester credits: {semester_credits}    "
+            f"Semester GPA: {_format_gpa(semester_points, semester_credits)}"
+        )
+        total_credits += semester_credits
+        total_points += semester_points
+
+    cgpa = data.get('cgpa')
+    if cgpa is None:
+        cgpa = _format_gpa(total_points, total_credits)
+    page.closing_block(data.get('total_credits', total_credits), cgpa)
+    page.finish()
+    pdf.save()
+    return page.number
+
+
+def transcript_rows(student_id, statuses=COUNTED_STATUSES):
+    """Queryset of ``RESULT_ROW_FIELDS`` tuples in transcript order"""
+    from results.models import Result
+
+    return Result.objects.filter(
+        student_id=student_id,
+        status__in=statuses,
+    ).order_by(*RESULT_ROW_ORDER).values_list(*RESULT_ROW_FIELDS)
+
+
+def content_hash(student, rows, cgpa=None, total_credits=None, issuer=''):
+    """Hash of everything a transcript shows, plus the template version.
+
+    ``student`` is the ``(name, matric_number, program)`` header, ``rows``
+    the ``RESULT_ROW_FIELDS`` tuples in transcript order, ``cgpa`` and
+    ``total_credits`` the printed closing block and ``issuer`` the
+    letterhead.
+    """
+    digest = hashlib.sha256(f"v{TEMPLATE_VERSION}".encode())
+    digest.update(repr(tuple(str(value) for value in student)).encode())
+    digest.update(repr((str(issuer), str(cgpa), str(total_credits))).encode())
+    for row in rows:
+        digest.update(repr(tuple(str(value) for value in row)).encode())
+    return digest.hexdigest()
+
+
+def student_header(student):
+    """``(name, matric_number, program)`` for a StudentProfile"""
+    return (student.user.get_full_name(), student.matric_number, str(student.program))
+
+
+def transcript_issuer():
+    return getattr(settings, 'TRANSCRIPT_ISSUER', '')
+
+
+def transcript_totals(student_ids):
+    """``{student_id: (cgpa, total_credits)}`` as printed, from the CGPA ledger.
+
+    Single and batch renders both take their totals from here, so the two
+    paths hash the same content. Students without a CGPARecord get
+    ``('0.00', 0)``.
+    """
+    from results.models import CGPARecord
+    from results.services.cgpa_ledger import compute_cgpa
+
+    totals = {student_id: (str(compute_cgpa(0, 0)), 0) for student_id in student_ids}
+    for student_id, quality_points, total_credits in CGPARecord.objects.filter(
+        student_id__in=student_ids
+    ).values_list('student_id', 'quality_points', 'total_credits'):
+        total_credits = total_credits or 0
+        totals[student_id] = (str(compute_cgpa(quality_points or 0, total_credits)), total_credits)
+    return totals
+
+
+def student_totals(student_id):
+    """transcript_totals() for one student"""
+    return transcript_totals([student_id])[student_id]
+
+
+def student_content_hash(student, totals=None, statuses=COUNTED_STATUSES, chunk_size=500):
+    """Content hash of a student's current transcript, streamed from the DB.
+
+    Reads all of the student's counted result rows; ``totals`` is the
+    student_totals() pair when the caller already has it.
+    """
+    cgpa, total_credits = totals or student_totals(student.pk)
+    rows = transcript_rows(student.pk, statuses).iterator(chunk_size=chunk_size)
+    return content_hash(student_header(student), rows, cgpa, total_credits, transcript_issuer())
+
+
+def current_content_hash(student):
+    """Cached student_content_hash() for the student's current transcript.
+
+    The entry is dropped by student_blobs.invalidate_students() whenever the
+    student's results, GPA or CGPA change, and is tagged with the template
+    version, issuer and profile fields so a change to those misses too.
+    """
+    from results.services.student_blobs import blob_timeout, transcript_hash_key
+
+    key = transcript_hash_key(student.pk)
+    tag = (TEMPLATE_VERSION, transcript_issuer(), student.matric_number, student.program_id, student.user_id)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == tag:
+        return cached[1]
+    value = student_content_hash(student)
+    cache.set(key, (tag, value), timeout=blob_timeout())
+    return value
+
+
+def collect_transcript_data(student, totals=None, statuses=COUNTED_STATUSES, chunk_size=500):
+    """Build render input for a student, streaming result rows from the DB"""
+    rows = transcript_rows(student.pk, statuses).iterator(chunk_size=chunk_size)
+    cgpa, total_credits = totals or student_totals(student.pk)
+
+    name, matric_number, program = student_header(student)
+    data = {
+        'student': {
+            'name': name,
+            'matric_number': matric_number,
+            'program': program,
+        },
+        'university': transcript_issuer(),
+        'semesters': group_result_rows(rows),
+        'generated_at': timezone.now(),
+    }
+    data['cgpa'], data['total_credits'] = cgpa, total_credits
+    return data
+
+
+def group_result_rows(rows):
+    """Group ``(year, number, code, title, credits, grade, points)`` rows by semester"""
+    for (year, number), semester_rows in itertools.groupby(rows, key=lambda row: (row[0], row[1])):
+        yield f"{year} - Semester {number}", (
+            {
+                'course_code': code,
+                'course_title': title,
+                'credits': credits or 0,
+                'grade': grade or 'N/A',
+                'points': float(points) if points is not None else 0.0,
+            }
+            for _, _, code, title, credits, grade, points in semester_rows
+        )
+
+
+def _iter_semesters(semesters):
+    if isinstance(semesters, dict):
+        return semesters.items()
+    return semesters
+
+
+def _format_gpa(points, credits):
+    if not credits:
+        return '0.00'
+    return str((Decimal(points) / credits).quantize(TWO_PLACES, rounding=ROUND_HALF_UP))
+
+
+class _TranscriptPage:
+    """Cursor over the current page of a transcript canvas"""
+
+    LETTERHEAD = 'transcript-letterhead'
+
+    def __init__(self, pdf, template, data):
+        self.pdf = pdf
+        self.template = template
+        self.data = data
+        self.number = 0
+        self.y = 0
+        _, self.height = template.page_size
+
+    def start(self):
+        self._define_letterhead()
+        self._begin_page()
+
+    def semester_heading(self, label):
+        self._ensure_room(3)
+        self.y -= self.template.row_height * 0.5
+        self.pdf.setFont(self.template.bold_font, self.template.font_size + 1)
+        self.pdf.drawString(self.template.margin, self.y, label)
+        self.y -= self.template.row_height
+        self._column_header()
+
+    def course_row(self, row):
+        if self._ensure_room(1):
+            self._column_header()
+        values = (
+            str(row.get('course_code', '')),
+            str(row.get('course_title', ''))[:60],
+            str(row.get('credits', '')),
+            str(row.get('grade', '')),
+            f"{float(row.get('points') or 0):.2f}",
+        )
+        self._draw_columns(values, self.template.font)
+
+    def summary_line(self, text):
+        self._ensure_room(1)
+        self.pdf.setFont(self.template.bold_font, self.template.font_size)
+        self.pdf.drawRightString(self._right_edge(), self.y, text)
+        self.y -= self.template.row_height
+
+    def closing_block(self, total_credits, cgpa):
+        self._ensure_room(3)
+        self.y -= self.template.row_height
+        self.pdf.line(self.template.margin, self.y + self.template.row_height * 0.6,
+                      self._right_edge(), self.y + self.template.row_height * 0.6)
+        self.pdf.setFont(self.template.bold_font, self.template.font_size + 1)
+        self.pdf.drawString(self.template.margin, self.y, f"Total credits: {total_credits}")
+        self.pdf.drawRightString(self._right_edge(), self.y, f"CGPA: {cgpa}")
+        self.y -= self.template.row_height
+
+    def finish(self):
+        self._page_footer()
+
+    def _define_letterhead(self):
+        """Draw the static header once as a form and reuse it on every page"""
+        template = self.template
+        pdf = self.pdf
+        student = self.data['student']
+        top = self.height - template.margin
+
+        pdf.beginForm(self.LETTERHEAD)
+        text_left = template.margin
+        if template.logo_path:
+            logo_size = 20 * mm
+            pdf.drawImage(
+                _load_artwork(template.logo_path), template.margin, top - logo_size,
+                width=logo_size, height=logo_size, preserveAspectRatio=True, mask='auto'
+            )
+            text_left += logo_size + 5 * mm
+        pdf.setFont(template.bold_font, 14)
+        pdf.drawString(text_left, top - 7 * mm, self.data.get('university') or 'Academic Transcript')
+        pdf.setFont(template.font, 10)
+        pdf.drawString(text_left, top - 13 * mm, 'Official Academic Transcript')
+
+        pdf.setFont(template.font, template.font_size + 1)
+        details = (
+            ('Name', student.get('name', '')),
+            ('Matric number', student.get('matric_number', '')),
+            ('Programme', student.get('program', '')),
+        )
+        line_y = top - 30 * mm
+        for label, value in details:
+            pdf.drawString(template.margin, line_y, f"{label}: {value}")
+            line_y -= 5 * mm
+        pdf.line(template.margin, top - template.header_height + 8 * mm,
+                 self._right_edge(), top - template.header_height + 8 * mm)
+        pdf.endForm()
+
+    def _begin_page(self):
+        self.number += 1
+        self.pdf.doForm(self.LETTERHEAD)
+        self.y = self.height - self.template.margin - self.template.header_height
+
+    def _ensure_room(self, rows):
+        """Start a new page when fewer than ``rows`` rows fit; return True if it did"""
+        if self.y - rows * self.template.row_height >= self.template.margin + self.template.row_height:
+            return False
+        self._page_footer()
+        self.pdf.showPage()
+        self._begin_page()
+        return True
+
+    def _column_header(self):
+        self._draw_columns([column[0] for column in self.template.columns], self.template.bold_font)
+
+    def _draw_columns(self, values, font):
+        self.pdf.setFont(font, self.template.font_size)
+        for value, (_, x, align) in zip(values, self.template.columns):
+            if align == 'right':
+                self.pdf.drawRightString(x, self.y, value)
+            else:
+                self.pdf.drawString(x, self.y, value)
+        self.y -= self.template.row_height
+
+    def _page_footer(self):
+        generated_at = self.data.get('generated_at') or timezone.now()
+        self.pdf.setFont(self.template.font, 7)
+        self.pdf.drawString(
+            self.template.margin, self.template.margin / 2,
+            f"Generated {generated_at:%Y-%m-%d %H:%M} UTC"
+        )
+        self.pdf.drawRightString(self._right_edge(), self.template.margin / 2, f"Page {self.number}")
+
+    def _right_edge(self):
+        return self.template.page_size[0] - self.template.margin
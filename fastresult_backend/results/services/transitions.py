@@ -0,0 +1,87 @@
+"""Result status transitions
+
+Moves many results between statuses with one guarded UPDATE per chunk
+instead of a save() per row. The rows still in the source status are
+locked and collected first, so the returned ids are exactly the results
+that changed, and every changed result gets its own audit row through a
+single bulk insert. Moves into or within the released statuses drop the
+students' precomputed result blobs once the transaction commits.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from results.models import Result
+from results.services import student_blobs
+
+CHUNK_SIZE = 2000
+
+# Source status -> statuses a result may move to
+ALLOWED_TRANSITIONS = {
+    'draft': {'submitted'},
+    'submitted': {'under_review', 'draft', 'rejected'},
+    # under_review -> under_review is the HOD sign-off before the exam officer
+    'under_review': {'under_review', 'approved', 'draft', 'rejected'},
+    'approved': {'published'},
+    'rejected': {'draft'},
+    'published': set(),
+}
+
+
+class InvalidTransition(ValueError):
+    """Status change is not part of the result workflow"""
+
+
+class ResultTransitionService:
+    """Bulk result status changes with per-result audit"""
+
+    @staticmethod
+    def check(from_status, to_status, allowed=None):
+        """Raise InvalidTransition unless the workflow allows the change"""
+        if to_status not in (allowed or ALLOWED_TRANSITIONS).get(from_status, ()):
+            raise InvalidTransition(f"Results cannot move from '{from_status}' to '{to_status}'")
+
+    @staticmethod
+    def transition(user, result_ids, from_status, to_status, action, filters=None, audit_values=None,
+                   allowed=None):
+        """Move results still in ``from_status`` to ``to_status``; returns the changed ids.
+
+        ``filters`` narrows the rows further (e.g. to a department) and
+        ``audit_values`` is merged into each result's audit entry. ``allowed``
+        replaces the built-in transition table, e.g. with a compiled workflow's.
+        """
+        from systemadmin.services import AuditLogService
+
+        ResultTransitionService.check(from_status, to_status, allowed)
+        result_ids = list(dict.fromkeys(result_ids))
+        changed = []
+        student_ids = set()
+        now = timezone.now()
+
+        with transaction.atomic():
+            for start in range(0, len(result_ids), CHUNK_SIZE):
+                chunk = result_ids[start:start + CHUNK_SIZE]
+                qs = Result.objects.filter(id__in=chunk, status=from_status, **(filters or {}))
+                # filters may join course/program/department; lock only the result rows
+                rows = list(qs.select_for_update(of=('self',)).values_list('id', 'student_id'))
+                if not rows:
+                    continue
+                ids = [result_id for result_id, _ in rows]
+                student_ids.update(student_id for _, student_id in rows)
+                Result.objects.filter(id__in=ids, status=from_status).update(
+                    status=to_status, updated_at=now, version=F('version') + 1
+                )
+                changed.extend(ids)
+
+            if changed:
+                new_values = {'status': to_status, **(audit_values or {})}
+                AuditLogService.log_bulk(
+                    user=getattr(user, 'username', user),
+                    action=action,
+                    model_name='Result',
+                    entries=[(result_id, {'status': from_status}, new_values) for result_id in changed],
+                )
+            if student_ids and {from_status, to_status} & set(student_blobs.RELEASED_STATUSES):
+                transaction.on_commit(lambda: student_blobs.invalidate_students(student_ids))
+
+        return changed
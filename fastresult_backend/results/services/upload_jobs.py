@@ -0,0 +1,166 @@
+"""Background score upload jobs
+
+A ScoreUploadJob stores the uploaded sheet and is processed off the request
+thread, on Celery when ``BACKGROUND_JOB_BACKEND = 'celery'`` and otherwise in
+a small in-process thread pool. Each chunk commits together with the job's
+checkpoint, so a job interrupted by a crash resumes after the last
+committed chunk instead of starting over.
+
+A runner claims a job with a conditional UPDATE on its status before
+touching it. The queued worker only claims a pending job and a resume only
+claims one that has been idle past the stale threshold, so a job is never
+processed by two runners at once.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from results.bulk_upload import detect_format, iter_rows, iter_score_rows, load_score_rows
+from results.bulk_upload.loader import merge_summary
+from results.models import ScoreUploadJob
+
+logger = logging.getLogger(__name__)
+
+MAX_STORED_ERRORS = 1000
+STALE_AFTER = timedelta(minutes=10)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def create_job(user, course_id, semester_id, file, components=None):
+    """Store the upload and queue it once the transaction commits"""
+    file_format = detect_format(getattr(file, 'name', ''))
+    job = ScoreUploadJob(
+        uploaded_by=user,
+        course_id=course_id,
+        semester_id=semester_id,
+        file_format=file_format,
+        components=components or {},
+    )
+    job.file.save(file.name, file, save=False)
+    job.save()
+    transaction.on_commit(lambda: dispatch(job.id))
+    return job
+
+
+def dispatch(job_id):
+    """Hand a job to Celery or the thread pool"""
+    if getattr(settings, 'BACKGROUND_JOB_BACKEND', 'thread') == 'celery':
+        try:
+            from results.tasks import process_score_upload
+
+            process_score_upload.delay(job_id)
+            return
+        except Exception:
+            logger.exception("Could not queue score upload %s on Celery, running in-process", job_id)
+    get_executor().submit(_run_in_thread, job_id)
+
+
+def claim_job(job_id, stale_after=None, include_failed=False):
+    """Mark a job running if no other runner holds it
+
+    Without ``stale_after`` only a pending job is claimed. With it, a
+    pending or running job (or a failed one, with ``include_failed``) is
+    claimed once it has been idle that long. Returns False when the claim
+    fails.
+    """
+    if stale_after is None:
+        claimable = Q(status='pending')
+    else:
+        claimable = _resumable(stale_after, include_failed)
+    now = timezone.now()
+    return bool(ScoreUploadJob.objects.filter(claimable, id=job_id).update(
+        status='running',
+        started_at=Coalesce('started_at', Value(now)),
+        error_message='',
+        updated_at=now,
+    ))
+
+
+def run_job(job_id, stale_after=None, include_failed=False):
+    """Process a job from its last checkpoint to the end
+
+    Returns None without touching the job when it cannot be claimed (see
+    ``claim_job``).
+    """
+    if not claim_job(job_id, stale_after, include_failed):
+        logger.info("Score upload %s is not claimable, skipping", job_id)
+        return None
+    job = ScoreUploadJob.objects.get(id=job_id)
+
+    def checkpoint(chunk_summary):
+        job.checkpoint += chunk_summary['rows']
+        job.rows_failed += len(chunk_summary['errors'])
+        job.rows_done += chunk_summary['rows'] - len(chunk_summary['errors'])
+        merge_summary(job.summary, {k: v for k, v in chunk_summary.items() if k != 'errors'})
+        room = MAX_STORED_ERRORS - len(job.errors)
+        if room > 0:
+            job.errors.extend(chunk_summary['errors'][:room])
+        job.save(update_fields=['checkpoint', 'rows_done', 'rows_failed', 'summary', 'errors', 'updated_at'])
+
+    try:
+        with job.file.open('rb') as handle:
+            score_rows = iter_score_rows(iter_rows(handle, job.file_format), job.components or None)
+            # Marks before the checkpoint were committed by an earlier run
+            load_score_rows(
+                islice(score_rows, job.checkpoint, None),
+                job.course_id,
+                job.semester_id,
+                on_chunk=checkpoint,
+            )
+    except Exception as exc:
+        logger.exception("Score upload %s failed", job.id)
+        # Counters of the chunk that rolled back must not be kept
+        job.refresh_from_db()
+        job.status = 'failed'
+        job.error_message = str(exc)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'finished_at', 'updated_at'])
+        return job
+
+    job.status = 'completed'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return job
+
+
+def resumable_jobs(stale_after=STALE_AFTER, include_failed=False):
+    """Jobs left pending or running by a dead worker"""
+    return ScoreUploadJob.objects.filter(
+        _resumable(stale_after, include_failed)
+    ).order_by('created_at')
+
+
+def _resumable(stale_after, include_failed):
+    statuses = ['pending', 'running'] + (['failed'] if include_failed else [])
+    return Q(status__in=statuses, updated_at__lt=timezone.now() - stale_after)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    """Thread pool shared by in-process background jobs"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'BACKGROUND_JOB_THREADS', 2),
+                    thread_name_prefix='background-job',
+                )
+    return _executor
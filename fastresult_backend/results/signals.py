@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from results.models import GPARecord, Result, ResultLock, ResultRelease
+from results.services import cgpa_ledger, lock_state, student_blobs
+
+
+@receiver(post_save, sender=GPARecord)
+def apply_gpa_record_change(sender, instance, created, raw=False, **kwargs):
+    """Move the student's CGPA totals by this record's change"""
+    if raw:
+        return
+    old_quality_points = instance.loaded_value('quality_points')
+    old_credits = instance.loaded_value('total_credits')
+    with transaction.atomic():
+        if not created and (old_quality_points is None or old_credits is None):
+            # Totals were deferred when the record was loaded - rebuild instead
+            cgpa_ledger.rebuild_students([instance.student_id])
+        else:
+            cgpa_ledger.apply_delta(
+                instance.student_id,
+                instance.quality_points - (old_quality_points or 0),
+                instance.total_credits - (old_credits or 0),
+            )
+    student_id = instance.student_id
+    transaction.on_commit(lambda: student_blobs.invalidate_students([student_id]))
+
+
+@receiver(post_delete, sender=GPARecord)
+def remove_gpa_record(sender, instance, **kwargs):
+    """Take a deleted record's totals out of the student's CGPA, if it still has one"""
+    cgpa_ledger.subtract(instance.student_id, instance.quality_points, instance.total_credits)
+    student_id = instance.student_id
+    transaction.on_commit(lambda: student_blobs.invalidate_students([student_id]))
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def drop_released_result_blobs(sender, instance, raw=False, **kwargs):
+    """A direct edit of a released result must reach the student's blobs"""
+    if raw:
+        return
+    if {instance.status, instance.loaded_value('status')} & set(student_blobs.RELEASED_STATUSES):
+        student_id = instance.student_id
+        transaction.on_commit(lambda: student_blobs.invalidate_students([student_id]))
+
+
+@receiver(post_save, sender=ResultLock)
+@receiver(post_delete, sender=ResultLock)
+def refresh_lock_state(sender, instance, **kwargs):
+    """Publish a new lock-state stamp for the semester once the change commits"""
+    semester_ids = {instance.semester_id, instance.loaded_value('semester')} - {None}
+    for semester_id in semester_ids:
+        transaction.on_commit(lambda semester_id=semester_id: lock_state.invalidate(semester_id))
+
+
+@receiver(post_save, sender=ResultRelease)
+def precompute_released_blobs(sender, instance, created, raw=False, **kwargs):
+    """Render the affected students' result blobs once the release commits"""
+    if raw:
+        return
+    release_id = instance.id
+    transaction.on_commit(lambda: student_blobs.schedule_release(release_id))
+
+
+@receiver(post_delete, sender=ResultRelease)
+def drop_unreleased_blobs(sender, instance, **kwargs):
+    """Withdrawn results must disappear from the students' blobs"""
+    semester_id, course_id = instance.semester_id, instance.course_id
+    transaction.on_commit(lambda: student_blobs.invalidate_students(
+        student_blobs.release_student_ids(semester_id, course_id)
+    ))
@@ -0,0 +1,17 @@
+from celery import shared_task
+
+
+@shared_task(acks_late=True)
+def process_score_upload(job_id):
+    """Run a score upload job on a Celery worker"""
+    from results.services.upload_jobs import run_job
+
+    run_job(job_id)
+
+
+@shared_task(acks_late=True)
+def precompute_release_blobs(release_id):
+    """Render released students' result blobs on a Celery worker"""
+    from results.services.student_blobs import precompute_release
+
+    precompute_release(release_id)
@@ -9,6 +9,7 @@ from results.views import (
     TranscriptViewSet,
     ResultLockViewSet,
     ResultReleaseViewSet,
+    ScoreUploadJobViewSet,
 )
 
 router = DefaultRouter()
@@ -20,6 +21,7 @@ router.register(r'cgpa', CGPARecordViewSet, basename='cgpa-record')
 router.register(r'transcripts', TranscriptViewSet, basename='transcript')
 router.register(r'locks', ResultLockViewSet, basename='result-lock')
 router.register(r'releases', ResultReleaseViewSet, basename='result-release')
+router.register(r'upload-jobs', ScoreUploadJobViewSet, basename='score-upload-job')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -0,0 +1,128 @@
+"""Result validation engine
+
+A ValidationContext captures everything needed to check marks for one
+``(course, semester)``: the lock state, enrolled students, existing result
+statuses and the components already recorded. It is built once with a few
+queries and is read-only, so whole batches of incoming marks are checked in
+memory and each bad row comes back as a structured RowError.
+"""
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+EDITABLE_STATUSES = frozenset({'draft'})
+
+# Column limits of ResultComponent: marks are decimal(5,2), weight decimal(3,2)
+MAX_MARKS = Decimal('999.99')
+MAX_WEIGHT = Decimal('9.99')
+DECIMAL_PLACES = 2
+DECIMAL_STEP = Decimal(1).scaleb(-DECIMAL_PLACES)
+MAX_COMPONENT_NAME_LENGTH = 100
+
+
+class ValidationContext(NamedTuple):
+    """Read-only snapshot of a course offering's result state"""
+    course_id: int
+    semester_id: int
+    locked: bool
+    enrolled: Mapping  # matric number -> student id
+    results: Mapping  # student id -> (result id, status)
+    components: Mapping  # (result id, component name) -> (component id, marks_total, weight)
+
+
+class RowError(NamedTuple):
+    """Why one incoming row was rejected"""
+    row: int
+    matric_number: str
+    component: str
+    field: str
+    code: str
+    message: str
+
+    def as_dict(self):
+        return self._asdict()
+
+
+def build_context(course_id, semester_id):
+    """Load the validation context for a course offering in three queries"""
+    from results.models import Result, ResultComponent
+    from results.services import lock_state
+    from students.models import StudentEnrollment
+
+    locked = lock_state.is_locked(course_id, semester_id)
+    enrolled = dict(
+        StudentEnrollment.objects.filter(course_id=course_id, semester_id=semester_id)
+        .values_list('student__matric_number', 'student_id')
+    )
+    results = {
+        student_id: (result_id, status)
+        for result_id, student_id, status in Result.objects.filter(
+            course_id=course_id, semester_id=semester_id
+        ).values_list('id', 'student_id', 'status')
+    }
+    components = {
+        (result_id, name): (component_id, marks_total, weight)
+        for component_id, result_id, name, marks_total, weight in ResultComponent.objects.filter(
+            result__course_id=course_id, result__semester_id=semester_id
+        ).values_list('id', 'result_id', 'component_name', 'marks_total', 'weight')
+    }
+    return ValidationContext(
+        course_id=course_id,
+        semester_id=semester_id,
+        locked=locked,
+        enrolled=MappingProxyType(enrolled),
+        results=MappingProxyType(results),
+        components=MappingProxyType(components),
+    )
+
+
+def validate_row(row, context):
+    """Check one incoming mark; returns a RowError or None"""
+    def error(field, code, message):
+        return RowError(row.row_number, row.matric_number, row.component_name, field, code, message)
+
+    if context.locked:
+        return error('', 'locked', "Results for this course are locked")
+    if not row.matric_number:
+        return error('matric_number', 'required', "Missing matric number")
+    student_id = context.enrolled.get(row.matric_number)
+    if student_id is None:
+        return error('matric_number', 'not_enrolled', "Student is not enrolled in this course")
+    if not row.component_name:
+        return error('component_name', 'required', "Missing component name")
+    if len(row.component_name) > MAX_COMPONENT_NAME_LENGTH:
+        return error(
+            'component_name', 'too_long', f"Component name is longer than {MAX_COMPONENT_NAME_LENGTH} characters"
+        )
+
+    for field in ('marks_obtained', 'marks_total', 'weight'):
+        value = getattr(row, field)
+        label = field.replace('_', ' ').capitalize()
+        if value is None:
+            return error(field, 'invalid', f"{label} must be a number")
+        if value != value.quantize(DECIMAL_STEP):
+            return error(field, 'invalid', f"{label} can have at most {DECIMAL_PLACES} decimal places")
+    if not 0 < row.marks_total <= MAX_MARKS:
+        return error('marks_total', 'out_of_range', f"Marks total must be greater than zero and at most {MAX_MARKS}")
+    if not 0 <= row.marks_obtained <= row.marks_total:
+        return error('marks_obtained', 'out_of_range', "Marks obtained must be between 0 and the component total")
+    if not 0 < row.weight <= MAX_WEIGHT:
+        return error('weight', 'out_of_range', f"Weight must be greater than 0 and at most {MAX_WEIGHT}")
+
+    existing = context.results.get(student_id)
+    if existing and existing[1] not in EDITABLE_STATUSES:
+        return error('', 'not_editable', f"Result is {existing[1]} and can no longer be edited")
+    return None
+
+
+def validate_marks(rows, context):
+    """Split a batch into ``(valid_rows, errors)`` against the context"""
+    valid = []
+    errors = []
+    for row in rows:
+        row_error = validate_row(row, context)
+        if row_error:
+            errors.append(row_error)
+        else:
+            valid.append(row)
+    return valid, errors
@@ -3,7 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from results.models import Result, ResultComponent, Grade, GPARecord, CGPARecord, Transcript, ResultLock, ResultRelease
+from results.models import Result, ResultComponent, Grade, GPARecord, CGPARecord, Transcript, ResultLock, ResultRelease, ScoreUploadJob
+from results.services import lock_state, student_blobs
 from results.serializers import (
     ResultSerializer,
     ResultDetailSerializer,
@@ -14,9 +15,39 @@ from results.serializers import (
     TranscriptSerializer,
     ResultLockSerializer,
     ResultReleaseSerializer,
+    ScoreUploadJobSerializer,
 )
 
 
+def student_blob_response(request, kind):
+    """Serve a precomputed student blob, honouring If-None-Match and gzip"""
+    import gzip
+    from django.http import HttpResponse
+    from django.utils.cache import patch_vary_headers
+    from django.utils.http import parse_etags
+    
+    blob = student_blobs.get_blob(request.user, kind)
+    if blob is None:
+        return Response(
+            {'error': 'Student profile not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    status_code, etag, body = blob
+    # Weak comparison, as for If-None-Match in RFC 9110
+    client_etags = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+    if '*' in client_etags or etag in client_etags:
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(body, status=status_code, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(gzip.decompress(body), status=status_code, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
 class ResultViewSet(viewsets.ModelViewSet):
     """ViewSet for Result model"""
     queryset = Result.objects.all()
@@ -33,46 +64,95 @@ class ResultViewSet(viewsets.ModelViewSet):
             return ResultDetailSerializer
         return ResultSerializer
     
-    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
-    def my_results(self, request):
-        """Get current student's results"""
-        try:
-            profile = request.user.student_profile
-            results = Result.objects.filter(student=profile)
-            
-            page = self.paginate_queryset(results)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-            
-            serializer = self.get_serializer(results, many=True)
-            return Response(serializer.data)
-        except:
-            return Response(
-                {'error': 'Student profile not found'},
-                status=status.HTTP_404_NOT_FOUND
+    def handle_exception(self, exc):
+        from results.services.concurrency import ResultConflictError
+        
+        if isinstance(exc, ResultConflictError):
+            return Response(exc.as_dict(), status=status.HTTP_409_CONFLICT)
+        return super().handle_exception(exc)
+    
+    def perform_create(self, serializer):
+        lock_state.ensure_unlocked(
+            serializer.validated_data['course'].id, serializer.validated_data['semester'].id
+        )
+        serializer.save()
+    
+    def perform_update(self, serializer):
+        """Save over the version the client read (``If-Match`` or ``version``)"""
+        from rest_framework.exceptions import ValidationError
+        from results.services.concurrency import parse_expected_version
+        
+        instance = serializer.instance
+        lock_state.ensure_unlocked(instance.course_id, instance.semester_id)
+        course = serializer.validated_data.get('course')
+        semester = serializer.validated_data.get('semester')
+        if course or semester:
+            lock_state.ensure_unlocked(
+                course.id if course else instance.course_id,
+                semester.id if semester else instance.semester_id,
             )
+        try:
+            expected_version = parse_expected_version(self.request)
+        except ValueError as e:
+            raise ValidationError({'version': str(e)})
+        if expected_version is not None:
+            serializer.instance.version = expected_version
+        serializer.save()
     
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
-    def verify(self, request, pk=None):
-        """Verify a result"""
+    def perform_destroy(self, instance):
+        lock_state.ensure_unlocked(instance.course_id, instance.semester_id)
+        instance.delete()
+    
+    def _apply_workflow_action(self, request, workflow_action):
+        from approvals.workflow import ResultWorkflowService
+        from results.services.concurrency import parse_expected_version
+        
         result = self.get_object()
-        result.status = 'verified'
-        result.save()
+        try:
+            ResultWorkflowService.apply_to_result(
+                request.user, result, workflow_action,
+                expected_version=parse_expected_version(request),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         serializer = self.get_serializer(result)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def my_results(self, request):
+        """Get current student's released results"""
+        return student_blob_response(request, 'results')
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def verify(self, request, pk=None):
+        """Verify a result (workflow 'review' stage)"""
+        return self._apply_workflow_action(request, 'review')
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def approve(self, request, pk=None):
         """Approve a result"""
-        result = self.get_object()
-        result.status = 'approved'
-        result.save()
-        serializer = self.get_serializer(result)
-        return Response(serializer.data)
+        return self._apply_workflow_action(request, 'approve')
 
 
-class ResultComponentViewSet(viewsets.ModelViewSet):
+class ResultLockGuardMixin:
+    """Refuse writes to rows that belong to a locked result"""
+    
+    def perform_create(self, serializer):
+        lock_state.ensure_result_unlocked(serializer.validated_data['result'])
+        serializer.save()
+    
+    def perform_update(self, serializer):
+        lock_state.ensure_result_unlocked(serializer.instance.result)
+        if 'result' in serializer.validated_data:
+            lock_state.ensure_result_unlocked(serializer.validated_data['result'])
+        serializer.save()
+    
+    def perform_destroy(self, instance):
+        lock_state.ensure_result_unlocked(instance.result)
+        instance.delete()
+
+
+class ResultComponentViewSet(ResultLockGuardMixin, viewsets.ModelViewSet):
     """ViewSet for ResultComponent model"""
     queryset = ResultComponent.objects.all()
     serializer_class = ResultComponentSerializer
@@ -84,7 +164,7 @@ class ResultComponentViewSet(viewsets.ModelViewSet):
     ordering = ['component_name']
 
 
-class GradeViewSet(viewsets.ModelViewSet):
+class GradeViewSet(ResultLockGuardMixin, viewsets.ModelViewSet):
     """ViewSet for Grade model"""
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
@@ -110,22 +190,7 @@ class GPARecordViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_gpa(self, request):
         """Get current student's GPA records"""
-        try:
-            profile = request.user.student_profile
-            gpa_records = GPARecord.objects.filter(student=profile)
-            
-            page = self.paginate_queryset(gpa_records)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-            
-            serializer = self.get_serializer(gpa_records, many=True)
-            return Response(serializer.data)
-        except:
-            return Response(
-                {'error': 'Student profile not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        return student_blob_response(request, 'gpa')
 
 
 class CGPARecordViewSet(viewsets.ModelViewSet):
@@ -142,21 +207,7 @@ class CGPARecordViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_cgpa(self, request):
         """Get current student's CGPA"""
-        try:
-            profile = request.user.student_profile
-            cgpa_record = CGPARecord.objects.get(student=profile)
-            serializer = self.get_serializer(cgpa_record)
-            return Response(serializer.data)
-        except CGPARecord.DoesNotExist:
-            return Response(
-                {'error': 'CGPA record not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        except:
-            return Response(
-                {'error': 'Student profile not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        return student_blob_response(request, 'cgpa')
 
 
 class TranscriptViewSet(viewsets.ModelViewSet):
@@ -213,3 +264,54 @@ class ResultReleaseViewSet(viewsets.ModelViewSet):
     filterset_fields = ['semester', 'course']
     ordering_fields = ['released_at']
     ordering = ['-released_at']
+
+
+class ScoreUploadJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Start score sheet uploads and poll their progress"""
+    serializer_class = ScoreUploadJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['course', 'semester', 'status']
+    ordering_fields = ['created_at']
+    ordering = ['-created_at']
+    
+    def get_queryset(self):
+        return ScoreUploadJob.objects.filter(uploaded_by=self.request.user).select_related('course')
+    
+    def create(self, request):
+        """Accept a sheet and return the queued job at once"""
+        from django.core.exceptions import PermissionDenied
+        from lecturers.services import LecturerResultEntryService
+        from results.bulk_upload import ScoreSheetError
+        
+        upload = request.FILES.get('file')
+        if not upload or not request.data.get('course') or not request.data.get('semester'):
+            return Response(
+                {'error': 'file, course and semester are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        components = request.data.get('components') or None
+        if isinstance(components, str):
+            import json
+            try:
+                components = json.loads(components)
+            except ValueError:
+                return Response({'error': 'components must be JSON'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            job = LecturerResultEntryService.start_score_upload(
+                request.user,
+                int(request.data['course']),
+                int(request.data['semester']),
+                upload,
+                components=components,
+            )
+        except PermissionDenied as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except (ScoreSheetError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = self.get_serializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
@@ -7,6 +7,7 @@ from results.views import (
     TranscriptViewSet,
     ResultLockViewSet,
     ResultReleaseViewSet,
+    ScoreUploadJobViewSet,
 )
 
 __all__ = [
@@ -18,4 +19,5 @@ __all__ = [
     'TranscriptViewSet',
     'ResultLockViewSet',
     'ResultReleaseViewSet',
+    'ScoreUploadJobViewSet',
 ]
@@ -180,23 +180,60 @@ class StudentTranscriptService(StudentAuthorizationMixin):
 
     @staticmethod
     def generate_transcript_pdf(user):
-        """Generate and return transcript PDF"""
+        """Generate and return transcript PDF.
+
+        An unchanged transcript is found by its cached content hash with one
+        query and served from its stored file.
+        """
+        from tempfile import SpooledTemporaryFile
+        from django.core.files import File
+        from files.transcript_files import safe_name
+        from results.services.transcript_builder import (
+            TEMPLATE_VERSION, collect_transcript_data, current_content_hash, render_transcript
+        )
+
         student = StudentAuthorizationMixin.check_student_access(user, user.id)
         
-        transcript_data = StudentTranscriptService.get_full_transcript(user)
-        
-        # Create transcript file record
-        transcript = Transcript.objects.create(student=student)
+        # Unchanged results and template - serve the file already rendered
+        content_hash = current_content_hash(student)
+        transcript = Transcript.objects.filter(
+            student=student, content_hash=content_hash
+        ).exclude(file='').order_by('-generated_date').first()
+        if transcript and transcript.file.storage.exists(transcript.file.name):
+            AuditLogService.log_action(
+                user=user.username,
+                action='export',
+                model_name='Transcript',
+                object_id=str(transcript.id),
+                new_values={'content_hash': content_hash, 'cached': True},
+                status='success'
+            )
+            return transcript
+        
+        transcript_data = collect_transcript_data(student)
+        
+        # Spill to disk past 1MB so long transcripts stay out of memory
+        with SpooledTemporaryFile(max_size=1024 * 1024) as buffer:
+            pages = render_transcript(transcript_data, buffer)
+            buffer.seek(0)
+            transcript = Transcript(
+                student=student,
+                content_hash=content_hash,
+                template_version=TEMPLATE_VERSION,
+            )
+            transcript.file.save(f"{safe_name(student.matric_number)}.pdf", File(buffer), save=False)
+            transcript.save()
         
         AuditLogService.log_action(
             user=user.username,
             action='export',
             model_name='Transcript',
             object_id=str(transcript.id),
+            new_values={'pages': pages, 'content_hash': content_hash},
             status='success'
         )
         
-        return transcript_data
+        return transcript
 
 
 class StudentGPAService(StudentAuthorizationMixin):
@@ -250,7 +250,7 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_filter = ('action', 'status', 'model_name', 'timestamp', 'university')
     search_fields = ('user', 'model_name', 'object_id', 'ip_address', 'error_message')
     date_hierarchy = 'timestamp'
-    actions = ['export_logs_csv', 'export_logs_json']
+    actions = ['export_logs_csv', 'export_logs_json', 'export_logs_xlsx']
     
     readonly_fields = ('user', 'action', 'model_name', 'object_id', 'old_values',
                        'new_values', 'status', 'ip_address', 'user_agent',
@@ -294,34 +294,19 @@ class AuditLogAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Status'
 
     def export_logs_csv(self, request, queryset):
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="audit_logs.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['User', 'Action', 'Model', 'Object ID', 'Status', 'IP Address', 'Timestamp'])
-        
-        for log in queryset:
-            writer.writerow([
-                log.user, log.action, log.model_name, log.object_id, 
-                log.status, log.ip_address, log.timestamp
-            ])
-        return response
+        from .services import AuditLogService
+        return AuditLogService.export_logs(queryset, 'csv')
     export_logs_csv.short_description = 'Export selected logs as CSV'
 
     def export_logs_json(self, request, queryset):
-        import json
-        from django.http import HttpResponse
-        from django.core.serializers import serialize
-        
-        response = HttpResponse(
-            serialize('json', queryset),
-            content_type='application/json'
-        )
-        response['Content-Disposition'] = 'attachment; filename="audit_logs.json"'
-        return response
-    export_logs_json.short_description = 'Export selected logs as JSON'
+        from .services import AuditLogService
+        return AuditLogService.export_logs(queryset, 'jsonl')
+    export_logs_json.short_description = 'Export selected logs as JSON Lines'
+
+    def export_logs_xlsx(self, request, queryset):
+        from .services import AuditLogService
+        return AuditLogService.export_logs(queryset, 'xlsx')
+    export_logs_xlsx.short_description = 'Export selected logs as Excel'
 
     def has_add_permission(self, request):
         return False
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from systemadmin.services import audit_archive
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming audit log partitions and archive old months to gzipped JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months',
+            type=int,
+            default=None,
+            help='Months kept in the database, counting the current one (default: AUDIT_LOG_HOT_MONTHS)',
+        )
+        parser.add_argument('--before', help='Archive every month before this YYYY-MM instead')
+        parser.add_argument(
+            '--partitions-only',
+            action='store_true',
+            help='Only create upcoming partitions',
+        )
+
+    def handle(self, *args, **options):
+        created = audit_archive.ensure_partitions()
+        for month in created:
+            self.stdout.write(f"Created partition {audit_archive.partition_name(month)}")
+        if options['partitions_only']:
+            return
+
+        current = audit_archive.month_start(timezone.now())
+        if options['before']:
+            try:
+                before = audit_archive.parse_month(options['before'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            if before > current:
+                raise CommandError('Only months that have ended can be archived')
+        else:
+            keep = options['keep_months'] or getattr(settings, 'AUDIT_LOG_HOT_MONTHS', 12)
+            before = audit_archive.add_months(current, 1 - keep)
+
+        summaries = audit_archive.archive_before(before)
+        for summary in summaries:
+            if summary['rows']:
+                self.stdout.write(f"{summary['month']}: {summary['rows']:,} entries -> {summary['file']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {sum(summary['rows'] for summary in summaries):,} audit log entries "
+            f"from {len(summaries)} month(s) before {before:%Y-%m}"
+        ))
@@ -0,0 +1,13 @@
+"""System admin middleware"""
+from systemadmin.services import audit_buffer
+
+
+class AuditBufferMiddleware:
+    """Collect the audit entries a request logs and write them with one insert"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_buffer.collect():
+            return self.get_response(request)
@@ -0,0 +1,105 @@
+"""Partition systemadmin_audit_log by month on PostgreSQL
+
+The table is rebuilt as ``PARTITION BY RANGE ("timestamp")`` with one
+partition per month from the oldest entry to a few months ahead, plus a
+default partition. The primary key becomes ``(id, timestamp)`` because a
+partitioned table's keys must include the partition column; ids still
+come from a single sequence. Indexes and foreign keys are recreated under
+their existing names. Other databases are left unchanged.
+"""
+from datetime import date, datetime, timezone
+
+from django.db import migrations
+
+TABLE = 'systemadmin_audit_log'
+STAGING = 'systemadmin_audit_log_rebuild'
+SEQUENCE = 'systemadmin_audit_log_id_seq'
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, count):
+    years, index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat()
+
+
+def _definitions(cursor, table):
+    """Index and foreign key DDL of ``table``, to replay once it is rebuilt"""
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+        "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+        [table, table]
+    )
+    statements = [row[0].replace(' ON ONLY ', ' ON ') for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table]
+    )
+    statements += [f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}' for name, definition in cursor.fetchall()]
+    return statements
+
+
+def partition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        definitions = _definitions(cursor, TABLE)
+        cursor.execute(f'SELECT min("timestamp"), max(id) FROM {TABLE}')
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f'CREATE TABLE {STAGING} (LIKE {TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")')
+        cursor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {STAGING} DEFAULT')
+        today = datetime.now(timezone.utc)
+        month = date((oldest or today).year, (oldest or today).month, 1)
+        last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+        while month <= last:
+            following = _add_months(month, 1)
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {STAGING} "
+                f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(following)}')"
+            )
+            month = following
+
+        cursor.execute(f'INSERT INTO {STAGING} SELECT * FROM {TABLE}')
+        cursor.execute(f'DROP TABLE {TABLE}')
+        cursor.execute(f'ALTER TABLE {STAGING} RENAME TO {TABLE}')
+
+        cursor.execute(f'CREATE SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id')
+        cursor.execute("SELECT setval(%s, %s, false)", [SEQUENCE, (max_id or 0) + 1])
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, "timestamp")')
+        for statement in definitions:
+            cursor.execute(statement)
+
+
+def unpartition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        definitions = _definitions(cursor, TABLE)
+        cursor.execute(f'CREATE TABLE {STAGING} (LIKE {TABLE} INCLUDING DEFAULTS)')
+        cursor.execute(f'INSERT INTO {STAGING} SELECT * FROM {TABLE}')
+        cursor.execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY NONE')
+        cursor.execute(f'DROP TABLE {TABLE} CASCADE')
+        cursor.execute(f'ALTER TABLE {STAGING} RENAME TO {TABLE}')
+        cursor.execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id')
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)')
+        for statement in definitions:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    atomic = True
+
+    dependencies = [
+        ('systemadmin', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -7,6 +7,7 @@ from systemadmin.models import (
     AcademicTemplate, WorkflowTemplate, ResultEngineTemplate,
     PlatformSetting, AuditLog, FeatureFlag, SystemAuditConfig
 )
+from systemadmin.services import audit_buffer
 
 
 class UniversityRegistryService:
@@ -198,6 +199,7 @@ class WorkflowTemplateService:
     @staticmethod
     def create_workflow(data):
         """Create new workflow template"""
+        WorkflowTemplateService.validate_stages(data.get('workflow_type'), data.get('stages'))
         workflow = WorkflowTemplate.objects.create(**data)
         return workflow
 
@@ -223,6 +225,7 @@ class WorkflowTemplateService:
     def update_stages(workflow_id, stages):
         """Update workflow stages"""
         workflow = WorkflowTemplate.objects.get(id=workflow_id)
+        WorkflowTemplateService.validate_stages(workflow.workflow_type, stages)
         workflow.stages = stages
         workflow.save()
         return workflow
@@ -231,6 +234,7 @@ class WorkflowTemplateService:
     def create_version(original_id, new_stages):
         """Create new version of workflow"""
         original = WorkflowTemplate.objects.get(id=original_id)
+        WorkflowTemplateService.validate_stages(original.workflow_type, new_stages)
         new_version = WorkflowTemplate.objects.create(
             name=original.name,
             slug=f"{original.slug}-v{original.version + 1}",
@@ -243,6 +247,14 @@ class WorkflowTemplateService:
         )
         return new_version
 
+    @staticmethod
+    def validate_stages(workflow_type, stages):
+        """Reject result approval stages the workflow engine cannot compile"""
+        if workflow_type == 'result_approval':
+            from approvals.workflow import compile_stages
+
+            compile_stages(stages)
+
 
 class ResultEngineTemplateService:
     """Service for managing result engine templates"""
@@ -277,14 +289,25 @@ class ResultEngineTemplateService:
         return qs.order_by('-version').first()
 
     @staticmethod
-    def validate_formula(formula):
-        """Validate formula syntax"""
+    def validate_formula(formula, input_parameters=None):
+        """Validate formula syntax and the names and operations it uses"""
+        from results.services.formula_engine import FormulaError, compile_formula, parameter_names
+
+        parameters = parameter_names(input_parameters) if input_parameters is not None else None
         try:
-            compile(formula, '<string>', 'eval')
+            compile_formula(formula, parameters)
             return True, "Formula is valid"
-        except SyntaxError as e:
+        except FormulaError as e:
             return False, str(e)
 
+    @staticmethod
+    def evaluate_engine(engine_id, inputs):
+        """Evaluate an engine's formula over columns of input values"""
+        from results.services.formula_engine import evaluate_template
+
+        engine = ResultEngineTemplate.objects.get(id=engine_id)
+        return evaluate_template(engine, inputs)
+
     @staticmethod
     def create_version(original_id, new_formula):
         """Create new version of engine"""
@@ -356,12 +379,27 @@ class PlatformSettingService:
 class AuditLogService:
     """Service for managing audit logs"""
 
+    EXPORT_COLUMNS = (
+        ('id', 'ID'),
+        ('timestamp', 'Timestamp'),
+        ('user', 'User'),
+        ('action', 'Action'),
+        ('model_name', 'Model'),
+        ('object_id', 'Object ID'),
+        ('status', 'Status'),
+        ('ip_address', 'IP Address'),
+        ('university_id', 'University'),
+        ('old_values', 'Old Values'),
+        ('new_values', 'New Values'),
+        ('error_message', 'Error'),
+    )
+
     @staticmethod
     def log_action(user, action, model_name, object_id=None, old_values=None,
                    new_values=None, status='success', ip_address=None,
                    user_agent=None, error_message=None, university_id=None):
-        """Create audit log entry"""
-        audit_log = AuditLog.objects.create(
+        """Create audit log entry, buffered when a collect() scope is open"""
+        audit_log = AuditLog(
             user=user,
             action=action,
             model_name=model_name,
@@ -370,12 +408,39 @@ class AuditLogService:
             new_values=new_values or {},
             status=status,
             ip_address=ip_address,
-            user_agent=user_agent,
-            error_message=error_message,
+            user_agent=user_agent or '',
+            error_message=error_message or '',
             university_id=university_id
         )
+        if not audit_buffer.enqueue([audit_log]):
+            audit_log.save()
         return audit_log
 
+    @staticmethod
+    def buffered():
+        """Context manager writing the entries logged inside it with one insert on exit"""
+        return audit_buffer.collect()
+
+    @staticmethod
+    def log_bulk(user, action, model_name, entries, status='success', university_id=None):
+        """Create one audit entry per ``(object_id, old_values, new_values)`` with a single insert"""
+        entries = [
+            AuditLog(
+                user=user,
+                action=action,
+                model_name=model_name,
+                object_id=str(object_id),
+                old_values=old_values or {},
+                new_values=new_values or {},
+                status=status,
+                university_id=university_id
+            )
+            for object_id, old_values, new_values in entries
+        ]
+        if not audit_buffer.enqueue(entries):
+            audit_buffer.write(entries)
+        return entries
+
     @staticmethod
     def list_logs(user=None, action=None, model_name=None, days=30, university_id=None):
         """List audit logs with filtering"""
@@ -404,10 +469,26 @@ class AuditLogService:
 
     @staticmethod
     def cleanup_old_logs(days=365):
-        """Delete logs older than specified days"""
+        """Delete logs older than specified days, dropping whole monthly partitions where possible"""
+        from systemadmin.services import audit_archive
+
         cutoff_date = timezone.now() - timezone.timedelta(days=days)
-        deleted_count, _ = AuditLog.objects.filter(timestamp__lt=cutoff_date).delete()
-        return deleted_count
+        return audit_archive.delete_before(cutoff_date)
+
+    @staticmethod
+    def export_logs(queryset, file_format, filename='audit_logs'):
+        """Stream the logs as csv, jsonl or xlsx without loading them into memory"""
+        from reports.exporters import export_response
+
+        return export_response(queryset.order_by('-timestamp', '-id'), AuditLogService.EXPORT_COLUMNS,
+                               file_format, filename)
+
+    @staticmethod
+    def list_archived_logs(month, **filters):
+        """Stream archived logs of a ``YYYY-MM`` month, filtered like list_logs"""
+        from systemadmin.services import audit_archive
+
+        return audit_archive.read_archive(audit_archive.parse_month(month), **filters)
 
 
 class FeatureFlagService:
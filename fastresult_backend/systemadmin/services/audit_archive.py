@@ -0,0 +1,296 @@
+"""Audit log partitions and cold archive
+
+On PostgreSQL ``systemadmin_audit_log`` is range-partitioned by month on
+``timestamp`` (migration 0002). Each month lives in its own table,
+``systemadmin_audit_log_pYYYYMM``. A default partition catches rows for
+months that have no table yet. ensure_partitions() creates the coming
+months ahead of time and moves any rows stranded in the default partition
+into their own month.
+
+archive_month() streams one month, oldest id first, to a gzipped JSON Lines
+file under ``AUDIT_LOG_ARCHIVE_DIR``, then removes the month from the
+database. A partitioned month is detached and dropped, whatever its size.
+Other databases keep a single table and delete the month in id-ordered
+chunks. read_archive() reads an archived month back, with the same filters
+as AuditLogService.list_logs().
+"""
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from systemadmin.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+TABLE = AuditLog._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+DELETE_CHUNK_SIZE = 5000
+READ_CHUNK_SIZE = 2000
+FIELDS = (
+    'id', 'user', 'action', 'model_name', 'object_id', 'old_values', 'new_values', 'status',
+    'ip_address', 'user_agent', 'error_message', 'timestamp', 'university_id',
+)
+ARCHIVE_NAME = re.compile(r'^audit_log-(\d{4})-(\d{2})(?:\.\d+)?\.jsonl\.gz$')
+PARTITION_NAME = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+def parse_month(value):
+    """``date`` for the first day of a ``YYYY-MM`` month"""
+    try:
+        year, month = (int(part) for part in str(value).split('-'))
+        return date(year, month, 1)
+    except ValueError:
+        raise ValueError("Month must be given as YYYY-MM")
+
+
+def month_start(moment):
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month, count):
+    years, index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def month_bounds(month):
+    """UTC ``[start, end)`` of the month"""
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    end_month = add_months(month, 1)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def archive_dir():
+    directory = getattr(settings, 'AUDIT_LOG_ARCHIVE_DIR', None)
+    return Path(directory) if directory else Path(settings.BASE_DIR) / 'audit_archive'
+
+
+# ---- partitions ----
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def partitions():
+    """Months that have their own partition"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s",
+            [TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = PARTITION_NAME.search(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def ensure_partitions(months_ahead=None, now=None):
+    """Create partitions up to ``months_ahead`` months out; returns the months created"""
+    if not is_partitioned():
+        return []
+    if months_ahead is None:
+        months_ahead = getattr(settings, 'AUDIT_LOG_PARTITION_MONTHS_AHEAD', 3)
+    current = month_start(now or timezone.now())
+    wanted = {add_months(current, offset) for offset in range(months_ahead + 1)}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', \"timestamp\" AT TIME ZONE 'UTC')::date FROM {DEFAULT_PARTITION}"
+        )
+        wanted.update(row[0] for row in cursor.fetchall())
+
+    created = sorted(wanted - set(partitions()))
+    for month in created:
+        create_partition(month)
+    return created
+
+
+def create_partition(month):
+    """Add the month's partition, moving any of its rows out of the default partition"""
+    name = partition_name(month)
+    start, end = (moment.isoformat() for moment in month_bounds(month))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [start, end]
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+    logger.info("Created audit log partition %s", name)
+
+
+def drop_partition(month):
+    """Detach and drop the month's partition; returns the number of rows it held"""
+    name = partition_name(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {name}")
+        count = cursor.fetchone()[0]
+        cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+        cursor.execute(f"DROP TABLE {name}")
+    return count
+
+
+# ---- removing old rows ----
+
+def delete_range(start=None, end=None, max_id=None, chunk_size=DELETE_CHUNK_SIZE):
+    """Delete rows in ``[start, end)`` (and ``id <= max_id``) a chunk at a time"""
+    queryset = AuditLog.objects.all()
+    if start is not None:
+        queryset = queryset.filter(timestamp__gte=start)
+    if end is not None:
+        queryset = queryset.filter(timestamp__lt=end)
+    if max_id is not None:
+        queryset = queryset.filter(id__lte=max_id)
+
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        deleted += AuditLog.objects.filter(id__in=ids).delete()[0]
+
+
+def delete_before(cutoff):
+    """Remove every row older than ``cutoff``; whole months go by dropping their partition"""
+    deleted = 0
+    if is_partitioned():
+        for month in partitions():
+            if month_bounds(month)[1] <= cutoff:
+                deleted += drop_partition(month)
+    return deleted + delete_range(end=cutoff)
+
+
+# ---- archive ----
+
+def _archive_path(month):
+    directory = archive_dir()
+    path = directory / f'audit_log-{month:%Y-%m}.jsonl.gz'
+    suffix = 1
+    while path.exists():
+        suffix += 1
+        path = directory / f'audit_log-{month:%Y-%m}.{suffix}.jsonl.gz'
+    return path
+
+
+def _write(path, rows):
+    """Stream rows to ``path`` as gzipped JSON Lines; returns ``(count, max_id)``"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + '.part')
+    count, max_id = 0, None
+    with open(partial, 'wb') as raw:
+        with gzip.open(raw, 'wt', encoding='utf-8') as stream:
+            for row in rows:
+                stream.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')))
+                stream.write('\n')
+                count += 1
+                max_id = row['id']
+        raw.flush()
+        os.fsync(raw.fileno())
+    if count:
+        os.replace(partial, path)
+    else:
+        os.remove(partial)
+    return count, max_id
+
+
+def archive_month(month, now=None):
+    """Write a past month to the archive and remove it from the database"""
+    if month >= month_start(now or timezone.now()):
+        raise ValueError("Only months that have ended can be archived")
+    start, end = month_bounds(month)
+    rows = (
+        AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        .order_by('id').values(*FIELDS).iterator(chunk_size=READ_CHUNK_SIZE)
+    )
+    path = _archive_path(month)
+    count, max_id = _write(path, rows)
+
+    if is_partitioned() and month in partitions():
+        drop_partition(month)
+    if max_id is not None:
+        # Rows left in the default partition, or the whole month without partitions
+        delete_range(start, end, max_id=max_id)
+
+    logger.info("Archived %s audit log entries for %s", count, f'{month:%Y-%m}')
+    return {'month': f'{month:%Y-%m}', 'rows': count, 'file': str(path) if count else None}
+
+
+def archive_before(before, now=None):
+    """Archive every month that ended on or before the start of ``before``'s month"""
+    first = AuditLog.objects.filter(timestamp__lt=month_bounds(before)[0]).aggregate(first=Min('timestamp'))['first']
+    summaries = []
+    month = month_start(first) if first else before
+    while month < before:
+        summaries.append(archive_month(month, now=now))
+        month = add_months(month, 1)
+    return summaries
+
+
+def archive_files(month):
+    prefix = f'audit_log-{month:%Y-%m}'
+    directory = archive_dir()
+    if not directory.is_dir():
+        return []
+    return sorted(
+        path for path in directory.iterdir()
+        if path.name.startswith(prefix) and ARCHIVE_NAME.match(path.name)
+    )
+
+
+def archived_months():
+    """Months with at least one archive file, oldest first"""
+    directory = archive_dir()
+    if not directory.is_dir():
+        return []
+    months = set()
+    for path in directory.iterdir():
+        match = ARCHIVE_NAME.match(path.name)
+        if match:
+            months.add(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def read_archive(month, user=None, action=None, model_name=None, object_id=None, status=None,
+                 university_id=None):
+    """Entries of an archived month matching the filters, oldest first"""
+    filters = {
+        key: value for key, value in (
+            ('user', user), ('action', action), ('model_name', model_name),
+            ('object_id', object_id), ('status', status), ('university_id', university_id),
+        ) if value not in (None, '')
+    }
+    seen = set()
+    for path in archive_files(month):
+        with gzip.open(path, 'rt', encoding='utf-8') as stream:
+            for line in stream:
+                entry = json.loads(line)
+                # A month archived twice after an interrupted run may repeat ids
+                if entry['id'] in seen:
+                    continue
+                seen.add(entry['id'])
+                if all(str(entry.get(key)) == str(value) for key, value in filters.items()):
+                    yield entry
@@ -0,0 +1,198 @@
+"""Buffered audit log writes
+
+AuditLogService.log_action() and log_bulk() add their entries to the
+innermost open ``collect()`` scope instead of inserting them one by one.
+When the scope closes, everything it gathered is written with a single
+``bulk_create``. AuditBufferMiddleware opens a scope around every request,
+and services can open their own around a loop or an atomic block.
+
+Where the entries go when a scope closes depends on ``AUDIT_LOG_BUFFER``:
+
+- ``'request'`` (default): written at once, on the connection in use;
+- ``'background'``: handed to the AuditWriter thread, which writes when it
+  holds ``AUDIT_LOG_BUFFER_SIZE`` entries or every
+  ``AUDIT_LOG_FLUSH_INTERVAL`` seconds, and drains at interpreter exit;
+- ``'off'``: scopes are ignored and each entry is inserted immediately.
+
+While ``AUDIT_LOG_FLUSH_IN_TRANSACTION`` is on (the default) audit rows
+commit or roll back with the change they describe. A scope that closes
+inside an atomic block writes inside that transaction. Entries logged in a
+transaction opened after the scope are written straight away, so open a
+scope inside the atomic block to batch them. With the setting off those
+entries join the scope on commit and are dropped on rollback. Entries
+logged outside any scope are written immediately, except in background
+mode.
+"""
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 1000
+
+_local = threading.local()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def mode():
+    return getattr(settings, 'AUDIT_LOG_BUFFER', 'request')
+
+
+def _scopes():
+    if not hasattr(_local, 'scopes'):
+        _local.scopes = []
+    return _local.scopes
+
+
+def write(entries):
+    """Insert unsaved AuditLog instances with one bulk_create"""
+    from systemadmin.models import AuditLog
+
+    if entries:
+        AuditLog.objects.bulk_create(entries, batch_size=WRITE_BATCH_SIZE)
+
+
+def enqueue(entries):
+    """Buffer the entries; False when they should be written right away"""
+    scopes = _scopes()
+    if scopes and mode() != 'off':
+        scope = scopes[-1]
+        if connection.in_atomic_block and not scope.in_atomic_block:
+            # The transaction is newer than the scope and would commit before it closes
+            if getattr(settings, 'AUDIT_LOG_FLUSH_IN_TRANSACTION', True):
+                return False
+            transaction.on_commit(lambda: scope.add(entries))
+            return True
+        scope.add(entries)
+        return True
+    if mode() == 'background':
+        get_writer().put(entries)
+        return True
+    return False
+
+
+def flush(entries):
+    """Send the entries of a closed scope to the database or the writer"""
+    if not entries:
+        return
+    if connection.in_atomic_block:
+        if connection.needs_rollback:
+            # The transaction is rolling back; unbuffered writes would have been lost too
+            return
+        if getattr(settings, 'AUDIT_LOG_FLUSH_IN_TRANSACTION', True):
+            write(entries)
+        else:
+            transaction.on_commit(lambda: _hand_off(entries))
+        return
+    _hand_off(entries)
+
+
+def _hand_off(entries):
+    if mode() == 'background':
+        get_writer().put(entries)
+    else:
+        write(entries)
+
+
+class Scope(list):
+    """Entries gathered by one collect() block"""
+
+    def __init__(self):
+        super().__init__()
+        self.in_atomic_block = connection.in_atomic_block
+        self.closed = False
+
+    def add(self, entries):
+        if self.closed:
+            _hand_off(entries)
+        else:
+            self.extend(entries)
+
+
+@contextmanager
+def collect():
+    """Gather audit entries logged inside the block and write them together on exit.
+
+    Scopes nest; an inner scope flushes on its own exit, so open one inside
+    ``transaction.atomic()`` to keep the audit rows in that transaction.
+    """
+    scopes = _scopes()
+    scope = Scope()
+    scopes.append(scope)
+    try:
+        yield scope
+    finally:
+        scopes.pop()
+        scope.closed = True
+        flush(list(scope))
+
+
+class AuditWriter:
+    """Writes buffered entries from a daemon thread in batches"""
+
+    def __init__(self, batch_size, interval):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._ready = threading.Condition()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def put(self, entries):
+        with self._ready:
+            self._pending.extend(entries)
+            if len(self._pending) >= self.batch_size:
+                self._ready.notify()
+
+    def stop(self, timeout=None):
+        """Stop the thread after it has written everything still pending"""
+        with self._ready:
+            self._stop = True
+            self._ready.notify()
+        self._thread.join(timeout)
+
+    def _take(self):
+        with self._ready:
+            if not self._stop and len(self._pending) < self.batch_size:
+                self._ready.wait(self.interval)
+            pending, self._pending = self._pending, []
+            return pending, self._stop
+
+    def _run(self):
+        while True:
+            pending, stopping = self._take()
+            if pending:
+                close_old_connections()
+                try:
+                    write(pending)
+                except Exception:
+                    logger.exception("Could not write %s audit log entries", len(pending))
+                finally:
+                    close_old_connections()
+            if stopping and not self._pending:
+                return
+
+
+def get_writer():
+    """The process's AuditWriter, started on first use and drained at exit"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = AuditWriter(
+                    batch_size=getattr(settings, 'AUDIT_LOG_BUFFER_SIZE', 500),
+                    interval=getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 2),
+                )
+                writer.start()
+                atexit.register(writer.stop)
+                _writer = writer
+    return _writer
@@ -22,6 +22,8 @@ from academics.models import Faculty, Department, Program, Course, Subject, Cour
 from lecturers.models import Lecturer
 from students.models import StudentProfile
 from results.models import Result, ResultLock, ResultRelease
+from results.services import lock_state
+from results.services.grading_registry import invalidate_grading_scale
 from core.constants import ROLE_CHOICES
 import uuid
 
@@ -494,21 +496,25 @@ class UniversityAdminGradingConfigService(UniversityAdminAuthorizationMixin):
         UniversityAdminAuthorizationMixin.check_university_admin_access(user)
         university = UniversityAdminAuthorizationMixin.get_user_university(user)
         
-        # Clear existing scales for university
-        GradingScale.objects.filter(university=university).delete()
-        
-        # Create new scales
-        scales = []
-        for scale_item in grading_data:
-            scale = GradingScale.objects.create(
-                university=university,
-                name=scale_item['name'],
-                grade=scale_item['grade'],
-                min_score=scale_item['min_score'],
-                max_score=scale_item['max_score'],
-                grade_point=scale_item['grade_point']
-            )
-            scales.append(scale)
+        with transaction.atomic():
+            # Clear existing scales for university
+            GradingScale.objects.filter(university=university).delete()
+            
+            # Create new scales
+            scales = []
+            for scale_item in grading_data:
+                scale = GradingScale.objects.create(
+                    university=university,
+                    name=scale_item['name'],
+                    grade=scale_item['grade'],
+                    min_score=scale_item['min_score'],
+                    max_score=scale_item['max_score'],
+                    grade_point=scale_item['grade_point']
+                )
+                scales.append(scale)
+            
+            # Workers recompile the scale on their next grade lookup
+            transaction.on_commit(lambda: invalidate_grading_scale(university.id))
         
         AuditLogService.log_action(
             user=user.username,
@@ -575,19 +581,24 @@ class UniversityAdminResultControlService(UniversityAdminAuthorizationMixin):
             course__program__department__faculty__university=university
         )
         
-        release = ResultRelease.objects.create(
-            released_by=user,
-            released_date=timezone.now(),
-            release_notes=release_data.get('notes', '')
-        )
-        release.results.set(results)
+        # Releases are per course offering; each one precomputes its students' result blobs
+        offerings = set(results.values_list('semester_id', 'course_id'))
+        with transaction.atomic():
+            releases = [
+                ResultRelease.objects.create(semester_id=semester_id, course_id=course_id, released_by=user)
+                for semester_id, course_id in sorted(offerings)
+            ]
         
         AuditLogService.log_action(
             user=user.username,
             action='release',
             model_name='ResultRelease',
-            object_id=str(release.id),
-            new_values={'results_released': results.count()},
+            object_id=None,
+            new_values={
+                'results_released': results.count(),
+                'release_ids': [release.id for release in releases],
+                'notes': release_data.get('notes', '')
+            },
             status='success'
         )
         
@@ -606,19 +617,28 @@ class UniversityAdminResultControlService(UniversityAdminAuthorizationMixin):
             course__program__department__faculty__university=university
         )
         
-        lock = ResultLock.objects.create(
-            locked_by=user,
-            locked_date=timezone.now(),
-            lock_reason=lock_data.get('reason', '')
-        )
-        lock.results.set(results)
+        # Locks are per course offering; lock every offering the results belong to
+        offerings = set(results.values_list('semester_id', 'course_id'))
+        with transaction.atomic():
+            ResultLock.objects.bulk_create(
+                [ResultLock(semester_id=semester_id, course_id=course_id, locked_by=user)
+                 for semester_id, course_id in offerings],
+                ignore_conflicts=True
+            )
+            # bulk_create sends no signals, so publish the new lock state here
+            for semester_id in {semester_id for semester_id, _ in offerings}:
+                transaction.on_commit(lambda semester_id=semester_id: lock_state.invalidate(semester_id))
         
         AuditLogService.log_action(
             user=user.username,
             action='lock',
             model_name='ResultLock',
-            object_id=str(lock.id),
-            new_values={'results_locked': results.count()},
+            object_id=None,
+            new_values={
+                'results_locked': results.count(),
+                'courses': sorted(course_id for _, course_id in offerings),
+                'reason': lock_data.get('reason', '')
+            },
             status='success'
         )
         
@@ -635,12 +655,10 @@ class UniversityAdminResultControlService(UniversityAdminAuthorizationMixin):
             raise PermissionDenied("Lock not found")
         
         # Verify user has access to locked results
-        locked_results = lock.results.all()
-        if locked_results.exists():
-            first_result = locked_results.first()
-            if first_result.course.program.department.faculty.university_id != university.id:
-                raise PermissionDenied("Lock not in your university")
+        if lock.course.program.department.faculty.university_id != university.id:
+            raise PermissionDenied("Lock not in your university")
         
+        locked_results = Result.objects.filter(course_id=lock.course_id, semester_id=lock.semester_id)
         lock.delete()
         
         AuditLogService.log_action(
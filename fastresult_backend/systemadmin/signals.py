@@ -1,47 +1,14 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User
-from .models import AuditLog
 from .services import AuditLogService
-import json
 
 
-@receiver(pre_save, sender=User)
-def log_user_changes(sender, instance, **kwargs):
-    """Log user profile changes"""
-    if instance.pk:
-        try:
-            old_instance = User.objects.get(pk=instance.pk)
-            old_values = {
-                'username': old_instance.username,
-                'email': old_instance.email,
-                'is_active': old_instance.is_active,
-                'is_staff': old_instance.is_staff,
-            }
-            new_values = {
-                'username': instance.username,
-                'email': instance.email,
-                'is_active': instance.is_active,
-                'is_staff': instance.is_staff,
-            }
-
-            if old_values != new_values:
-                AuditLogService.log_action(
-                    user=getattr(instance, 'updated_by', 'system'),
-                    action='update',
-                    model_name='User',
-                    object_id=str(instance.pk),
-                    old_values=old_values,
-                    new_values=new_values,
-                    status='success'
-                )
-        except User.DoesNotExist:
-            pass
-
-
-@receiver(post_save, sender=User)
-def log_user_creation(sender, instance, created, **kwargs):
-    """Log user creation"""
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def log_user_save(sender, instance, created, raw=False, **kwargs):
+    """Log user creation and changes to the user's tracked fields"""
+    if raw:
+        return
     if created:
         AuditLogService.log_action(
             user=getattr(instance, 'created_by', 'system'),
@@ -55,9 +22,23 @@ def log_user_creation(sender, instance, created, **kwargs):
             },
             status='success'
         )
+        return
+
+    # Diffed against the values loaded with the instance, no query needed
+    changes = instance.tracked_changes()
+    if changes:
+        AuditLogService.log_action(
+            user=getattr(instance, 'updated_by', 'system'),
+            action='update',
+            model_name='User',
+            object_id=str(instance.pk),
+            old_values={field: old for field, (old, _) in changes.items()},
+            new_values={field: new for field, (_, new) in changes.items()},
+            status='success'
+        )
 
 
-@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
 def log_user_deletion(sender, instance, **kwargs):
     """Log user deletion"""
     AuditLogService.log_action(
@@ -70,18 +51,29 @@ def log_user_deletion(sender, instance, **kwargs):
     )
 
 
-def create_audit_log_for_model(sender, instance, created, **kwargs):
-    """Generic signal handler for model changes"""
+def create_audit_log_for_model(sender, instance, created, raw=False, **kwargs):
+    """Generic post_save handler for model changes.
+
+    Connect it for a model using TrackedFieldsMixin; updates are logged with
+    the old and new values of the tracked fields that changed, and saves that
+    change none of them are not logged.
+    """
+    if raw:
+        return
     if created:
         action = 'create'
-        new_values = {field.name: str(getattr(instance, field.name))
+        # attname keeps foreign keys as ids instead of fetching each related row
+        new_values = {field.name: str(getattr(instance, field.attname))
                       for field in sender._meta.fields if field.name not in
                       ['id', 'created_at', 'updated_at', 'created_by', 'updated_by']}
         old_values = {}
     else:
         action = 'update'
-        old_values = {}
-        new_values = {}
+        changes = instance.tracked_changes() if hasattr(instance, 'tracked_changes') else {}
+        if not changes:
+            return
+        old_values = {field: str(old) for field, (old, _) in changes.items()}
+        new_values = {field: str(new) for field, (_, new) in changes.items()}
 
     AuditLogService.log_action(
         user=getattr(instance, 'updated_by', 'system'),
@@ -43,6 +43,8 @@ urlpatterns = [
     # Audit Logs
     path('audit-logs/', views.AuditLogListView.as_view(), name='auditlog-list'),
     path('audit-logs/<int:pk>/', views.AuditLogDetailView.as_view(), name='auditlog-detail'),
+    path('audit-logs/archive/', views.AuditLogArchiveView.as_view(), name='auditlog-archive'),
+    path('audit-logs/archive/<str:month>/', views.AuditLogArchiveView.as_view(), name='auditlog-archive-month'),
 
     # Feature Flags
     path('feature-flags/', views.FeatureFlagListView.as_view(), name='featureflag-list'),
@@ -114,15 +114,79 @@ class AuditLogListView(generics.ListAPIView):
 
     def get_permissions(self):
         # Override to ensure audit logs are read-only
-        from rest_framework.permissions import IsAuthenticated
+        from rest_framework.permissions import IsAdminUser, IsAuthenticated
+        if self.request.query_params.get('export'):
+            # Exports cover every university, like the archive
+            return [IsAdminUser()]
         return [IsAuthenticated()]
 
+    def get_queryset(self):
+        from django.utils.dateparse import parse_date, parse_datetime
+        from rest_framework.exceptions import ValidationError
+
+        queryset = super().get_queryset()
+        for param, lookup in (('since', 'timestamp__gte'), ('until', 'timestamp__lt')):
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                moment = parse_datetime(value) or parse_date(value)
+            except ValueError:
+                moment = None
+            if moment is None:
+                raise ValidationError({param: 'Use an ISO 8601 date or date-time.'})
+            queryset = queryset.filter(**{lookup: moment})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """List logs, or stream every filtered log with ``?export=csv|jsonl|xlsx``"""
+        file_format = request.query_params.get('export')
+        if file_format:
+            from systemadmin.services import AuditLogService
+            try:
+                return AuditLogService.export_logs(self.filter_queryset(self.get_queryset()), file_format)
+            except ValueError as exc:
+                return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
 
 class AuditLogDetailView(generics.RetrieveAPIView):
     queryset = AuditLog.objects.all()
     serializer_class = AuditLogSerializer
 
 
+class AuditLogArchiveView(generics.GenericAPIView):
+    """Archived audit log months, read from the cold archive on demand"""
+    ARCHIVE_FILTERS = ('user', 'action', 'model_name', 'object_id', 'status', 'university_id')
+    MAX_LIMIT = 1000
+
+    def get_permissions(self):
+        from rest_framework.permissions import IsAdminUser
+        return [IsAdminUser()]
+
+    def get(self, request, month=None):
+        from itertools import islice
+        from systemadmin.services import AuditLogService, audit_archive
+
+        if month is None:
+            return Response({'months': [f'{archived:%Y-%m}' for archived in audit_archive.archived_months()]})
+        try:
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), self.MAX_LIMIT)
+            entries = AuditLogService.list_archived_logs(month, **{
+                key: request.query_params.get(key) for key in self.ARCHIVE_FILTERS
+            })
+            page = list(islice(entries, offset, offset + limit + 1))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'month': month,
+            'offset': offset,
+            'has_more': len(page) > limit,
+            'results': page[:limit],
+        })
+
+
 class FeatureFlagListView(generics.ListCreateAPIView):
     queryset = FeatureFlag.objects.all()
     serializer_class = FeatureFlagSerializer
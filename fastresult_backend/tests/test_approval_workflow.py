@@ -0,0 +1,71 @@
+"""
+Approval workflow compiler tests
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from approvals.workflow import REJECT, WorkflowError, compile_stages, default_workflow
+
+
+class TestDefaultWorkflow:
+    def test_chain(self):
+        workflow = default_workflow()
+        assert workflow.initial_status == 'draft'
+        assert workflow.get('draft', 'submit').to_status == 'submitted'
+        assert workflow.get('submitted', 'review').to_status == 'under_review'
+        assert workflow.get('under_review', 'approve').to_status == 'approved'
+
+    def test_next_stage_follows_hod_sign_off(self):
+        workflow = default_workflow()
+        assert workflow.stage('review').next_stage.action == 'hod_approve'
+        assert workflow.stage('hod_approve').next_stage.action == 'approve'
+
+    def test_reject_merges_roles(self):
+        reject = default_workflow().get('under_review', REJECT)
+        assert reject.to_status == 'draft'
+        assert set(reject.roles) == {'hod', 'exam_officer'}
+
+    def test_unknown_move(self):
+        workflow = default_workflow()
+        assert ('draft', 'approve') not in workflow.transitions
+        assert 'published' not in workflow.allowed
+
+
+class TestCompileStages:
+    def test_custom_chain(self):
+        workflow = compile_stages([
+            {'name': 'submit', 'role': 'lecturer', 'from': 'draft', 'to': 'submitted'},
+            {'name': 'approve', 'roles': ['dean'], 'from': 'submitted', 'to': 'approved', 'reject_to': 'rejected'},
+        ])
+        assert workflow.allowed['submitted'] == {'approved', 'rejected'}
+        assert workflow.actions_for('submitted') == ['approve', REJECT]
+
+    def test_deadlines_and_escalation(self):
+        stages = [
+            {'name': 'submit', 'roles': ['lecturer'], 'from': 'draft', 'to': 'submitted'},
+            {'name': 'approve', 'roles': ['hod'], 'from': 'submitted', 'to': 'approved',
+             'escalate_to': 'dean', 'timeout_days': 1},
+        ]
+        now = datetime(2024, 1, 1)
+        workflow = compile_stages(stages, timeout_days=7, auto_escalate=True)
+        assert workflow.due_at(workflow.stage('submit'), now) == now + timedelta(days=7)
+        assert workflow.due_at(workflow.stage('approve'), now) == now + timedelta(days=1)
+        assert workflow.escalation_role(workflow.stage('approve')) == 'dean'
+        assert compile_stages(stages).escalation_role(workflow.stage('approve')) == ''
+        assert compile_stages(stages).due_at(workflow.stage('submit'), now) is None
+
+    @pytest.mark.parametrize('stages', [
+        [],
+        [{'name': 'submit', 'roles': ['lecturer'], 'from': 'draft', 'to': 'finished'}],
+        [{'name': 'submit', 'from': 'draft', 'to': 'submitted'}],
+        [{'name': REJECT, 'roles': ['hod'], 'from': 'draft', 'to': 'submitted'}],
+        [{'name': 'a', 'roles': ['hod'], 'from': 'draft', 'to': 'submitted'},
+         {'name': 'a', 'roles': ['hod'], 'from': 'submitted', 'to': 'approved'}],
+        [{'name': 'a', 'roles': ['hod'], 'from': 'submitted', 'to': 'approved', 'reject_to': 'draft'},
+         {'name': 'b', 'roles': ['hod'], 'from': 'submitted', 'to': 'under_review', 'reject_to': 'rejected'}],
+        [{'name': 'a', 'roles': ['hod'], 'from': 'draft', 'to': 'submitted', 'escalate_to': 'registrar'}],
+        [{'name': 'a', 'roles': ['hod'], 'from': 'draft', 'to': 'submitted', 'timeout_days': '3'}],
+    ])
+    def test_invalid_stages(self, stages):
+        with pytest.raises(WorkflowError):
+            compile_stages(stages)
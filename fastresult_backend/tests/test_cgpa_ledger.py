@@ -0,0 +1,98 @@
+"""
+CGPA ledger tests (database-backed)
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip('pytest_django')
+
+
+@pytest.fixture
+def student():
+    from academics.models import Department, Faculty, Program
+    from accounts.models import User
+    from students.models import StudentProfile
+    from universities.models import University
+
+    university = University.objects.create(name='Test University', code='TU')
+    faculty = Faculty.objects.create(university=university, name='Science', code='SCI')
+    department = Department.objects.create(faculty=faculty, name='Physics', code='PHY')
+    program = Program.objects.create(department=department, name='BSc Physics', code='BPHY', level=100)
+    user = User.objects.create(username='student', email='student@example.com', role='student')
+    return StudentProfile.objects.create(
+        user=user, matric_number='M0001', program=program, admission_date=date(2025, 9, 1), current_level=100
+    )
+
+
+def _semester(student, number):
+    from universities.models import AcademicYear, Semester
+
+    year, _ = AcademicYear.objects.get_or_create(
+        university=student.program.department.faculty.university, year='2025/2026',
+        defaults={'start_date': date(2025, 9, 1), 'end_date': date(2026, 6, 1)},
+    )
+    return Semester.objects.create(
+        academic_year=year, number=number, start_date=date(2025, 9, 1), end_date=date(2026, 1, 1)
+    )
+
+
+@pytest.mark.django_db
+def test_cgpa_is_not_truncated(student):
+    from results.models import CGPARecord, GPARecord
+
+    GPARecord.objects.create(student=student, semester=_semester(student, 1), gpa=Decimal('3.00'),
+                             total_credits=4, quality_points=Decimal('12'))
+    GPARecord.objects.create(student=student, semester=_semester(student, 2), gpa=Decimal('1.00'),
+                             total_credits=2, quality_points=Decimal('2'))
+
+    assert CGPARecord.objects.get(student=student).cgpa == Decimal('2.33')
+
+
+@pytest.mark.django_db
+def test_stale_copies_apply_their_change_once(student):
+    from results.models import CGPARecord, GPARecord
+
+    record = GPARecord.objects.create(student=student, semester=_semester(student, 1), gpa=Decimal('3.00'),
+                                      total_credits=6, quality_points=Decimal('18'))
+    first, second = GPARecord.objects.get(pk=record.pk), GPARecord.objects.get(pk=record.pk)
+    first.quality_points = second.quality_points = Decimal('19')
+    first.save()
+    second.save()
+
+    cgpa = CGPARecord.objects.get(student=student)
+    assert (cgpa.quality_points, cgpa.cgpa) == (Decimal('19'), Decimal('3.17'))
+
+
+@pytest.mark.django_db
+def test_reconcile_checks_stored_cgpa(student):
+    from results.models import CGPARecord, GPARecord
+    from results.services.cgpa_ledger import reconcile
+
+    GPARecord.objects.create(student=student, semester=_semester(student, 1), gpa=Decimal('3.17'),
+                             total_credits=6, quality_points=Decimal('19'))
+    assert reconcile()['drifted'] == 0
+
+    CGPARecord.objects.filter(student=student).update(cgpa=Decimal('3.00'))
+    assert reconcile()['drifted'] == 1
+    reconcile(fix=True)
+    assert CGPARecord.objects.get(student=student).cgpa == Decimal('3.17')
+
+
+@pytest.mark.django_db
+def test_deleting_records_never_recreates_cgpa(student):
+    from results.models import CGPARecord, GPARecord
+    from results.services import cgpa_ledger
+
+    for number in (1, 2):
+        GPARecord.objects.create(student=student, semester=_semester(student, number), gpa=Decimal('3.00'),
+                                 total_credits=3, quality_points=Decimal('9'))
+    with cgpa_ledger.batched():
+        GPARecord.objects.filter(student=student, semester__number=1).delete()
+        assert CGPARecord.objects.get(student=student).total_credits == 6
+    assert CGPARecord.objects.get(student=student).total_credits == 3
+
+    CGPARecord.objects.filter(student=student).delete()
+    GPARecord.objects.filter(student=student).delete()
+    assert not CGPARecord.objects.filter(student=student).exists()
@@ -0,0 +1,53 @@
+"""
+Streaming exporter tests
+"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import reports.exporters as exporters
+
+FIELDS = ['id', 'values', 'at']
+HEADERS = ['ID', 'Values', 'At']
+ROWS = [
+    (1, {'score': 70, 'note': 'a,b'}, datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)),
+    (2, {}, None),
+]
+
+
+def test_csv_stream():
+    body = ''.join(exporters.stream_csv(iter(ROWS), FIELDS, HEADERS))
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == HEADERS
+    assert rows[1][0] == '1'
+    assert json.loads(rows[1][1]) == {'score': 70, 'note': 'a,b'}
+    assert rows[2] == ['2', '{}', '']
+
+
+def test_jsonl_stream_is_keyed_by_field():
+    lines = ''.join(exporters.stream_jsonl(iter(ROWS), FIELDS, HEADERS)).splitlines()
+    first = json.loads(lines[0])
+    assert first['id'] == 1
+    assert first['values'] == {'score': 70, 'note': 'a,b'}
+    assert first['at'].startswith('2024-05-01T12:00:00')
+    assert len(lines) == 2
+
+
+def test_stream_is_chunked(monkeypatch):
+    monkeypatch.setattr(exporters, 'STREAM_BUFFER_SIZE', 10)
+    chunks = list(exporters.stream_jsonl(iter(ROWS * 5), FIELDS, HEADERS))
+    assert len(chunks) == 10
+
+
+def test_xlsx_splits_sheets(monkeypatch):
+    from openpyxl import load_workbook
+
+    monkeypatch.setattr(exporters, 'XLSX_MAX_ROWS', 3)
+    body = b''.join(exporters.stream_xlsx(iter(ROWS * 3), FIELDS, HEADERS))
+    workbook = load_workbook(io.BytesIO(body), read_only=True)
+    assert workbook.sheetnames == ['Export', 'Export 2', 'Export 3']
+    rows = [list(sheet.values) for sheet in workbook]
+    assert all(sheet[0] == tuple(HEADERS) for sheet in rows)
+    assert sum(len(sheet) - 1 for sheet in rows) == 6
+    assert rows[0][1][2] == datetime(2024, 5, 1, 12, 0)
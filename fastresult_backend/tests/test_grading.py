@@ -2,7 +2,8 @@
 Grading engine tests
 """
 import pytest
-from results.services.grading_engine import get_grade
+from results.services import grading_engine
+from results.services.grading_engine import get_grade, grade_many, compile_scale
 
 
 class TestGradingEngine:
@@ -34,3 +35,44 @@ class TestGradingEngine:
         # Maximum F
         grade, _ = get_grade(59)
         assert grade == 'F'
+
+
+class TestBatchGrading:
+    
+    SCORES = [95, 90, 89, 85, 79.5, 70, 65, 60, 59, 0, 100, 101, -1]
+    
+    def test_matches_per_row_grading(self):
+        """Test integer scores grade the same as get_grade"""
+        scores = [score for score in range(0, 101)]
+        letters, points = grade_many(scores)
+        assert list(zip(letters, points)) == [get_grade(score) for score in scores]
+    
+    def test_fractional_scores_use_lower_band(self):
+        """Test scores between bands take the lower band"""
+        letters, points = grade_many([89.5, 59.9])
+        assert letters == ['B', 'F']
+        assert points == [3.0, 0.0]
+    
+    def test_out_of_range_scores_fail(self):
+        """Test scores outside the scale get the failing grade"""
+        letters, _ = grade_many([101, -1])
+        assert letters == ['F', 'F']
+    
+    def test_bisect_fallback_matches_numpy(self):
+        """Test the pure-Python path agrees with the default path"""
+        table = compile_scale()
+        assert grading_engine._grade_many_bisect(self.SCORES, table) == grade_many(self.SCORES, table)
+    
+    def test_custom_scale(self):
+        """Test grading against a custom scale"""
+        scale = {
+            'P': {'min': 50, 'max': 100, 'points': 1.0},
+            'F': {'min': 0, 'max': 49, 'points': 0.0},
+        }
+        letters, points = grade_many([50, 49], scale)
+        assert letters == ['P', 'F']
+        assert points == [1.0, 0.0]
+    
+    def test_empty_batch(self):
+        """Test empty input"""
+        assert grade_many([]) == ([], [])
@@ -0,0 +1,18 @@
+"""
+Keyset cursor tests
+"""
+from datetime import datetime, timezone
+
+import pytest
+from core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    updated_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(updated_at, 42)) == (updated_at, 42)
+
+
+@pytest.mark.parametrize('cursor', ['garbage', '', 'W10', encode_cursor(datetime(2024, 1, 1), 1)[:-4]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,37 @@
+"""
+Result version handling tests
+"""
+from types import SimpleNamespace
+
+import pytest
+from results.services.concurrency import ResultConflictError, parse_expected_version
+
+
+def request(if_match=None, data=None):
+    headers = {'If-Match': if_match} if if_match is not None else {}
+    return SimpleNamespace(headers=headers, data=data or {})
+
+
+@pytest.mark.parametrize('req, expected', [
+    (request(), None),
+    (request('"3"'), 3),
+    (request('W/"7"'), 7),
+    (request(data={'version': 5}), 5),
+    (request('"2"', {'version': 9}), 2),
+    (request(data=[{'version': 5}]), None),
+    (request('"4"', [{'version': 5}]), 4),
+])
+def test_parse_expected_version(req, expected):
+    assert parse_expected_version(req) == expected
+
+
+def test_parse_expected_version_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_expected_version(request('"abc"'))
+
+
+def test_conflict_error_details():
+    error = ResultConflictError(10, 2, 4)
+    assert error.as_dict()['current_version'] == 4
+    assert 'reload' in str(error)
+    assert 'no longer exists' in str(ResultConflictError(10, 2))
@@ -0,0 +1,74 @@
+"""
+Result validation engine tests
+"""
+from collections import namedtuple
+from decimal import Decimal
+from types import MappingProxyType
+
+import pytest
+from results.validators import ValidationContext, validate_marks
+
+Row = namedtuple('Row', 'row_number matric_number component_name marks_obtained marks_total weight')
+
+
+def make_context(locked=False):
+    return ValidationContext(
+        course_id=1,
+        semester_id=1,
+        locked=locked,
+        enrolled=MappingProxyType({'M001': 10, 'M002': 11, 'M003': 12}),
+        results=MappingProxyType({10: (100, 'draft'), 11: (101, 'approved')}),
+        components=MappingProxyType({(100, 'CA'): (1000, Decimal('40'), Decimal('0.4'))}),
+    )
+
+
+def mark(matric, obtained='30', total='40', weight='0.4', component='CA', row=2):
+    to_decimal = lambda value: Decimal(value) if value is not None else None
+    return Row(row, matric, component, to_decimal(obtained), to_decimal(total), to_decimal(weight))
+
+
+class TestValidateMarks:
+    
+    def test_valid_rows_pass(self):
+        """Test enrolled students with draft or no results are accepted"""
+        valid, errors = validate_marks([mark('M001'), mark('M003', obtained='30.500')], make_context())
+        assert len(valid) == 2
+        assert errors == []
+    
+    @pytest.mark.parametrize('row, field, code', [
+        (mark('M999'), 'matric_number', 'not_enrolled'),
+        (mark(''), 'matric_number', 'required'),
+        (mark('M001', component=''), 'component_name', 'required'),
+        (mark('M001', obtained=None), 'marks_obtained', 'invalid'),
+        (mark('M001', obtained='41'), 'marks_obtained', 'out_of_range'),
+        (mark('M001', total='0'), 'marks_total', 'out_of_range'),
+        (mark('M001', weight='0'), 'weight', 'out_of_range'),
+        (mark('M001', weight='10'), 'weight', 'out_of_range'),
+        (mark('M001', weight='0.125'), 'weight', 'invalid'),
+        (mark('M001', obtained='1000', total='1000'), 'marks_total', 'out_of_range'),
+        (mark('M001', obtained='30.005'), 'marks_obtained', 'invalid'),
+        (mark('M001', total='40.001'), 'marks_total', 'invalid'),
+        (mark('M001', component='C' * 101), 'component_name', 'too_long'),
+        (mark('M002'), '', 'not_editable'),
+    ])
+    def test_row_errors(self, row, field, code):
+        """Test each rejected row reports its field and error code"""
+        valid, errors = validate_marks([row], make_context())
+        assert valid == []
+        assert (errors[0].field, errors[0].code) == (field, code)
+    
+    def test_locked_course_rejects_everything(self):
+        """Test a locked course rejects every row"""
+        valid, errors = validate_marks([mark('M001'), mark('M003')], make_context(locked=True))
+        assert valid == []
+        assert {error.code for error in errors} == {'locked'}
+    
+    def test_error_as_dict(self):
+        """Test errors serialise with their row number"""
+        _, errors = validate_marks([mark('M999', row=7)], make_context())
+        assert errors[0].as_dict()['row'] == 7
+    
+    def test_context_is_read_only(self):
+        """Test the context mappings cannot be modified"""
+        with pytest.raises(TypeError):
+            make_context().enrolled['M004'] = 13
@@ -0,0 +1,53 @@
+"""
+Score engine tests (database-backed)
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip('pytest_django')
+
+
+@pytest.fixture
+def result():
+    from academics.models import Course, Department, Faculty, Program
+    from accounts.models import User
+    from results.models import Result
+    from students.models import StudentProfile
+    from universities.models import AcademicYear, Semester, University
+
+    university = University.objects.create(name='Test University', code='TU')
+    year = AcademicYear.objects.create(
+        university=university, year='2025/2026', start_date=date(2025, 9, 1), end_date=date(2026, 6, 1)
+    )
+    semester = Semester.objects.create(
+        academic_year=year, number=1, start_date=date(2025, 9, 1), end_date=date(2026, 1, 1)
+    )
+    faculty = Faculty.objects.create(university=university, name='Science', code='SCI')
+    department = Department.objects.create(faculty=faculty, name='Physics', code='PHY')
+    program = Program.objects.create(department=department, name='BSc Physics', code='BPHY', level=100)
+    course = Course.objects.create(program=program, name='Mechanics', code='PHY101', credit_hours=3)
+    user = User.objects.create(username='student', email='student@example.com', role='student')
+    student = StudentProfile.objects.create(
+        user=user, matric_number='M0001', program=program, admission_date=date(2025, 9, 1), current_level=100
+    )
+    return Result.objects.create(student=student, course=course, semester=semester, status='draft')
+
+
+@pytest.mark.django_db
+def test_weighted_score_does_not_truncate(result):
+    from results.models import Grade, ResultComponent
+    from results.services.score_engine import grade_course, result_total_score
+
+    # Whole-number marks that do not divide evenly: SQLite stores them as INTEGER
+    ResultComponent.objects.create(
+        result=result, component_name='CA', marks_obtained=Decimal('47'), marks_total=Decimal('60')
+    )
+    ResultComponent.objects.create(
+        result=result, component_name='Exam', marks_obtained=Decimal('33'), marks_total=Decimal('70')
+    )
+
+    assert result_total_score(result.id) == Decimal('62.74')
+    grade_course(result.course_id, result.semester_id)
+    assert Grade.objects.get(result=result).total_score == Decimal('62.74')